@@ -16,6 +16,85 @@ function initializeApp() {
     document.getElementById('calculate-btn').addEventListener('click', calculateTravelTimes);
 }
 
+// Local Python timezone service (python -m src.server). When it is not running
+// we fall back to the public geocoding and timezone APIs below.
+const TIMEZONE_SERVICE_URL = window.TIMEZONE_SERVICE_URL || 'http://localhost:8080';
+
+// Resolve every city in the form with a single request to the local service
+async function resolveTimezonesBatch(cityNames) {
+    const response = await Promise.race([
+        fetch(`${TIMEZONE_SERVICE_URL}/timezones`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ places: cityNames })
+        }),
+        new Promise((_, reject) =>
+            setTimeout(() => reject(new Error('Request timeout')), 10000)
+        )
+    ]);
+
+    if (!response.ok) {
+        throw new Error('Timezone service unavailable');
+    }
+
+    const data = await response.json();
+    return data.results;
+}
+
+// Apply detected timezone information to one city field
+function applyTimezoneInfo(timezoneSelect, timezoneDisplay, timezoneInfo) {
+    timezoneSelect.value = timezoneInfo.utcOffset;
+
+    if (timezoneDisplay) {
+        timezoneDisplay.innerHTML = `Timezone: UTC${timezoneInfo.utcOffset >= 0 ? '+' : ''}${timezoneInfo.utcOffset}`;
+        timezoneDisplay.className = 'timezone-display success';
+    }
+}
+
+// Detect the timezone of the edited city field, together with any other
+// filled-in fields that have not been detected yet, in one request.
+// Fields detected earlier keep their timezone. Returns false when the local
+// service is unreachable.
+async function detectFormTimezones(triggerInput) {
+    const cityInputs = Array.from(
+        document.querySelectorAll('input[id^="departure-city-"], input[id^="arrival-city-"]')
+    ).filter(input =>
+        input.value.trim().length > 2 &&
+        (input === triggerInput || input.dataset.detectedCity === undefined)
+    );
+
+    if (cityInputs.length === 0) {
+        return true;
+    }
+
+    let results;
+    try {
+        results = await resolveTimezonesBatch(cityInputs.map(input => input.value.trim()));
+    } catch (error) {
+        console.log('Local timezone service unavailable, falling back to public APIs');
+        return false;
+    }
+
+    cityInputs.forEach(input => {
+        const cityName = input.value.trim();
+        const result = results[cityName];
+        const timezoneSelect = document.getElementById(input.id.replace('-city-', '-timezone-'));
+        const timezoneDisplay = document.getElementById(input.id.replace('-city-', '-timezone-display-'));
+
+        if (result && !result.error) {
+            applyTimezoneInfo(timezoneSelect, timezoneDisplay, {
+                utcOffset: result.utc_offset_hours,
+                timezoneName: result.timezone
+            });
+            input.dataset.detectedCity = cityName;
+        } else if (timezoneDisplay) {
+            timezoneDisplay.innerHTML = 'Could not detect timezone';
+            timezoneDisplay.className = 'timezone-display error';
+        }
+    });
+    return true;
+}
+
 // Automatic timezone detection functions
 async function getTimezoneOffset(cityName) {
     try {
@@ -204,20 +283,15 @@ async function autoDetectTimezone(flightId, isArrival = false) {
         timezoneDisplay.className = 'timezone-display loading';
     }
     
+    // One local round-trip covers this field and any not detected yet
+    if (await detectFormTimezones(cityInput)) {
+        return;
+    }
+    
     try {
         const timezoneInfo = await getTimezoneOffset(cityInput.value.trim());
-        
-        // Set the timezone in the select dropdown
-        timezoneSelect.value = timezoneInfo.utcOffset;
-        
-        // Show timezone information
-        if (timezoneDisplay) {
-            timezoneDisplay.innerHTML = `Timezone: UTC${timezoneInfo.utcOffset >= 0 ? '+' : ''}${timezoneInfo.utcOffset}`;
-            timezoneDisplay.className = 'timezone-display success';
-        }
-        
-
-        
+        applyTimezoneInfo(timezoneSelect, timezoneDisplay, timezoneInfo);
+        cityInput.dataset.detectedCity = cityInput.value.trim();
     } catch (error) {
         if (timezoneDisplay) {
             timezoneDisplay.innerHTML = 'Could not detect timezone';
@@ -0,0 +1,158 @@
+"""Python <-> JavaScript conformance and throughput harness for the calculator
+
+Runs src/calculator.py and calculator.js (under Node) over the same randomized
+itinerary corpus, diffs the results and reports per-implementation throughput.
+
+    python benchmarks/js_conformance.py --count 100000 --tz America/New_York
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.calculator import Flight, TravelTimeCalculator
+from src.itinerary_generator import generate_itineraries
+from src.server import flight_to_dict
+
+JS_RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "run_calculator.js")
+
+
+def python_results(itineraries: List[List[Flight]]) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Run the Python calculator over a corpus.
+
+    :param itineraries: List of itineraries, each a list of Flight objects.
+    :return: Elapsed seconds and one result mapping (durations in seconds) per itinerary.
+    """
+    results = []
+    started = time.perf_counter()
+    for flights in itineraries:
+        try:
+            air, travel, layover, layovers = TravelTimeCalculator(
+                flights=flights
+            ).calculate_travel_times()
+            results.append(
+                {
+                    "total_air_time": air.total_seconds(),
+                    "total_travel_time": travel.total_seconds(),
+                    "total_layover_time": layover.total_seconds(),
+                    "layover_times": [td.total_seconds() for td in layovers],
+                }
+            )
+        except ValueError as e:
+            results.append({"error": str(e)})
+    return time.perf_counter() - started, results
+
+
+def javascript_results(
+    itineraries: List[List[Flight]], node: str = "node", tz: Optional[str] = None
+) -> Tuple[float, List[Dict[str, Any]]]:
+    """
+    Run calculator.js under Node over a corpus.
+
+    :param itineraries: List of itineraries, each a list of Flight objects.
+    :param node: Node executable.
+    :param tz: Local timezone for the Node process (TZ variable); the JS
+        implementation depends on it. Defaults to the inherited environment.
+    :return: Elapsed seconds measured inside Node and one result mapping per itinerary.
+    """
+    env = dict(os.environ)
+    if tz is not None:
+        env["TZ"] = tz
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as corpus:
+        json.dump(
+            [[flight_to_dict(flight) for flight in flights] for flights in itineraries],
+            corpus,
+        )
+    try:
+        completed = subprocess.run(
+            [node, JS_RUNNER, corpus.name],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    finally:
+        os.unlink(corpus.name)
+    output = json.loads(completed.stdout)
+    return output["seconds"], output["results"]
+
+
+def diff_results(
+    python: List[Dict[str, Any]], javascript: List[Dict[str, Any]]
+) -> List[Dict[str, Any]]:
+    """
+    Compare results itinerary by itinerary.
+
+    Two errors count as agreement, since the implementations word them differently.
+
+    :return: One mismatch record per disagreeing itinerary.
+    """
+    mismatches = []
+    for index, (py, js) in enumerate(zip(python, javascript)):
+        if "error" in py or "error" in js:
+            if ("error" in py) != ("error" in js):
+                mismatches.append({"index": index, "python": py, "javascript": js})
+        elif py != js:
+            mismatches.append({"index": index, "python": py, "javascript": js})
+    return mismatches
+
+
+def run_conformance(
+    count: int,
+    seed: int = 0,
+    tz: Optional[str] = None,
+    node: str = "node",
+    max_legs: int = 4,
+) -> Dict[str, Any]:
+    """
+    Generate a corpus, run both implementations and summarize the comparison.
+
+    :return: Report mapping with mismatch count, sample mismatches and throughput.
+    """
+    itineraries = generate_itineraries(count, seed=seed, max_legs=max_legs)
+    python_seconds, python = python_results(itineraries)
+    javascript_seconds, javascript = javascript_results(itineraries, node=node, tz=tz)
+    mismatches = diff_results(python, javascript)
+    return {
+        "itineraries": count,
+        "legs": sum(len(flights) for flights in itineraries),
+        "tz": tz,
+        "mismatches": len(mismatches),
+        "sample_mismatches": mismatches[:5],
+        "python_seconds": python_seconds,
+        "javascript_seconds": javascript_seconds,
+        "python_itineraries_per_second": count / python_seconds if python_seconds else 0.0,
+        "javascript_itineraries_per_second": (
+            count / javascript_seconds if javascript_seconds else 0.0
+        ),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-legs", type=int, default=4)
+    parser.add_argument(
+        "--tz", default=None, help="TZ for the Node process, e.g. America/New_York"
+    )
+    parser.add_argument("--node", default="node")
+    args = parser.parse_args()
+
+    report = run_conformance(
+        args.count, seed=args.seed, tz=args.tz, node=args.node, max_legs=args.max_legs
+    )
+    print(json.dumps(report, indent=2))
+    sys.exit(1 if report["mismatches"] else 0)
+
+
+if __name__ == "__main__":
+    main()
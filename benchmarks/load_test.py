@@ -0,0 +1,198 @@
+"""Load test harness for the travel time HTTP service on localhost"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.server import TravelTimeService
+
+SAMPLE_FLIGHTS = [
+    {
+        "departure_city": "Johannesburg",
+        "departure_date": "2024-01-01",
+        "departure_time": "16:40",
+        "departure_timezone_utc_offset_in_hours": 2,
+        "arrival_city": "Luanda",
+        "arrival_date": "2024-01-01",
+        "arrival_time": "19:10",
+        "arrival_timezone_utc_offset_in_hours": 1,
+    },
+    {
+        "departure_city": "Luanda",
+        "departure_date": "2024-01-01",
+        "departure_time": "23:00",
+        "departure_timezone_utc_offset_in_hours": 1,
+        "arrival_city": "Sao Paulo",
+        "arrival_date": "2024-01-02",
+        "arrival_time": "03:30",
+        "arrival_timezone_utc_offset_in_hours": -3,
+    },
+]
+
+
+class HttpClient:
+    """
+    Keep-alive HTTP/1.1 client for a single connection.
+    """
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    async def request(self, method: str, path: str, payload: Any = None) -> Tuple[int, Any]:
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        head = (
+            f"{method} {path} HTTP/1.1\r\n"
+            f"Host: {self.host}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        )
+        self._writer.write(head.encode("latin-1") + body)
+        await self._writer.drain()
+
+        status_line = await self._reader.readline()
+        status = int(status_line.split()[1])
+        content_length = 0
+        while True:
+            line = await self._reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                content_length = int(value.strip())
+        response_body = await self._reader.readexactly(content_length)
+        return status, json.loads(response_body)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+            self._writer = None
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+async def run_load(
+    host: str,
+    port: int,
+    endpoint: str,
+    payload: Any,
+    concurrency: int,
+    total_requests: int,
+) -> Dict[str, Any]:
+    """
+    Fire ``total_requests`` POSTs at the endpoint across ``concurrency`` connections.
+
+    :return: Mapping with throughput, error count and latency percentiles.
+    """
+    latencies: List[float] = []
+    errors = 0
+    remaining = total_requests
+
+    async def worker():
+        nonlocal remaining, errors
+        client = HttpClient(host, port)
+        try:
+            while remaining > 0:
+                remaining -= 1
+                started = time.perf_counter()
+                status, _ = await client.request("POST", endpoint, payload)
+                latencies.append(time.perf_counter() - started)
+                if status != 200:
+                    errors += 1
+        finally:
+            await client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "endpoint": endpoint,
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 0.50) * 1000,
+        "p95_ms": _percentile(latencies, 0.95) * 1000,
+        "p99_ms": _percentile(latencies, 0.99) * 1000,
+    }
+
+
+async def main_async(args: argparse.Namespace):
+    service = None
+    host, port = args.host, args.port
+    if port is None:
+        service = TravelTimeService(host=host, port=0, workers=args.workers)
+        await service.start()
+        port = service.port
+
+    try:
+        single = await run_load(
+            host,
+            port,
+            "/calculate",
+            {"flights": SAMPLE_FLIGHTS},
+            args.concurrency,
+            args.requests,
+        )
+        batch = await run_load(
+            host,
+            port,
+            "/calculate/batch",
+            {"itineraries": [SAMPLE_FLIGHTS] * args.batch_size},
+            args.concurrency,
+            max(1, args.requests // 10),
+        )
+        for report in (single, batch):
+            print(
+                f"{report['endpoint']:<18} {report['requests']:>7} req "
+                f"{report['requests_per_second']:>10.1f} req/s "
+                f"p50 {report['p50_ms']:.2f} ms  p95 {report['p95_ms']:.2f} ms  "
+                f"p99 {report['p99_ms']:.2f} ms  errors {report['errors']}"
+            )
+        client = HttpClient(host, port)
+        _, metrics = await client.request("GET", "/metrics")
+        await client.close()
+        print(json.dumps(metrics, indent=2))
+    finally:
+        if service is not None:
+            await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=None,
+        help="Port of a running service; starts an in-process service when omitted",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+// Runs calculator.js over a JSON itinerary corpus for the conformance harness.
+// Usage: node run_calculator.js <corpus.json>  (results are written to stdout)
+const fs = require('fs');
+const path = require('path');
+const { Flight, TravelTimeCalculator } = require(path.join(__dirname, '..', 'calculator.js'));
+
+const itineraries = JSON.parse(fs.readFileSync(process.argv[2], 'utf8'));
+
+// Build Flight objects up front so only the calculation is timed
+const built = itineraries.map(flights => flights.map(f => new Flight(
+    f.departure_city,
+    f.departure_date,
+    f.departure_time,
+    f.departure_timezone_utc_offset_in_hours,
+    f.arrival_city,
+    f.arrival_date,
+    f.arrival_time,
+    f.arrival_timezone_utc_offset_in_hours
+)));
+
+const results = new Array(built.length);
+const started = process.hrtime.bigint();
+for (let i = 0; i < built.length; i++) {
+    try {
+        const r = new TravelTimeCalculator(built[i]).calculateTravelTimes();
+        results[i] = {
+            total_air_time: r.totalAirTime / 1000,
+            total_travel_time: r.totalTravelTime / 1000,
+            total_layover_time: r.totalLayoverTime / 1000,
+            layover_times: r.layoverTimes.map(ms => ms / 1000)
+        };
+    } catch (error) {
+        results[i] = { error: error.message };
+    }
+}
+const elapsedSeconds = Number(process.hrtime.bigint() - started) / 1e9;
+
+process.stdout.write(JSON.stringify({ seconds: elapsedSeconds, results: results }));
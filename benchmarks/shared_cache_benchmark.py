@@ -0,0 +1,103 @@
+"""Multiprocess benchmark of TimezoneCache with and without a shared place table
+
+Each worker process resolves the same places in its own order through a
+resolver that sleeps like a remote geocoder. Without a shared table every
+worker geocodes every place; with one, a place is geocoded roughly once in
+total and then read lock-free by everyone.
+
+    python benchmarks/shared_cache_benchmark.py --workers 16 --places 200
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.shared_cache import SharedPlaceTable
+from src.timezone_cache import TimezoneCache
+
+
+class SleepingResolver:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __call__(self, place_name: str) -> ResolvedPlace:
+        time.sleep(self.latency)
+        return ResolvedPlace("Etc/UTC", 0.0, float(hash(place_name) % 180))
+
+
+def run_worker(seed, places, latency, table, lookups):
+    cache = TimezoneCache(resolver=SleepingResolver(latency), shared=table)
+    order = list(places)
+    random.Random(seed).shuffle(order)
+    start = time.perf_counter()
+    for place in order:
+        cache.resolve_place(place)
+    resolve_seconds = time.perf_counter() - start
+
+    # Warm reads that skip the process-local dicts, to time the table itself
+    read_seconds = None
+    if table is not None:
+        keys = [cache.canonical_name(place) for place in order]
+        start = time.perf_counter()
+        for i in range(lookups):
+            table.get(keys[i % len(keys)])
+        read_seconds = time.perf_counter() - start
+    return cache.stats()["misses"], resolve_seconds, read_seconds
+
+
+def run(args, shared: bool):
+    places = [f"City {i}" for i in range(args.places)]
+    table = SharedPlaceTable.create(capacity=4 * args.places) if shared else None
+    try:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(args.workers, mp_context=get_context("spawn")) as pool:
+            results = list(
+                pool.map(
+                    run_worker,
+                    range(args.workers),
+                    [places] * args.workers,
+                    [args.latency] * args.workers,
+                    [table] * args.workers,
+                    [args.lookups] * args.workers,
+                )
+            )
+        wall = time.perf_counter() - start
+    finally:
+        if table is not None:
+            table.close()
+            table.unlink()
+
+    geocodes = sum(misses for misses, _, _ in results)
+    slowest = max(seconds for _, seconds, _ in results)
+    line = (
+        f"{'shared' if shared else 'per-process':<12} geocodes {geocodes:>6}  "
+        f"slowest worker {slowest:7.2f} s  wall {wall:7.2f} s"
+    )
+    if shared:
+        reads = sum(read for _, _, read in results)
+        line += f"  table reads {args.lookups * args.workers / reads:,.0f}/s per worker"
+    print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--places", type=int, default=200)
+    parser.add_argument(
+        "--latency", type=float, default=0.005, help="Seconds per geocoder call"
+    )
+    parser.add_argument("--lookups", type=int, default=100_000)
+    args = parser.parse_args()
+    run(args, shared=False)
+    run(args, shared=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+"""pytest-benchmark suite for the calculator over synthetic itinerary corpora
+
+    pytest benchmarks/ --benchmark-only
+    BENCH_FULL=1 pytest benchmarks/ --benchmark-only   # includes 10**6 itineraries
+"""
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import Flight, TravelTimeCalculator, create_utc_datetime
+from src.crew import duty_periods, rolling_block_hours
+from src.delay_simulation import simulate_delays
+from src.itinerary_arrays import leg_arrays
+from src.itinerary_metrics import itinerary_metrics
+from src.result_cache import ItineraryResultCache
+from src.itinerary_generator import (
+    EDGE_UTC_OFFSETS,
+    generate_itineraries,
+    generate_schedule,
+)
+from src.route_search import FlightSchedule, k_shortest_itineraries
+from src.schedule_index import ItineraryIndex
+from src.validation import validate_itineraries
+
+SIZES = [
+    1,
+    10**3,
+    pytest.param(
+        10**6,
+        marks=pytest.mark.skipif(
+            not os.environ.get("BENCH_FULL"), reason="set BENCH_FULL=1 for 10**6"
+        ),
+    ),
+]
+
+_corpora = {}
+
+
+def corpus(size):
+    """Generate each corpus once per session, it dominates setup time at 10**6."""
+    if size not in _corpora:
+        _corpora[size] = generate_itineraries(
+            size, seed=size, offsets=EDGE_UTC_OFFSETS, year_end_fraction=0.1
+        )
+    return _corpora[size]
+
+
+def run_all(itineraries, method):
+    for flights in itineraries:
+        method(TravelTimeCalculator(flights=flights))
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_calculate_travel_times(benchmark, size):
+    itineraries = corpus(size)
+    benchmark(run_all, itineraries, TravelTimeCalculator.calculate_travel_times)
+
+
+@pytest.mark.parametrize(
+    "getter",
+    [
+        TravelTimeCalculator.get_total_air_time,
+        TravelTimeCalculator.get_total_travel_time,
+        TravelTimeCalculator.get_total_layover_time,
+        TravelTimeCalculator.get_individual_layover_times,
+    ],
+    ids=lambda getter: getter.__name__,
+)
+@pytest.mark.parametrize("size", SIZES)
+def test_formatted_getters(benchmark, size, getter):
+    itineraries = corpus(size)
+    benchmark(run_all, itineraries, getter)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_validation_error_path(benchmark, size):
+    # Reversed multi-leg itineraries depart before the previous arrival and fail
+    itineraries = [list(reversed(flights)) for flights in corpus(size)]
+    itineraries = [flights for flights in itineraries if len(flights) > 1] or [
+        corpus(size)[0]
+    ]
+
+    def run():
+        for flights in itineraries:
+            try:
+                TravelTimeCalculator(flights=flights).calculate_travel_times()
+            except ValueError:
+                pass
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_format_timedelta(benchmark, size):
+    durations = [timedelta(minutes=minutes) for minutes in range(size)]
+    benchmark(lambda: [TravelTimeCalculator.format_timedelta(td) for td in durations])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_bulk_validation(benchmark, size):
+    # Corrupt every tenth itinerary so the error path is exercised too
+    itineraries = [
+        [Flight(**dict(vars(flights[0]), departure_time="25:00"))] + flights[1:]
+        if index % 10 == 0
+        else flights
+        for index, flights in enumerate(corpus(size))
+    ]
+    benchmark(lambda: validate_itineraries(enumerate(itineraries)))
+
+
+@pytest.mark.parametrize(
+    "time_str", ["16:40", "16:40:30", "16:40:30.250"], ids=["hh_mm", "seconds", "fraction"]
+)
+def test_create_utc_datetime(benchmark, time_str):
+    benchmark(create_utc_datetime, "2024-01-01", time_str, 2)
+
+
+def test_flight_from_iso(benchmark):
+    benchmark(
+        Flight.from_iso,
+        "Johannesburg",
+        "2024-01-01T16:40:30+02:00",
+        "Luanda",
+        "2024-01-01T19:10+01:00",
+    )
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_result_cache_hits(benchmark, size):
+    # Rebuilt Flight objects, as a shopping engine re-scoring fares would pass
+    itineraries = [
+        [Flight(**vars(flight)) for flight in flights] for flights in corpus(size)
+    ]
+    cache = ItineraryResultCache(maxsize=max(size, 1))
+    for flights in corpus(size):
+        cache.calculate(flights)
+    benchmark(lambda: [cache.calculate(flights) for flights in itineraries])
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_result_cache_misses(benchmark, size):
+    itineraries = corpus(size)
+
+    def run():
+        cache = ItineraryResultCache(maxsize=max(size, 1))
+        for flights in itineraries:
+            cache.calculate(flights)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_crew_duty_and_block_hours(benchmark, size):
+    # Each itinerary stands in for one crew member's roster
+    legs = leg_arrays(corpus(size))
+
+    def run():
+        duty_periods(legs)
+        rolling_block_hours(legs)
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_itinerary_metrics(benchmark, size):
+    legs = leg_arrays(corpus(size))
+    benchmark(itinerary_metrics, legs)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_delay_simulation(benchmark, size):
+    legs = leg_arrays(corpus(size))
+    benchmark.pedantic(simulate_delays, (legs,), {"seed": 0}, rounds=1)
+
+
+@pytest.mark.parametrize("size", SIZES)
+def test_schedule_change(benchmark, size):
+    itineraries = corpus(size)
+    index = ItineraryIndex(dict(enumerate(itineraries)))
+    original = itineraries[0][0]
+    # Five minutes earlier, so the leg really moves to a new key
+    departure = create_utc_datetime(
+        original.departure_date, original.departure_time, 0
+    ) - timedelta(minutes=5)
+    retimed = Flight(
+        original.departure_city,
+        departure.strftime("%Y-%m-%d"),
+        departure.strftime("%H:%M"),
+        original.departure_timezone_utc_offset_in_hours,
+        original.arrival_city,
+        original.arrival_date,
+        original.arrival_time,
+        original.arrival_timezone_utc_offset_in_hours,
+    )
+
+    def run():
+        # Retime the first leg and back; only its itineraries are recomputed
+        index.apply_change({original: retimed})
+        index.apply_change({retimed: original})
+
+    benchmark(run)
+
+
+_schedules = {}
+
+
+def schedule(flights):
+    """Build each schedule once per session; flights spread over 200 cities."""
+    if flights not in _schedules:
+        _schedules[flights] = FlightSchedule(
+            generate_schedule(flights, seed=flights, city_count=200, hub_count=10)
+        )
+    return _schedules[flights]
+
+
+@pytest.mark.parametrize("flights", [10**3, 10**4, 10**5])
+@pytest.mark.parametrize("k", [1, 10, 100])
+def test_k_shortest_itineraries(benchmark, flights, k):
+    benchmark(k_shortest_itineraries, schedule(flights), "City 150", "City 180", k)
+
+
+@pytest.mark.parametrize("flights", [10**3, 10**4, 10**5])
+def test_latest_departure(benchmark, flights):
+    # Arrive by the middle of the generated week
+    benchmark(
+        schedule(flights).latest_departure,
+        "City 150",
+        "City 180",
+        datetime(2024, 1, 4, 9),
+    )
@@ -0,0 +1,55 @@
+"""pytest-benchmark suite for geocoder failover and hedging against fake providers
+
+    pytest benchmarks/test_benchmark_geocoders.py --benchmark-only
+"""
+
+import sys
+import os
+import random
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.geocoders import FailoverGeocoder, FakeLocation, FakeProvider
+from src.reverse_geocoder import default_reverse_geocoder
+
+PLACES = {
+    f"City {i}": [FakeLocation(f"City {i}", 0.0, float(i % 180))] for i in range(100)
+}
+QUERIES = list(PLACES)
+
+
+def _tail_latency(seed):
+    """Mostly 1 ms, with a 5% tail of 50 ms requests."""
+    rng = random.Random(seed)
+    return lambda query: 0.05 if rng.random() < 0.05 else 0.001
+
+
+@pytest.mark.parametrize("hedge_after", [None, 0.005], ids=["no_hedge", "hedge_5ms"])
+def test_tail_latency(benchmark, hedge_after):
+    providers = [
+        FakeProvider(PLACES, latency=_tail_latency(1), name="primary"),
+        FakeProvider(PLACES, latency=_tail_latency(2), name="secondary"),
+    ]
+    with FailoverGeocoder(providers, timeout=1.0, hedge_after=hedge_after) as geocoder:
+        benchmark(lambda: [geocoder.geocode(query) for query in QUERIES[:20]])
+
+
+def test_failover_from_flaky_primary(benchmark):
+    providers = [
+        FakeProvider(PLACES, failure_rate=0.2, seed=3, name="flaky"),
+        FakeProvider(PLACES, name="backup"),
+    ]
+    with FailoverGeocoder(providers) as geocoder:
+        benchmark(lambda: [geocoder.geocode(query) for query in QUERIES])
+
+
+def test_reverse_geocode_batch(benchmark):
+    """100k positions near known cities, resolved offline in one call."""
+    geocoder = default_reverse_geocoder()
+    rng = np.random.default_rng(0)
+    cities = rng.integers(0, len(geocoder), 100_000)
+    latitudes = geocoder.latitudes[cities] + rng.normal(0, 0.3, len(cities))
+    longitudes = geocoder.longitudes[cities] + rng.normal(0, 0.3, len(cities))
+    benchmark(geocoder.nearest, latitudes, longitudes)
@@ -0,0 +1,253 @@
+"""Snapshots and warm-up of the place name to timezone cache across restarts
+
+A snapshot records the tzdata version it was taken under and a fingerprint of
+every zone its entries point to. Loading it under the same tzdata version
+restores every entry. After a tzdata update, only entries whose zone changed
+or disappeared are dropped, so those places are geocoded again (a changed zone
+may mean a new zone was split off it).
+
+    python -m src.server --snapshot cache.json --warm-up-log queries.log
+"""
+
+import hashlib
+import json
+import os
+import re
+import zoneinfo
+from collections import Counter
+from importlib import resources
+from typing import Dict, Iterable, Iterator, NamedTuple, Optional
+
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.timezone_cache import TimezoneCache
+from src.zone_offsets import get_zone
+
+SNAPSHOT_FORMAT = 1
+
+UNKNOWN_VERSION = "unknown"
+
+_VERSION_LINE = re.compile(r"#\s*version\s+(\S+)")
+
+
+class SnapshotReport(NamedTuple):
+    """
+    Outcome of loading a snapshot.
+    """
+
+    snapshot_version: str
+    tzdata_version: str
+    loaded: int
+    invalidated: int
+
+
+class WarmUpReport(NamedTuple):
+    """
+    Outcome of warming a cache up from past queries.
+    """
+
+    resolved: int
+    already_cached: int
+    failed: int
+
+
+def tzdata_version() -> str:
+    """
+    Version of the tz database zoneinfo reads, e.g. '2024a'.
+
+    Returns:
+        str: The version from the system tzdata.zi or the tzdata package, or
+        UNKNOWN_VERSION if neither names one.
+    """
+    for directory in zoneinfo.TZPATH:
+        try:
+            with open(os.path.join(directory, "tzdata.zi")) as f:
+                match = _VERSION_LINE.match(f.readline())
+        except OSError:
+            continue
+        if match:
+            return match.group(1)
+    try:
+        import tzdata
+    except ImportError:
+        return UNKNOWN_VERSION
+    return getattr(tzdata, "IANA_VERSION", UNKNOWN_VERSION)
+
+
+def _zone_file(zone_name: str) -> Optional[bytes]:
+    try:
+        # Rejects unknown names and paths that would escape the zone directory
+        get_zone(zone_name)
+    except ValueError:
+        return None
+    for directory in zoneinfo.TZPATH:
+        try:
+            with open(os.path.join(directory, zone_name), "rb") as f:
+                return f.read()
+        except OSError:
+            continue
+    try:
+        return (
+            resources.files("tzdata.zoneinfo")
+            .joinpath(*zone_name.split("/"))
+            .read_bytes()
+        )
+    except (ImportError, OSError):
+        return None
+
+
+def zone_fingerprint(zone_name: str) -> Optional[str]:
+    """
+    Fingerprint of a zone's compiled rules.
+
+    Args:
+        zone_name (str): IANA timezone name.
+
+    Returns:
+        str or None: Hash of the zone's TZif data, which changes whenever a
+        tzdata release changes the zone; None if the zone does not exist.
+    """
+    data = _zone_file(zone_name)
+    if data is None:
+        return None
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def save_snapshot(cache: TimezoneCache, path: str):
+    """
+    Write every resolved place of a cache to a JSON file.
+
+    The file is replaced atomically, so a crash never leaves a partial snapshot.
+
+    Args:
+        cache (TimezoneCache): The cache to export.
+        path (str): Destination file.
+    """
+    entries = cache.entries()
+    zones = {place.timezone_name for place in entries.values()}
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "tzdata_version": tzdata_version(),
+        "zones": {zone: zone_fingerprint(zone) for zone in sorted(zones)},
+        "places": {
+            name: [place.timezone_name, place.latitude, place.longitude]
+            for name, place in entries.items()
+        },
+    }
+    temporary = f"{path}.tmp"
+    with open(temporary, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(temporary, path)
+
+
+def load_snapshot(cache: TimezoneCache, path: str) -> SnapshotReport:
+    """
+    Fill a cache from a snapshot written by save_snapshot.
+
+    Args:
+        cache (TimezoneCache): The cache to fill.
+        path (str): Snapshot file.
+
+    Returns:
+        SnapshotReport: Versions involved and how many entries were loaded or
+        dropped because their zone changed.
+
+    Raises:
+        ValueError: If the file is not a snapshot this version can read.
+    """
+    with open(path) as f:
+        snapshot = json.load(f)
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{path} is not a timezone cache snapshot")
+
+    version = tzdata_version()
+    saved_version = snapshot.get("tzdata_version", UNKNOWN_VERSION)
+    recorded = snapshot.get("zones", {})
+    if saved_version == version and version != UNKNOWN_VERSION:
+        valid = set(recorded)
+    else:
+        valid = {
+            zone
+            for zone, fingerprint in recorded.items()
+            if fingerprint is not None and zone_fingerprint(zone) == fingerprint
+        }
+
+    loaded = invalidated = 0
+    for name, (zone, latitude, longitude) in snapshot.get("places", {}).items():
+        if zone in valid:
+            cache.put(name, ResolvedPlace(zone, latitude, longitude))
+            loaded += 1
+        else:
+            invalidated += 1
+    return SnapshotReport(saved_version, version, loaded, invalidated)
+
+
+def read_query_log(path: str) -> Iterator[str]:
+    """
+    Place names from a log of past timezone queries.
+
+    Each line is either a plain place name or a JSON request body of the
+    /timezone or /timezones endpoint; other lines are skipped.
+
+    Args:
+        path (str): Log file.
+
+    Yields:
+        str: Place names in log order, with repetitions.
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if not line.startswith("{"):
+                yield line
+                continue
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(data, dict):
+                continue
+            places = data.get("places")
+            places = places if isinstance(places, list) else [data.get("place")]
+            for place in places:
+                if isinstance(place, str):
+                    yield place
+
+
+def warm_up(
+    cache: TimezoneCache, place_names: Iterable[str], limit: Optional[int] = None
+) -> WarmUpReport:
+    """
+    Resolve past queries ahead of traffic, most frequent place first.
+
+    Places are counted by canonical name, so spelling variants add up.
+
+    Args:
+        cache (TimezoneCache): The cache to fill.
+        place_names (iterable of str): Past queries, with repetitions.
+        limit (int, optional): Resolve at most this many distinct places.
+
+    Returns:
+        WarmUpReport: How many places were resolved, were already cached or
+        failed to resolve.
+    """
+    counts: Counter = Counter()
+    spellings: Dict[str, str] = {}
+    for place_name in place_names:
+        key = cache.canonical_name(place_name)
+        counts[key] += 1
+        spellings.setdefault(key, place_name)
+
+    resolved = already_cached = failed = 0
+    for key, _ in counts.most_common(limit):
+        if cache.get(key) is not None:
+            already_cached += 1
+            continue
+        try:
+            cache.resolve_place(spellings[key])
+        except ValueError:
+            failed += 1
+        else:
+            resolved += 1
+    return WarmUpReport(resolved, already_cached, failed)
@@ -1,12 +1,37 @@
 """Calculates the times"""
 
 from datetime import datetime, timedelta
-from typing import List, Tuple, Optional
+from time import perf_counter
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from src import zone_offsets
+from src.instrumentation import metrics
+
+_create_datetime_seconds = metrics.histogram(
+    "travel_time_create_datetime_seconds",
+    "Time spent converting one local date and time to UTC.",
+)
+_parse_errors = metrics.counter(
+    "travel_time_parse_errors_total", "Dates or times that failed to parse."
+)
+_calculate_seconds = metrics.histogram(
+    "travel_time_calculate_seconds", "Time spent in calculate_travel_times."
+)
+_calculate_errors = metrics.counter(
+    "travel_time_calculate_errors_total",
+    "calculate_travel_times calls that raised a ValueError.",
+)
+_legs_processed = metrics.counter(
+    "travel_time_legs_total", "Flights processed by calculate_travel_times."
+)
 
 
 class Flight:
     """
     Represents a single flight with departure and arrival details.
+
+    Each end is placed in time either by a fixed UTC offset or by an IANA zone
+    name; the zone is only consulted when the offset is None.
     """
 
     def __init__(
@@ -14,11 +39,13 @@ class Flight:
         departure_city: str,
         departure_date: str,
         departure_time: str,
-        departure_timezone_utc_offset_in_hours: float,
+        departure_timezone_utc_offset_in_hours: Optional[float],
         arrival_city: str,
         arrival_date: str,
         arrival_time: str,
-        arrival_timezone_utc_offset_in_hours: float,
+        arrival_timezone_utc_offset_in_hours: Optional[float],
+        departure_timezone: Optional[str] = None,
+        arrival_timezone: Optional[str] = None,
     ):
         self.departure_city = departure_city
         self.departure_date = departure_date
@@ -30,20 +57,484 @@ class Flight:
         self.arrival_date = arrival_date
         self.arrival_time = arrival_time
         self.arrival_timezone_utc_offset_in_hours = arrival_timezone_utc_offset_in_hours
+        self.departure_timezone = departure_timezone
+        self.arrival_timezone = arrival_timezone
+
+    @classmethod
+    def from_zones(
+        cls,
+        departure_city: str,
+        departure_date: str,
+        departure_time: str,
+        departure_timezone: str,
+        arrival_city: str,
+        arrival_date: str,
+        arrival_time: str,
+        arrival_timezone: str,
+    ) -> "Flight":
+        """
+        Create a Flight whose UTC offsets are resolved from IANA zone names.
+
+        :param departure_city: Departure city name.
+        :param departure_date: Local departure date in 'YYYY-MM-DD' format.
+        :param departure_time: Local departure time, e.g. '16:40'.
+        :param departure_timezone: IANA zone name, e.g. 'Africa/Luanda'.
+        :param arrival_city: Arrival city name.
+        :param arrival_date: Local arrival date in 'YYYY-MM-DD' format.
+        :param arrival_time: Local arrival time, e.g. '19:10'.
+        :param arrival_timezone: IANA zone name, e.g. 'Africa/Lagos'.
+        :return: Flight object.
+        """
+        return cls(
+            departure_city=departure_city,
+            departure_date=departure_date,
+            departure_time=departure_time,
+            departure_timezone_utc_offset_in_hours=None,
+            arrival_city=arrival_city,
+            arrival_date=arrival_date,
+            arrival_time=arrival_time,
+            arrival_timezone_utc_offset_in_hours=None,
+            departure_timezone=departure_timezone,
+            arrival_timezone=arrival_timezone,
+        )
+
+    @classmethod
+    def from_iso(
+        cls, departure_city: str, departure: str, arrival_city: str, arrival: str
+    ) -> "Flight":
+        """
+        Create a Flight from ISO-8601 timestamps with embedded UTC offsets.
+
+        :param departure_city: Departure city name.
+        :param departure: Local departure timestamp, e.g. '2024-01-01T16:40+02:00'.
+        :param arrival_city: Arrival city name.
+        :param arrival: Local arrival timestamp, e.g. '2024-01-01T19:10:30+01:00'.
+        :return: Flight object.
+        """
+        departure_date, departure_time, departure_offset = _split_iso(departure)
+        arrival_date, arrival_time, arrival_offset = _split_iso(arrival)
+        return cls(
+            departure_city=departure_city,
+            departure_date=departure_date,
+            departure_time=departure_time,
+            departure_timezone_utc_offset_in_hours=departure_offset,
+            arrival_city=arrival_city,
+            arrival_date=arrival_date,
+            arrival_time=arrival_time,
+            arrival_timezone_utc_offset_in_hours=arrival_offset,
+        )
+
+
+def _split_iso(timestamp: str) -> Tuple[str, str, float]:
+    """
+    Split an ISO-8601 timestamp into local date, local time and UTC offset in hours.
+    """
+    local_datetime = datetime.fromisoformat(timestamp)
+    if local_datetime.tzinfo is None:
+        raise ValueError(f"Timestamp must include a UTC offset: {timestamp}")
+    if local_datetime.microsecond:
+        time_format = "%H:%M:%S.%f"
+    elif local_datetime.second:
+        time_format = "%H:%M:%S"
+    else:
+        time_format = "%H:%M"
+    return (
+        local_datetime.strftime("%Y-%m-%d"),
+        local_datetime.strftime(time_format),
+        local_datetime.utcoffset() / timedelta(hours=1),
+    )
+
+
+class TravelTimes(NamedTuple):
+    """
+    Immutable result of a travel time calculation.
+    """
+
+    total_air_time: timedelta
+    total_travel_time: timedelta
+    total_layover_time: timedelta
+    layover_times: Tuple[timedelta, ...]
+
+
+def create_utc_datetime(
+    date_str: str, time_str: str, timezone_offset: float
+) -> datetime:
+    """
+    Create a datetime object from date and time strings with timezone offset.
+
+    :param date_str: Date string in 'YYYY-MM-DD' format
+    :param time_str: Time string in 'HH:MM', 'HH:MM:SS' or 'HH:MM:SS.ffffff' format
+    :param timezone_offset: UTC offset in hours
+    :return: UTC datetime object
+    """
+    started = perf_counter() if metrics.enabled else 0.0
+    local_datetime = _parse_local_datetime(date_str, time_str)
+
+    # Convert to UTC
+    utc_datetime = local_datetime - timedelta(hours=timezone_offset)
+
+    if started:
+        _create_datetime_seconds.observe(perf_counter() - started)
+    return utc_datetime
+
+
+def create_zoned_utc_datetime(
+    date_str: str,
+    time_str: str,
+    timezone_name: str,
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> Tuple[datetime, float]:
+    """
+    Create a UTC datetime from a local date and time in an IANA timezone.
+
+    :param date_str: Date string in 'YYYY-MM-DD' format
+    :param time_str: Time string in 'HH:MM', 'HH:MM:SS' or 'HH:MM:SS.ffffff' format
+    :param timezone_name: IANA zone name, e.g. 'Europe/Paris'
+    :param nonexistent: Policy for local times skipped by a forward transition,
+        'raise' or 'shift_forward'
+    :param ambiguous: Policy for local times repeated by a backward transition,
+        'raise', 'earlier' or 'later'
+    :return: UTC datetime object and the UTC offset in hours in effect locally
+    :raises ValueError: If the date, time or zone is invalid, or the local time
+        is nonexistent or ambiguous under a 'raise' policy
+    """
+    started = perf_counter() if metrics.enabled else 0.0
+    local_datetime = _parse_local_datetime(date_str, time_str)
+    utc_datetime, offset = zone_offsets.to_utc(
+        timezone_name, local_datetime, nonexistent, ambiguous
+    )
+
+    if started:
+        _create_datetime_seconds.observe(perf_counter() - started)
+    return utc_datetime, offset
+
+
+def _endpoint_utc(
+    date_str: str,
+    time_str: str,
+    timezone_offset: Optional[float],
+    timezone_name: Optional[str],
+    nonexistent: str,
+    ambiguous: str,
+) -> Tuple[datetime, float]:
+    if timezone_offset is None and timezone_name is not None:
+        return create_zoned_utc_datetime(
+            date_str, time_str, timezone_name, nonexistent, ambiguous
+        )
+    return create_utc_datetime(date_str, time_str, timezone_offset), timezone_offset
+
+
+def _parse_local_datetime(date_str: str, time_str: str) -> datetime:
+    local_datetime = _parse_fixed_width(date_str, time_str)
+    if local_datetime is None:
+        try:
+            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
+            if time_str.count(":") != 2:
+                time_obj = datetime.strptime(time_str, "%H:%M").time()
+            elif "." in time_str:
+                time_obj = datetime.strptime(time_str, "%H:%M:%S.%f").time()
+            else:
+                time_obj = datetime.strptime(time_str, "%H:%M:%S").time()
+        except ValueError as e:
+            if metrics.enabled:
+                _parse_errors.inc()
+            raise ValueError(f"Invalid date or time format: {e}")
+
+        # Create local datetime
+        local_datetime = datetime.combine(date_obj, time_obj)
+    return local_datetime
+
+
+def _parse_fixed_width(date_str: str, time_str: str) -> Optional[datetime]:
+    """
+    Fast path for the common 'YYYY-MM-DD' and 'HH:MM' strings.
+
+    Returns None for anything else, including invalid values, so that the
+    strptime path handles them and raises its usual errors.
+    """
+    if (
+        len(time_str) == 5
+        and len(date_str) == 10
+        and time_str[2] == ":"
+        and date_str[4] == "-"
+        and date_str[7] == "-"
+    ):
+        hours, minutes = time_str[:2], time_str[3:]
+        year, month, day = date_str[:4], date_str[5:7], date_str[8:]
+        if (
+            hours.isdecimal()
+            and minutes.isdecimal()
+            and year.isdecimal()
+            and month.isdecimal()
+            and day.isdecimal()
+        ):
+            try:
+                return datetime(
+                    int(year), int(month), int(day), int(hours), int(minutes)
+                )
+            except ValueError:
+                return None
+    return None
+
+
+def compute_travel_times(
+    flights: Sequence[Flight],
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> TravelTimes:
+    """
+    Calculate total air time, total travel time, total layover time, and individual layover times for a sequence of flights.
+
+    Pure function: it keeps no state between calls, so it is safe to call from
+    any number of threads at once.
+
+    :param flights: Sequence of Flight objects representing the itinerary.
+    :param nonexistent: For legs given by zone name, 'raise' on local times
+        skipped by a forward transition or 'shift_forward' past the gap.
+    :param ambiguous: For legs given by zone name, 'raise' on local times
+        repeated by a backward transition, or pick the 'earlier' or 'later' one.
+    :return: TravelTimes with the totals and the individual layover times.
+    """
+    zone_offsets.check_policies(nonexistent, ambiguous)
+    if not metrics.enabled:
+        return _compute_travel_times(flights, nonexistent, ambiguous)
+
+    started = perf_counter()
+    try:
+        return _compute_travel_times(flights, nonexistent, ambiguous)
+    except ValueError:
+        _calculate_errors.inc()
+        raise
+    finally:
+        _legs_processed.inc(len(flights))
+        _calculate_seconds.observe(perf_counter() - started)
+
+
+def _compute_travel_times(
+    flights: Sequence[Flight], nonexistent: str, ambiguous: str
+) -> TravelTimes:
+    layover_times: List[timedelta] = []
+    event: Optional[LegEvent] = None
+    for event in _travel_events(flights, nonexistent, ambiguous):
+        if event.layover is not None:
+            layover_times.append(event.layover)
+
+    if event is None:
+        return TravelTimes(timedelta(), timedelta(), timedelta(), ())
+    return TravelTimes(
+        event.total_air_time,
+        event.total_travel_time,
+        event.total_layover_time,
+        tuple(layover_times),
+    )
+
+
+class LegEvent(NamedTuple):
+    """
+    Result of one leg, yielded by iter_travel_events as soon as the leg is processed.
+
+    leg_index is 0-based; the offsets are the UTC offsets in hours actually
+    applied, resolved from the zone names where the flight has no offset. The
+    totals cover every leg up to and including this one.
+    """
+
+    leg_index: int
+    flight: Flight
+    departure_utc: datetime
+    arrival_utc: datetime
+    departure_offset: float
+    arrival_offset: float
+    flight_duration: timedelta
+    layover: Optional[timedelta]
+    total_air_time: timedelta
+    total_layover_time: timedelta
+    total_travel_time: timedelta
+
+
+def iter_travel_events(
+    flights: Iterable[Flight],
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> Iterator[LegEvent]:
+    """
+    Evaluate an itinerary leg by leg, yielding a LegEvent per flight.
+
+    Accepts any iterable, including unbounded live feeds, and keeps only the
+    previous arrival and the running totals, so memory use does not grow with
+    the number of legs. A bad leg raises the same ValueError as
+    compute_travel_times once the events of the legs before it have been yielded.
+
+    :param flights: Iterable of Flight objects representing the itinerary.
+    :param nonexistent: Policy for skipped local times, see compute_travel_times.
+    :param ambiguous: Policy for repeated local times, see compute_travel_times.
+    :return: Iterator of LegEvent objects in leg order.
+    """
+    zone_offsets.check_policies(nonexistent, ambiguous)
+    return _travel_events(flights, nonexistent, ambiguous)
+
+
+def _travel_events(
+    flights: Iterable[Flight], nonexistent: str, ambiguous: str
+) -> Iterator[LegEvent]:
+    total_air_time = timedelta()
+    total_layover_time = timedelta()
+
+    # Previous flight's arrival datetime in UTC
+    prev_arrival_utc: Optional[datetime] = None
+    initial_departure_utc: Optional[datetime] = None
+
+    for index, flight in enumerate(flights):
+        try:
+            # Create departure datetime in UTC
+            dep_datetime_utc, dep_offset = _endpoint_utc(
+                flight.departure_date,
+                flight.departure_time,
+                flight.departure_timezone_utc_offset_in_hours,
+                flight.departure_timezone,
+                nonexistent,
+                ambiguous,
+            )
+
+            # Create arrival datetime in UTC
+            arr_datetime_utc, arr_offset = _endpoint_utc(
+                flight.arrival_date,
+                flight.arrival_time,
+                flight.arrival_timezone_utc_offset_in_hours,
+                flight.arrival_timezone,
+                nonexistent,
+                ambiguous,
+            )
+
+            # Validate that arrival is not before departure (allow equal for zero-duration flights)
+            if arr_datetime_utc < dep_datetime_utc:
+                raise ValueError(
+                    f"Flight {index + 1}: Arrival time cannot be before departure time"
+                )
+
+            # Calculate layover time if not the first flight
+            layover_duration = None
+            if prev_arrival_utc:
+                if dep_datetime_utc < prev_arrival_utc:
+                    raise ValueError(
+                        f"Flight {index + 1}: Departure time must be after the previous flight's arrival time"
+                    )
+
+                layover_duration = dep_datetime_utc - prev_arrival_utc
+                total_layover_time += layover_duration
+
+        except Exception as e:
+            raise ValueError(f"Error processing flight {index + 1}: {str(e)}")
+
+        # Calculate flight duration
+        flight_duration = arr_datetime_utc - dep_datetime_utc
+        total_air_time += flight_duration
+
+        # Set initial departure UTC
+        if index == 0:
+            initial_departure_utc = dep_datetime_utc
+
+        # Update previous arrival UTC for next iteration
+        prev_arrival_utc = arr_datetime_utc
+
+        yield LegEvent(
+            index,
+            flight,
+            dep_datetime_utc,
+            arr_datetime_utc,
+            dep_offset,
+            arr_offset,
+            flight_duration,
+            layover_duration,
+            total_air_time,
+            total_layover_time,
+            arr_datetime_utc - initial_departure_utc,
+        )
+
+
+def format_timedelta(td: timedelta) -> str:
+    """
+    Format a timedelta object into a string of the form 'X hours Y minutes'.
+
+    :param td: timedelta object.
+    :return: Formatted string.
+    """
+    total_seconds = int(td.total_seconds())
+    hours, remainder = divmod(abs(total_seconds), 3600)
+    minutes = remainder // 60
+    sign = "-" if total_seconds < 0 else ""
+    return f"{sign}{hours} hours {minutes} minutes"
+
+
+class SharedTravelTimeCalculator:
+    """
+    Immutable, stateless calculator that a single instance can serve from many threads.
+
+    Unlike TravelTimeCalculator it does not own an itinerary or store results;
+    every call takes the flights and returns a new TravelTimes.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def calculate(
+        self,
+        flights: Sequence[Flight],
+        nonexistent: str = zone_offsets.RAISE,
+        ambiguous: str = zone_offsets.RAISE,
+    ) -> TravelTimes:
+        """
+        Calculate the travel times of an itinerary.
+
+        :param flights: Sequence of Flight objects representing the itinerary.
+        :param nonexistent: Policy for skipped local times, see compute_travel_times.
+        :param ambiguous: Policy for repeated local times, see compute_travel_times.
+        :return: TravelTimes with the totals and the individual layover times.
+        """
+        return compute_travel_times(flights, nonexistent, ambiguous)
+
+    def calculate_formatted(self, flights: Sequence[Flight]) -> dict:
+        """
+        Calculate the travel times of an itinerary as formatted strings.
+
+        :param flights: Sequence of Flight objects representing the itinerary.
+        :return: Mapping with the three totals and the list of layovers in 'X hours Y minutes' format.
+        """
+        result = compute_travel_times(flights)
+        return {
+            "total_air_time": format_timedelta(result.total_air_time),
+            "total_travel_time": format_timedelta(result.total_travel_time),
+            "total_layover_time": format_timedelta(result.total_layover_time),
+            "layover_times": [format_timedelta(td) for td in result.layover_times],
+        }
 
 
 class TravelTimeCalculator:
     """
     Calculates total air time, total travel time, and total layover time for a sequence of flights.
+
+    Stores its latest results as attributes; use SharedTravelTimeCalculator or
+    compute_travel_times when one instance is shared between threads.
     """
 
-    def __init__(self, flights: List[Flight]):
+    def __init__(
+        self,
+        flights: List[Flight],
+        nonexistent: str = zone_offsets.RAISE,
+        ambiguous: str = zone_offsets.RAISE,
+    ):
         """
         Initializes the TravelTimeCalculator.
 
         :param flights: List of Flight objects representing the itinerary.
+        :param nonexistent: Policy for skipped local times, see compute_travel_times.
+        :param ambiguous: Policy for repeated local times, see compute_travel_times.
         """
         self.flights = flights
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
         self.layover_times: List[timedelta] = []
         self.total_air_time: timedelta = timedelta()
         self.total_travel_time: timedelta = timedelta()
@@ -56,23 +547,11 @@ class TravelTimeCalculator:
         Create a datetime object from date and time strings with timezone offset.
 
         :param date_str: Date string in 'YYYY-MM-DD' format
-        :param time_str: Time string in 'HH:MM' format
+        :param time_str: Time string in 'HH:MM' or 'HH:MM:SS' format
         :param timezone_offset: UTC offset in hours
         :return: UTC datetime object
         """
-        try:
-            date_obj = datetime.strptime(date_str, "%Y-%m-%d").date()
-            time_obj = datetime.strptime(time_str, "%H:%M").time()
-        except ValueError as e:
-            raise ValueError(f"Invalid date or time format: {e}")
-
-        # Create local datetime
-        local_datetime = datetime.combine(date_obj, time_obj)
-
-        # Convert to UTC
-        utc_datetime = local_datetime - timedelta(hours=timezone_offset)
-
-        return utc_datetime
+        return create_utc_datetime(date_str, time_str, timezone_offset)
 
     def calculate_travel_times(
         self,
@@ -86,80 +565,11 @@ class TravelTimeCalculator:
             - Total layover time as a timedelta object.
             - List of individual layover times as timedelta objects.
         """
-        # Reset cumulative variables
-        self.total_air_time = timedelta()
-        self.total_travel_time = timedelta()
-        self.total_layover_time = timedelta()
-        self.layover_times = []
-
-        if not self.flights:
-            return (
-                self.total_air_time,
-                self.total_travel_time,
-                self.total_layover_time,
-                self.layover_times,
-            )
-
-        # Previous flight's arrival datetime in UTC
-        prev_arrival_utc: Optional[datetime] = None
-        initial_departure_utc: Optional[datetime] = None
-        final_arrival_utc: Optional[datetime] = None
-
-        for index, flight in enumerate(self.flights):
-            try:
-                # Create departure datetime in UTC
-                dep_datetime_utc = self._create_datetime(
-                    flight.departure_date,
-                    flight.departure_time,
-                    flight.departure_timezone_utc_offset_in_hours,
-                )
-
-                # Create arrival datetime in UTC
-                arr_datetime_utc = self._create_datetime(
-                    flight.arrival_date,
-                    flight.arrival_time,
-                    flight.arrival_timezone_utc_offset_in_hours,
-                )
-
-                # Validate that arrival is not before departure (allow equal for zero-duration flights)
-                if arr_datetime_utc < dep_datetime_utc:
-                    raise ValueError(
-                        f"Flight {index + 1}: Arrival time cannot be before departure time"
-                    )
-
-                # Calculate layover time if not the first flight
-                if prev_arrival_utc:
-                    if dep_datetime_utc < prev_arrival_utc:
-                        raise ValueError(
-                            f"Flight {index + 1}: Departure time must be after the previous flight's arrival time"
-                        )
-
-                    layover_duration = dep_datetime_utc - prev_arrival_utc
-                    self.layover_times.append(layover_duration)
-                    self.total_layover_time += layover_duration
-
-                # Calculate flight duration
-                flight_duration = arr_datetime_utc - dep_datetime_utc
-                self.total_air_time += flight_duration
-
-                # Set initial departure UTC
-                if index == 0:
-                    initial_departure_utc = dep_datetime_utc
-
-                # Update final arrival UTC
-                final_arrival_utc = arr_datetime_utc
-
-                # Update previous arrival UTC for next iteration
-                prev_arrival_utc = arr_datetime_utc
-
-            except Exception as e:
-                raise ValueError(f"Error processing flight {index + 1}: {str(e)}")
-
-        # Calculate total travel time
-        if initial_departure_utc and final_arrival_utc:
-            self.total_travel_time = final_arrival_utc - initial_departure_utc
-        else:
-            self.total_travel_time = timedelta()
+        result = compute_travel_times(self.flights, self.nonexistent, self.ambiguous)
+        self.total_air_time = result.total_air_time
+        self.total_travel_time = result.total_travel_time
+        self.total_layover_time = result.total_layover_time
+        self.layover_times = list(result.layover_times)
 
         return (
             self.total_air_time,
@@ -176,11 +586,7 @@ class TravelTimeCalculator:
         :param td: timedelta object.
         :return: Formatted string.
         """
-        total_seconds = int(td.total_seconds())
-        hours, remainder = divmod(abs(total_seconds), 3600)
-        minutes = remainder // 60
-        sign = "-" if total_seconds < 0 else ""
-        return f"{sign}{hours} hours {minutes} minutes"
+        return format_timedelta(td)
 
     def add_flight(self, flight: Flight):
         """
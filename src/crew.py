@@ -0,0 +1,183 @@
+"""Crew duty periods, rest periods and rolling block hours over whole rosters"""
+
+from typing import Dict, Hashable, List, Mapping, NamedTuple, Sequence
+
+import numpy as np
+
+from src import zone_offsets
+from src.calculator import Flight
+from src.itinerary_arrays import LegArrays, leg_arrays
+
+DEFAULT_MIN_REST_MINUTES = 10 * 60
+DEFAULT_REPORT_MINUTES = 60
+DEFAULT_DEBRIEF_MINUTES = 30
+DEFAULT_WINDOW_DAYS = (7, 28, 365)
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+class DutyPeriods(NamedTuple):
+    """
+    Duty periods of every crew member, one entry per duty, in roster order.
+
+    Times are UTC minutes since 1970-01-01. A duty runs from the report time
+    before its first sector to the release time after its last one.
+    rest_before is NaN for each crew member's first duty.
+    """
+
+    crew: np.ndarray
+    first_leg: np.ndarray
+    sectors: np.ndarray
+    start: np.ndarray
+    end: np.ndarray
+    block_minutes: np.ndarray
+    rest_before: np.ndarray
+
+    def duty_minutes(self) -> np.ndarray:
+        return self.end - self.start
+
+
+def duty_periods(
+    legs: LegArrays,
+    min_rest_minutes: float = DEFAULT_MIN_REST_MINUTES,
+    report_minutes: float = DEFAULT_REPORT_MINUTES,
+    debrief_minutes: float = DEFAULT_DEBRIEF_MINUTES,
+) -> DutyPeriods:
+    """
+    Split each crew member's sectors into duty periods.
+
+    Consecutive sectors belong to the same duty unless the rest between them,
+    from release after one sector to report for the next, is at least
+    min_rest_minutes.
+
+    :param legs: LegArrays with one itinerary per crew member.
+    :param min_rest_minutes: Shortest rest that ends a duty period.
+    :param report_minutes: Report time before the first sector of a duty.
+    :param debrief_minutes: Release time after the last sector of a duty.
+    :return: DutyPeriods.
+    """
+    count = len(legs.departure)
+    if count == 0:
+        empty_int = np.empty(0, dtype=np.int64)
+        empty = np.empty(0, dtype=np.float64)
+        return DutyPeriods(empty_int, empty_int, empty_int, empty, empty, empty, empty)
+
+    rest = (legs.departure[1:] - report_minutes) - (legs.arrival[:-1] + debrief_minutes)
+    breaks = np.ones(count, dtype=bool)
+    breaks[1:] = (legs.owner[1:] != legs.owner[:-1]) | (rest >= min_rest_minutes)
+
+    first = np.flatnonzero(breaks)
+    last = np.append(first[1:], count) - 1
+    crew = legs.owner[first]
+    start = legs.departure[first] - report_minutes
+    end = legs.arrival[last] + debrief_minutes
+
+    rest_before = np.full(len(first), np.nan)
+    rest_before[1:] = np.where(crew[1:] == crew[:-1], start[1:] - end[:-1], np.nan)
+
+    return DutyPeriods(
+        crew=crew,
+        first_leg=first,
+        sectors=last - first + 1,
+        start=start,
+        end=end,
+        block_minutes=np.add.reduceat(legs.arrival - legs.departure, first),
+        rest_before=rest_before,
+    )
+
+
+def rolling_block_hours(
+    legs: LegArrays, window_days: Sequence[int] = DEFAULT_WINDOW_DAYS
+) -> Dict[int, np.ndarray]:
+    """
+    Block hours each crew member flew in the trailing windows ending at every sector.
+
+    A sector counts towards a window when it arrives inside it. Uses one prefix
+    sum over all legs and a binary search per window, so the cost is linear in
+    the number of legs (plus a log factor) regardless of the window lengths.
+
+    :param legs: LegArrays with one itinerary per crew member.
+    :param window_days: Window lengths in days.
+    :return: Mapping from window length to per-leg block hours.
+    """
+    if len(legs.arrival) == 0:
+        return {days: np.empty(0, dtype=np.float64) for days in window_days}
+
+    cumulative = np.concatenate(([0.0], np.cumsum(legs.arrival - legs.departure)))
+    # Separate crew members on one sorted axis so a single searchsorted serves all
+    longest = max(window_days, default=0) * _MINUTES_PER_DAY
+    arrival = legs.arrival - legs.arrival.min()
+    key = arrival + legs.owner * (arrival.max() + longest + 1.0)
+
+    hours = {}
+    for days in window_days:
+        lower = np.searchsorted(key, key - days * _MINUTES_PER_DAY, side="right")
+        hours[days] = (cumulative[1:] - cumulative[lower]) / 60
+    return hours
+
+
+class RosterReport(NamedTuple):
+    """
+    Duty, rest and block hour figures for a set of crew rosters.
+
+    Crew member k in the arrays is crew_ids[k].
+    """
+
+    crew_ids: List[Hashable]
+    legs: LegArrays
+    duties: DutyPeriods
+    block_hours: Dict[int, np.ndarray]
+
+    def peak_block_hours(self, days: int) -> np.ndarray:
+        """
+        Highest rolling block hours per crew member for one window length.
+        """
+        peaks = np.zeros(len(self.crew_ids))
+        np.maximum.at(peaks, self.legs.owner, self.block_hours[days])
+        return peaks
+
+    def shortest_rest_minutes(self) -> np.ndarray:
+        """
+        Shortest rest between duties per crew member; NaN with a single duty.
+        """
+        shortest = np.full(len(self.crew_ids), np.nan)
+        np.fmin.at(shortest, self.duties.crew, self.duties.rest_before)
+        return shortest
+
+
+def evaluate_rosters(
+    rosters: Mapping[Hashable, Sequence[Flight]],
+    min_rest_minutes: float = DEFAULT_MIN_REST_MINUTES,
+    report_minutes: float = DEFAULT_REPORT_MINUTES,
+    debrief_minutes: float = DEFAULT_DEBRIEF_MINUTES,
+    window_days: Sequence[int] = DEFAULT_WINDOW_DAYS,
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> RosterReport:
+    """
+    Evaluate many crew rosters at once.
+
+    Each roster is validated by the calculator's layover checks, then duty
+    periods, rest periods and rolling block hours are computed over all crew
+    members together.
+
+    :param rosters: Mapping from crew member id to their sectors in flight order.
+    :param min_rest_minutes: Shortest rest that ends a duty period.
+    :param report_minutes: Report time before the first sector of a duty.
+    :param debrief_minutes: Release time after the last sector of a duty.
+    :param window_days: Rolling window lengths in days.
+    :param nonexistent: Policy for skipped local times, see compute_travel_times.
+    :param ambiguous: Policy for repeated local times, see compute_travel_times.
+    :return: RosterReport.
+    :raises ValueError: If a roster has overlapping or invalid sectors.
+    """
+    crew_ids = list(rosters)
+    legs = leg_arrays(
+        (rosters[crew_id] for crew_id in crew_ids), nonexistent, ambiguous
+    )
+    return RosterReport(
+        crew_ids=crew_ids,
+        legs=legs,
+        duties=duty_periods(legs, min_rest_minutes, report_minutes, debrief_minutes),
+        block_hours=rolling_block_hours(legs, window_days),
+    )
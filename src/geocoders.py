@@ -0,0 +1,420 @@
+"""Geocoder providers with ordered failover, circuit breaking and hedged requests
+
+Any object with geopy's ``geocode(query, exactly_one=..., limit=...)`` method
+is a provider, so geopy geocoders such as Nominatim plug in unchanged.
+FailoverGeocoder exposes the same method and can be passed wherever a geopy
+geolocator is expected.
+"""
+
+import random
+import statistics
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Union,
+)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class GeocoderUnavailableError(Exception):
+    """
+    Raised when no provider produced an answer.
+    """
+
+
+class FakeLocation(NamedTuple):
+    """
+    Location with the attributes geopy's Location offers to this package.
+    """
+
+    address: str
+    latitude: float
+    longitude: float
+
+
+class FakeProvider:
+    """
+    In-process provider for offline tests and benchmarks.
+
+    Answers from a fixed table after a configurable delay and can be made to
+    fail at random.
+    """
+
+    def __init__(
+        self,
+        places: Mapping[str, Sequence[FakeLocation]],
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        seed: Optional[int] = None,
+        name: str = "fake",
+    ):
+        """
+        Args:
+            places (mapping): Query to locations, best match first.
+            latency (float or callable): Seconds to sleep per request, or a
+                function of the query returning them.
+            failure_rate (float): Probability of raising ConnectionError.
+            seed (int, optional): Seed for the failure draws.
+            name (str): Provider name used in statistics.
+        """
+        self.places = places
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.name = name
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def geocode(
+        self, query: str, exactly_one: bool = True, limit: Optional[int] = None
+    ):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+        delay = self.latency(query) if callable(self.latency) else self.latency
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise ConnectionError(f"{self.name} failed to geocode {query!r}")
+        locations = list(self.places.get(query, ()))[:limit]
+        if not locations:
+            return None
+        return locations[0] if exactly_one else locations
+
+
+class CircuitBreaker:
+    """
+    Stops sending requests to a provider that keeps failing or has become slow.
+
+    Opens after failure_threshold consecutive failures, or when the median of
+    the last latency_window successful latencies exceeds latency_threshold.
+    After reset_after seconds one probe request is let through (half-open); its
+    outcome closes or re-opens the circuit. A probe whose outcome is never
+    recorded stops blocking after another reset_after seconds.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 3,
+        latency_threshold: Optional[float] = None,
+        latency_window: int = 10,
+        reset_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.reset_after = reset_after
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._latencies: deque = deque(maxlen=latency_window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._probe_started = 0.0
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """
+        Returns:
+            bool: Whether a request may be sent now.
+        """
+        with self._lock:
+            now = self._clock()
+            if self.state == OPEN and now - self._opened_at >= self.reset_after:
+                self.state = HALF_OPEN
+                self._probing = False
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and (
+                not self._probing or now - self._probe_started >= self.reset_after
+            ):
+                self._probing = True
+                self._probe_started = now
+                return True
+            return False
+
+    def _open(self):
+        self.state = OPEN
+        self._opened_at = self._clock()
+        self._probing = False
+
+    def record_success(self, latency: float):
+        with self._lock:
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self._latencies.clear()
+            self._latencies.append(latency)
+            if (
+                self.latency_threshold is not None
+                and len(self._latencies) == self._latencies.maxlen
+                and statistics.median(self._latencies) > self.latency_threshold
+            ):
+                self._open()
+                self._latencies.clear()
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN or (
+                self.consecutive_failures >= self.failure_threshold
+            ):
+                self._open()
+
+
+class _ProviderStats:
+    def __init__(self):
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.skipped = 0
+
+
+class FailoverGeocoder:
+    """
+    Tries providers in order, with a timeout per request.
+
+    When hedge_after is set and the current provider has not answered within
+    that many seconds, the next provider is asked as well and the first
+    successful answer wins. Providers with an open circuit are skipped.
+
+    Each provider runs on its own threads and has at most max_in_flight
+    requests outstanding, so a hung provider cannot starve the others. A
+    provider with no free slot is skipped without counting against its
+    circuit; only the last provider waits up to its timeout for a slot. A
+    request's timeout starts when the provider is called, not when queued.
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[Any],
+        timeout: Union[float, Sequence[float]] = 5.0,
+        hedge_after: Optional[float] = None,
+        breaker_factory: Callable[[], CircuitBreaker] = CircuitBreaker,
+        max_in_flight: int = 8,
+    ):
+        """
+        Args:
+            providers (sequence): Geocoders in order of preference.
+            timeout (float or sequence): Seconds to wait for each provider, or
+                one value per provider.
+            hedge_after (float, optional): Seconds after which the next provider
+                is asked in parallel; None disables hedging.
+            breaker_factory (callable): Creates one CircuitBreaker per provider.
+            max_in_flight (int): Outstanding requests allowed per provider.
+        """
+        if not providers:
+            raise ValueError("At least one geocoder provider is required")
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.providers = list(providers)
+        if isinstance(timeout, (int, float)):
+            self.timeouts = [float(timeout)] * len(self.providers)
+        else:
+            self.timeouts = [float(seconds) for seconds in timeout]
+            if len(self.timeouts) != len(self.providers):
+                raise ValueError(
+                    f"Expected {len(self.providers)} timeouts, got {len(self.timeouts)}"
+                )
+        self.hedge_after = hedge_after
+        self.max_in_flight = max_in_flight
+        self.breakers = [breaker_factory() for _ in self.providers]
+        self._stats = [_ProviderStats() for _ in self.providers]
+        self._executors = [
+            ThreadPoolExecutor(
+                max_workers=max_in_flight, thread_name_prefix=f"geocoder-{index}"
+            )
+            for index in range(len(self.providers))
+        ]
+        self._slots = [threading.BoundedSemaphore(max_in_flight) for _ in self.providers]
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """
+        Stop the worker threads without waiting for abandoned requests.
+        """
+        for executor in self._executors:
+            executor.shutdown(wait=False)
+
+    def provider_name(self, index: int) -> str:
+        provider = self.providers[index]
+        return getattr(provider, "name", None) or f"{type(provider).__name__}[{index}]"
+
+    def _count(self, index: int, field: str):
+        with self._lock:
+            setattr(self._stats[index], field, getattr(self._stats[index], field) + 1)
+
+    def _call(self, index: int, began: List[float], query: str, **kwargs):
+        began.append(time.monotonic())
+        try:
+            return self.providers[index].geocode(query, **kwargs)
+        finally:
+            self._slots[index].release()
+
+    def geocode(
+        self, query: str, exactly_one: bool = True, limit: Optional[int] = None
+    ):
+        """
+        Geocode with the first provider that answers in time.
+
+        Args:
+            query (str): Place to look up.
+            exactly_one (bool): Return a single location instead of a list.
+            limit (int, optional): Maximum number of locations.
+
+        Returns:
+            The winning provider's answer, unchanged.
+
+        Raises:
+            GeocoderUnavailableError: If every available provider failed, timed
+                out or has an open circuit.
+        """
+        remaining = iter(range(len(self.providers)))
+        pending: Dict[Future, int] = {}
+        began: Dict[Future, List[float]] = {}
+        errors: List[str] = []
+        last_launch = 0.0
+        exhausted = False
+
+        def launch(hedge: bool = False):
+            nonlocal last_launch, exhausted
+            for index in remaining:
+                # Take the slot first so a saturated provider does not use up
+                # its half-open probe; the last resort waits for one instead
+                if index == len(self.providers) - 1 and not pending:
+                    acquired = self._slots[index].acquire(timeout=self.timeouts[index])
+                else:
+                    acquired = self._slots[index].acquire(blocking=False)
+                if not acquired:
+                    self._count(index, "skipped")
+                    errors.append(f"{self.provider_name(index)}: saturated")
+                    continue
+                if not self.breakers[index].allow():
+                    self._slots[index].release()
+                    self._count(index, "skipped")
+                    errors.append(f"{self.provider_name(index)}: circuit open")
+                    continue
+                self._count(index, "requests")
+                if hedge:
+                    self._count(index, "hedges")
+                began_at: List[float] = []
+                future = self._executors[index].submit(
+                    self._call,
+                    index,
+                    began_at,
+                    query,
+                    exactly_one=exactly_one,
+                    limit=limit,
+                )
+                pending[future] = index
+                began[future] = began_at
+                last_launch = time.monotonic()
+                return
+            exhausted = True
+
+        def started(future: Future) -> float:
+            # A request still waiting for its worker thread has not started
+            return began[future][0] if began[future] else time.monotonic()
+
+        launch()
+        while pending:
+            now = time.monotonic()
+            deadline = min(
+                started(future) + self.timeouts[index]
+                for future, index in pending.items()
+            )
+            wake = deadline
+            can_hedge = self.hedge_after is not None and not exhausted
+            if can_hedge:
+                wake = min(wake, last_launch + self.hedge_after)
+            done, _ = wait(
+                pending, timeout=max(wake - now, 0), return_when=FIRST_COMPLETED
+            )
+
+            for future in done:
+                index = pending.pop(future)
+                latency = time.monotonic() - started(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    self.breakers[index].record_failure()
+                    self._count(index, "failures")
+                    errors.append(f"{self.provider_name(index)}: {e}")
+                    if not pending:
+                        launch()
+                    continue
+                self.breakers[index].record_success(latency)
+                self._count(index, "successes")
+                # Losing requests still report to their breakers, otherwise a
+                # half-open probe that loses a hedge would never be resolved
+                for future, index in pending.items():
+                    future.add_done_callback(
+                        partial(self._record_late, index, began[future])
+                    )
+                return result
+
+            now = time.monotonic()
+            expired = [
+                future
+                for future, index in pending.items()
+                if now - started(future) >= self.timeouts[index]
+            ]
+            for future in expired:
+                index = pending.pop(future)
+                self.breakers[index].record_failure()
+                self._count(index, "timeouts")
+                errors.append(f"{self.provider_name(index)}: timed out")
+            if not pending:
+                launch()
+            elif can_hedge and now - last_launch >= self.hedge_after:
+                launch(hedge=True)
+
+        raise GeocoderUnavailableError(
+            f"No geocoder could resolve {query!r}: " + "; ".join(errors)
+        )
+
+    def _record_late(self, index: int, began: List[float], future: Future):
+        if future.cancelled():
+            return
+        if future.exception() is not None:
+            self.breakers[index].record_failure()
+            self._count(index, "failures")
+        else:
+            self.breakers[index].record_success(time.monotonic() - began[0])
+            self._count(index, "successes")
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            dict: Per provider name, request outcome counts and circuit state.
+        """
+        with self._lock:
+            return {
+                self.provider_name(index): {
+                    **vars(stats),
+                    "circuit": self.breakers[index].state,
+                }
+                for index, stats in enumerate(self._stats)
+            }
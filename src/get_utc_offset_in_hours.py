@@ -1,26 +1,99 @@
 from datetime import datetime
+from time import perf_counter
+from typing import NamedTuple
 
 import pytz
 from timezonefinder import TimezoneFinder
 from geopy.geocoders import Nominatim
 
+from src.instrumentation import metrics
 
-def get_timezone_with_suggestions(place_name):
+_geocoder_calls = metrics.counter(
+    "timezone_geocoder_calls_total", "Requests made to the geocoding service."
+)
+_geocoder_seconds = metrics.histogram(
+    "timezone_geocoder_seconds", "Latency of geocoding service requests."
+)
+
+
+class ResolvedPlace(NamedTuple):
+    """
+    A geocoded place and the IANA timezone it lies in.
+    """
+
+    timezone_name: str
+    latitude: float
+    longitude: float
+
+
+def _geocode(geolocator, query):
+    """
+    Geocode a query, recording call counts and latency when instrumentation is on.
+    """
+    if not metrics.enabled:
+        return geolocator.geocode(query, exactly_one=False, limit=3)
+
+    started = perf_counter()
+    try:
+        return geolocator.geocode(query, exactly_one=False, limit=3)
+    finally:
+        _geocoder_calls.inc()
+        _geocoder_seconds.observe(perf_counter() - started)
+
+
+def get_utc_offset_hours(timezone_name):
+    """
+    Get the current UTC offset in hours of a timezone.
+
+    Args:
+        timezone_name (str): IANA timezone name (e.g., "Africa/Luanda").
+
+    Returns:
+        float: The UTC offset in hours right now.
+    """
+    now = datetime.now(pytz.timezone(timezone_name))
+    return now.utcoffset().total_seconds() / 3600
+
+
+def get_timezone_with_suggestions(place_name, geolocator=None):
     """
     Get the timezone and UTC offset in hours for a given place name.
     If the place name is invalid, suggest the nearest possible matches.
 
     Args:
         place_name (str): The name of the place (e.g., "New York").
+        geolocator (optional): Geocoder with geopy's geocode method, e.g. a
+            FailoverGeocoder. Defaults to Nominatim.
 
     Returns:
         tuple: A tuple containing the timezone name and the UTC offset in hours.
     """
-    geolocator = Nominatim(user_agent="timezone_locator")
+    place = resolve_place_with_suggestions(place_name, geolocator=geolocator)
+    return place.timezone_name, get_utc_offset_hours(place.timezone_name)
+
+
+def resolve_place_with_suggestions(place_name, timezone_finder=None, geolocator=None):
+    """
+    Geocode a place name and find the timezone it lies in.
+    If the place name is invalid, suggest the nearest possible matches.
+
+    Args:
+        place_name (str): The name of the place (e.g., "New York").
+        timezone_finder (optional): Object with TimezoneFinder's
+            timezone_at(lng=, lat=), e.g. a TimezoneGrid. Defaults to a new
+            TimezoneFinder.
+        geolocator (optional): Geocoder with geopy's geocode method, e.g. a
+            FailoverGeocoder. Defaults to Nominatim.
+
+    Returns:
+        ResolvedPlace: The timezone name and coordinates of the best match.
+    """
+    if geolocator is None:
+        geolocator = Nominatim(user_agent="timezone_locator")
 
     try:
         # Try to geocode the location
-        location = geolocator.geocode(place_name, exactly_one=False, limit=3)
+        location = _geocode(geolocator, place_name)
 
         if not location:
             raise ValueError(f"Could not find the location: {place_name}")
@@ -31,17 +104,12 @@ def get_timezone_with_suggestions(place_name):
         longitude = best_match.longitude
 
         # Get the timezone using TimezoneFinder
-        tf = TimezoneFinder()
+        tf = TimezoneFinder() if timezone_finder is None else timezone_finder
         timezone_name = tf.timezone_at(lng=longitude, lat=latitude)
         if not timezone_name:
             raise ValueError(f"Could not determine the timezone for {place_name}")
 
-        # Get the UTC offset in hours
-        timezone = pytz.timezone(timezone_name)
-        now = datetime.now(timezone)
-        utc_offset_hours = now.utcoffset().total_seconds() / 3600
-
-        return timezone_name, utc_offset_hours
+        return ResolvedPlace(timezone_name, latitude, longitude)
 
     except ValueError as original_error:
         # If the original error was from geocoding failure, provide suggestions
@@ -54,9 +122,7 @@ def get_timezone_with_suggestions(place_name):
 
                 for word in words:
                     if len(word) > 2:  # Skip very short words
-                        partial_matches = geolocator.geocode(
-                            word, exactly_one=False, limit=3
-                        )
+                        partial_matches = _geocode(geolocator, word)
                         if partial_matches:
                             suggestions.extend(
                                 [
@@ -86,11 +152,12 @@ def get_timezone_with_suggestions(place_name):
 
 
 # Example usage
-try:
-    place_name = "Luanda Angola"  # Capital of Angola
-    timezone_name, utc_offset_hours = get_timezone_with_suggestions(place_name)
-    print(
-        f"The timezone for {place_name} is {timezone_name}, and the UTC offset is {utc_offset_hours} hours."
-    )
-except ValueError as e:
-    print(e)
+if __name__ == "__main__":
+    try:
+        place_name = "Luanda Angola"  # Capital of Angola
+        timezone_name, utc_offset_hours = get_timezone_with_suggestions(place_name)
+        print(
+            f"The timezone for {place_name} is {timezone_name}, and the UTC offset is {utc_offset_hours} hours."
+        )
+    except ValueError as e:
+        print(e)
@@ -0,0 +1,183 @@
+"""Opt-in counters and latency histograms for the calculator and timezone pipeline
+
+Instrumentation is disabled by default. Instrumented code checks
+``metrics.enabled`` before doing any work, so the disabled cost is one
+attribute lookup per call site.
+"""
+
+import threading
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Union
+
+DEFAULT_BUCKETS = (
+    1e-6,
+    5e-6,
+    1e-5,
+    5e-5,
+    1e-4,
+    5e-4,
+    1e-3,
+    5e-3,
+    0.01,
+    0.05,
+    0.1,
+    0.5,
+    1.0,
+    5.0,
+    10.0,
+)
+
+
+class Counter:
+    """
+    Monotonically increasing count.
+    """
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1):
+        with self._lock:
+            self.value += amount
+
+    def reset(self):
+        with self._lock:
+            self.value = 0
+
+    def snapshot(self) -> int:
+        return self.value
+
+    def to_prometheus(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} counter",
+            f"{self.name} {self.value}",
+        ]
+
+
+class Histogram:
+    """
+    Latency histogram with fixed upper bucket bounds in seconds.
+    """
+
+    def __init__(
+        self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self.reset()
+
+    def observe(self, value: float):
+        """
+        Record one observation.
+
+        :param value: Observed value, normally a duration in seconds.
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            # The extra last slot is the +Inf bucket
+            self.bucket_counts[index] += 1
+            self.count += 1
+            self.sum += value
+
+    def reset(self):
+        with self._lock:
+            self.bucket_counts = [0] * (len(self.buckets) + 1)
+            self.count = 0
+            self.sum = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative = 0
+        buckets = {}
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            buckets[bound] = cumulative
+        buckets[float("inf")] = self.count
+        return {"count": self.count, "sum": self.sum, "buckets": buckets}
+
+    def to_prometheus(self) -> List[str]:
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for bound, cumulative in snapshot["buckets"].items():
+            label = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{self.name}_bucket{{le="{label}"}} {cumulative}')
+        lines.append(f"{self.name}_sum {snapshot['sum']}")
+        lines.append(f"{self.name}_count {snapshot['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    Named collection of counters and histograms with a global on/off switch.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self._metrics: Dict[str, Union[Counter, Histogram]] = {}
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """
+        Register a counter, or return the existing one with that name.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Counter(name, help_text)
+        return self._metrics[name]
+
+    def histogram(
+        self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        """
+        Register a histogram, or return the existing one with that name.
+        """
+        if name not in self._metrics:
+            self._metrics[name] = Histogram(name, help_text, buckets)
+        return self._metrics[name]
+
+    def reset(self):
+        """
+        Zero every metric without unregistering it.
+        """
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return every metric as plain Python data.
+
+        :return: Mapping from metric name to a count or a histogram mapping.
+        """
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    def to_prometheus(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.to_prometheus())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+def enable():
+    """
+    Start recording metrics.
+    """
+    metrics.enabled = True
+
+
+def disable():
+    """
+    Stop recording metrics; recorded values are kept.
+    """
+    metrics.enabled = False
@@ -0,0 +1,85 @@
+"""Flat numpy arrays of many itineraries' legs for vectorized evaluation"""
+
+from datetime import datetime, timedelta
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+
+from src import zone_offsets
+from src.calculator import Flight, iter_travel_events
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MINUTE = timedelta(minutes=1)
+
+
+class LegArrays(NamedTuple):
+    """
+    Legs of many itineraries flattened into parallel arrays, one entry per leg.
+
+    The legs of itinerary k are ``bounds[k]:bounds[k + 1]``, in flight order.
+    Times are UTC minutes since 1970-01-01; offsets are UTC offsets in hours.
+    """
+
+    owner: np.ndarray
+    departure: np.ndarray
+    arrival: np.ndarray
+    departure_offset: np.ndarray
+    arrival_offset: np.ndarray
+    bounds: np.ndarray
+
+    @property
+    def itinerary_count(self) -> int:
+        return len(self.bounds) - 1
+
+    def legs_per_itinerary(self) -> np.ndarray:
+        return np.diff(self.bounds)
+
+
+def _minutes(utc: datetime) -> float:
+    return (utc - _EPOCH) / _ONE_MINUTE
+
+
+def leg_arrays(
+    itineraries: Iterable[Iterable[Flight]],
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> LegArrays:
+    """
+    Convert itineraries to LegArrays, validating each one on the way.
+
+    Every itinerary goes through iter_travel_events, so legs are checked and
+    offsets resolved exactly as compute_travel_times does.
+
+    :param itineraries: Iterable of itineraries, each an iterable of Flight objects.
+    :param nonexistent: Policy for skipped local times, see compute_travel_times.
+    :param ambiguous: Policy for repeated local times, see compute_travel_times.
+    :return: LegArrays holding every leg.
+    :raises ValueError: If a leg is invalid; the message names the itinerary.
+    """
+    owner: List[int] = []
+    departure: List[float] = []
+    arrival: List[float] = []
+    departure_offset: List[float] = []
+    arrival_offset: List[float] = []
+    bounds = [0]
+
+    for index, flights in enumerate(itineraries):
+        try:
+            for event in iter_travel_events(flights, nonexistent, ambiguous):
+                departure.append(_minutes(event.departure_utc))
+                arrival.append(_minutes(event.arrival_utc))
+                departure_offset.append(event.departure_offset)
+                arrival_offset.append(event.arrival_offset)
+        except ValueError as e:
+            raise ValueError(f"Itinerary {index}: {e}")
+        owner.extend([index] * (len(departure) - bounds[-1]))
+        bounds.append(len(departure))
+
+    return LegArrays(
+        owner=np.array(owner, dtype=np.int64),
+        departure=np.array(departure, dtype=np.float64),
+        arrival=np.array(arrival, dtype=np.float64),
+        departure_offset=np.array(departure_offset, dtype=np.float64),
+        arrival_offset=np.array(arrival_offset, dtype=np.float64),
+        bounds=np.array(bounds, dtype=np.int64),
+    )
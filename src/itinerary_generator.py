@@ -0,0 +1,186 @@
+"""Deterministic synthetic itinerary generator for tests and benchmarks"""
+
+import random
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from src.calculator import Flight
+
+COMMON_UTC_OFFSETS = (-8, -5, -3, 0, 1, 2, 3, 4, 5.5, 8, 9, 10)
+
+# Extremes of the offset range plus the half- and three-quarter-hour zones
+EDGE_UTC_OFFSETS = (-14, -12, -9.5, -3.5, 0, 5.75, 8.75, 12.75, 13, 14)
+
+
+def _local_date_time(utc: datetime, offset: float):
+    local = utc + timedelta(hours=offset)
+    return local.strftime("%Y-%m-%d"), local.strftime("%H:%M")
+
+
+def generate_itinerary(
+    rng: random.Random,
+    legs: int,
+    start: datetime,
+    offsets: Sequence[float] = COMMON_UTC_OFFSETS,
+    min_flight_minutes: int = 30,
+    max_flight_minutes: int = 18 * 60,
+    min_layover_minutes: int = 30,
+    max_layover_minutes: int = 24 * 60,
+) -> List[Flight]:
+    """
+    Generate one valid itinerary of consecutive legs.
+
+    :param rng: Random number generator, seeded by the caller for determinism.
+    :param legs: Number of flights in the itinerary.
+    :param start: Earliest possible UTC departure of the first flight.
+    :param offsets: UTC offsets in hours to draw each city's timezone from.
+    :param min_flight_minutes: Shortest flight duration.
+    :param max_flight_minutes: Longest flight duration.
+    :param min_layover_minutes: Shortest layover.
+    :param max_layover_minutes: Longest layover.
+    :return: List of Flight objects.
+    """
+    flights = []
+    departure_utc = start + timedelta(minutes=rng.randrange(0, 7 * 24 * 60))
+    city_index = rng.randrange(10_000)
+    departure_offset = rng.choice(offsets)
+
+    for _ in range(legs):
+        arrival_utc = departure_utc + timedelta(
+            minutes=rng.randint(min_flight_minutes, max_flight_minutes)
+        )
+        arrival_offset = rng.choice(offsets)
+        departure_date, departure_time = _local_date_time(
+            departure_utc, departure_offset
+        )
+        arrival_date, arrival_time = _local_date_time(arrival_utc, arrival_offset)
+        flights.append(
+            Flight(
+                departure_city=f"City {city_index}",
+                departure_date=departure_date,
+                departure_time=departure_time,
+                departure_timezone_utc_offset_in_hours=departure_offset,
+                arrival_city=f"City {city_index + 1}",
+                arrival_date=arrival_date,
+                arrival_time=arrival_time,
+                arrival_timezone_utc_offset_in_hours=arrival_offset,
+            )
+        )
+        city_index += 1
+        departure_offset = arrival_offset
+        departure_utc = arrival_utc + timedelta(
+            minutes=rng.randint(min_layover_minutes, max_layover_minutes)
+        )
+
+    return flights
+
+
+def generate_itineraries(
+    count: int,
+    seed: int = 0,
+    min_legs: int = 1,
+    max_legs: int = 4,
+    start: Optional[datetime] = None,
+    span_days: int = 365,
+    offsets: Sequence[float] = COMMON_UTC_OFFSETS,
+    year_end_fraction: float = 0.0,
+) -> List[List[Flight]]:
+    """
+    Generate a reproducible corpus of valid itineraries.
+
+    :param count: Number of itineraries.
+    :param seed: Seed; the same seed always yields the same corpus.
+    :param min_legs: Fewest flights per itinerary.
+    :param max_legs: Most flights per itinerary.
+    :param start: Earliest UTC departure (defaults to 2024-01-01).
+    :param span_days: First departures are spread over this many days after start.
+    :param offsets: UTC offsets in hours to draw each city's timezone from.
+    :param year_end_fraction: Share of itineraries starting in the last days of
+        a year, so they roll over days, months and the year.
+    :return: List of itineraries, each a list of Flight objects.
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1)
+    itineraries = []
+    for _ in range(count):
+        if rng.random() < year_end_fraction:
+            year = start.year + rng.randrange(max(1, span_days // 365))
+            # generate_itinerary adds up to a week, so this lands around New Year
+            first_departure = datetime(year, 12, 25)
+        else:
+            first_departure = start + timedelta(days=rng.randrange(span_days))
+        itineraries.append(
+            generate_itinerary(
+                rng,
+                rng.randint(min_legs, max_legs),
+                first_departure,
+                offsets=offsets,
+            )
+        )
+    return itineraries
+
+
+def generate_schedule(
+    flight_count: int,
+    seed: int = 0,
+    city_count: int = 50,
+    hub_count: int = 5,
+    start: Optional[datetime] = None,
+    span_days: int = 7,
+    offsets: Sequence[float] = COMMON_UTC_OFFSETS,
+    min_flight_minutes: int = 45,
+    max_flight_minutes: int = 12 * 60,
+) -> List[Flight]:
+    """
+    Generate a reproducible flight schedule over a hub-and-spoke network.
+
+    Every flight touches a hub at one end at least, so any two cities connect
+    through one or two hubs. Each city keeps a single UTC offset.
+
+    :param flight_count: Number of flights.
+    :param seed: Seed; the same seed always yields the same schedule.
+    :param city_count: Number of cities, named 'City 0' onwards.
+    :param hub_count: The first hub_count cities are hubs.
+    :param start: Earliest UTC departure (defaults to 2024-01-01).
+    :param span_days: Departures are spread over this many days after start.
+    :param offsets: UTC offsets in hours to draw each city's timezone from.
+    :param min_flight_minutes: Shortest flight duration.
+    :param max_flight_minutes: Longest flight duration.
+    :return: List of Flight objects in no particular order.
+    """
+    rng = random.Random(seed)
+    start = start or datetime(2024, 1, 1)
+    hub_count = max(1, min(hub_count, city_count - 1))
+    city_offsets = [rng.choice(offsets) for _ in range(city_count)]
+    flights = []
+    for _ in range(flight_count):
+        hub = rng.randrange(hub_count)
+        other = rng.randrange(city_count - 1)
+        if other >= hub:
+            other += 1
+        departure_city, arrival_city = (
+            (hub, other) if rng.random() < 0.5 else (other, hub)
+        )
+        departure_utc = start + timedelta(minutes=rng.randrange(span_days * 24 * 60))
+        arrival_utc = departure_utc + timedelta(
+            minutes=rng.randint(min_flight_minutes, max_flight_minutes)
+        )
+        departure_date, departure_time = _local_date_time(
+            departure_utc, city_offsets[departure_city]
+        )
+        arrival_date, arrival_time = _local_date_time(
+            arrival_utc, city_offsets[arrival_city]
+        )
+        flights.append(
+            Flight(
+                departure_city=f"City {departure_city}",
+                departure_date=departure_date,
+                departure_time=departure_time,
+                departure_timezone_utc_offset_in_hours=city_offsets[departure_city],
+                arrival_city=f"City {arrival_city}",
+                arrival_date=arrival_date,
+                arrival_time=arrival_time,
+                arrival_timezone_utc_offset_in_hours=city_offsets[arrival_city],
+            )
+        )
+    return flights
@@ -0,0 +1,108 @@
+"""Vectorized travel totals and jet-lag metrics for many itineraries at once"""
+
+from typing import Iterable, NamedTuple
+
+import numpy as np
+
+from src import zone_offsets
+from src.calculator import Flight
+from src.itinerary_arrays import LegArrays, leg_arrays
+
+EAST = 1
+WEST = -1
+NO_SHIFT = 0
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+class ItineraryMetrics(NamedTuple):
+    """
+    Per-itinerary figures, index k describing itinerary k.
+
+    Durations are in minutes and timezone shifts in hours. Empty itineraries
+    get zero totals and shifts and a NaN final arrival hour.
+
+    - net_shift_hours: final arrival offset minus first departure offset.
+    - cumulative_shift_hours: sum of every offset change along the way,
+      including changes between an arrival and the next departure.
+    - direction: EAST, WEST or NO_SHIFT by the sign of the net shift.
+    - final_arrival_local_hour: local time of day of the last arrival, in hours.
+    - arrival_hour_counts: (itineraries, 24) counts of leg arrivals per local hour.
+    """
+
+    air_minutes: np.ndarray
+    layover_minutes: np.ndarray
+    travel_minutes: np.ndarray
+    net_shift_hours: np.ndarray
+    cumulative_shift_hours: np.ndarray
+    direction: np.ndarray
+    final_arrival_local_hour: np.ndarray
+    arrival_hour_counts: np.ndarray
+
+
+def itinerary_metrics(legs: LegArrays) -> ItineraryMetrics:
+    """
+    Compute totals and jet-lag metrics for every itinerary in one set of arrays.
+
+    :param legs: LegArrays, e.g. from leg_arrays.
+    :return: ItineraryMetrics.
+    """
+    count = legs.itinerary_count
+    owner = legs.owner
+    air = np.bincount(owner, weights=legs.arrival - legs.departure, minlength=count)
+
+    nonempty = legs.bounds[1:] > legs.bounds[:-1]
+    first = legs.bounds[:-1][nonempty]
+    last = legs.bounds[1:][nonempty] - 1
+
+    travel = np.zeros(count)
+    travel[nonempty] = legs.arrival[last] - legs.departure[first]
+    net_shift = np.zeros(count)
+    net_shift[nonempty] = legs.arrival_offset[last] - legs.departure_offset[first]
+
+    # In-flight offset changes plus changes between connecting legs
+    shifts = np.abs(legs.arrival_offset - legs.departure_offset)
+    connection = np.abs(legs.departure_offset[1:] - legs.arrival_offset[:-1])
+    connection[owner[1:] != owner[:-1]] = 0.0
+    shifts[1:] += connection
+    cumulative_shift = np.bincount(owner, weights=shifts, minlength=count)
+
+    local_arrival = np.mod(legs.arrival + legs.arrival_offset * 60, _MINUTES_PER_DAY)
+    local_hour = local_arrival / 60
+    final_hour = np.full(count, np.nan)
+    final_hour[nonempty] = local_hour[last]
+    hour_bins = np.minimum(local_arrival // 60, 23).astype(np.int64)
+    arrival_hour_counts = np.bincount(
+        owner * 24 + hour_bins, minlength=count * 24
+    ).reshape(count, 24)
+
+    return ItineraryMetrics(
+        air_minutes=air,
+        layover_minutes=travel - air,
+        travel_minutes=travel,
+        net_shift_hours=net_shift,
+        cumulative_shift_hours=cumulative_shift,
+        direction=np.sign(net_shift).astype(np.int64),
+        final_arrival_local_hour=final_hour,
+        arrival_hour_counts=arrival_hour_counts,
+    )
+
+
+def evaluate_itineraries(
+    itineraries: Iterable[Iterable[Flight]],
+    nonexistent: str = zone_offsets.RAISE,
+    ambiguous: str = zone_offsets.RAISE,
+) -> ItineraryMetrics:
+    """
+    Validate itineraries and compute their totals and jet-lag metrics in one scan.
+
+    Each itinerary is read once; everything after the conversion to arrays is
+    vectorized, so ranking by e.g. cumulative shift costs no extra pass.
+
+    :param itineraries: Iterable of itineraries, each an iterable of Flight objects.
+    :param nonexistent: Policy for skipped local times, see compute_travel_times.
+    :param ambiguous: Policy for repeated local times, see compute_travel_times.
+    :return: ItineraryMetrics.
+    :raises ValueError: If a leg is invalid; the message names the itinerary.
+    """
+    return itinerary_metrics(leg_arrays(itineraries, nonexistent, ambiguous))
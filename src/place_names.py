@@ -0,0 +1,76 @@
+"""Canonical forms of place names so spelling variants share cache entries"""
+
+import re
+import unicodedata
+from typing import Mapping, Optional
+
+_SEPARATORS = re.compile(r"[\W_]+")
+
+# Common alternative names, keyed and valued by canonical form. Country
+# qualifiers stay part of the key, since cities such as Cordoba or Perth exist
+# in several countries; a qualified spelling only shares an entry with the
+# bare name through an alias listed here.
+DEFAULT_ALIASES = {
+    "sao paulo brazil": "sao paulo",
+    "nyc": "new york",
+    "new york city": "new york",
+    "sf": "san francisco",
+    "st petersburg": "saint petersburg",
+    "bombay": "mumbai",
+    "peking": "beijing",
+    "saigon": "ho chi minh city",
+}
+
+
+def normalize_place_name(place_name: str) -> str:
+    """
+    Normalize spelling without applying aliases.
+
+    Casefolds, strips accents and turns runs of punctuation and whitespace into
+    single spaces, so "São Paulo", "Sao Paulo " and "sao-paulo" all become
+    "sao paulo".
+
+    Args:
+        place_name (str): The name of the place.
+
+    Returns:
+        str: The normalized name.
+    """
+    decomposed = unicodedata.normalize("NFKD", place_name.casefold())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(" ", stripped).strip()
+
+
+def canonical_place_name(
+    place_name: str, aliases: Optional[Mapping[str, str]] = None
+) -> str:
+    """
+    Canonical cache key of a place name.
+
+    Args:
+        place_name (str): The name of the place.
+        aliases (mapping, optional): Normalized alternative name to normalized
+            preferred name. Defaults to DEFAULT_ALIASES.
+
+    Returns:
+        str: The normalized name, replaced by its alias target if it has one.
+    """
+    aliases = DEFAULT_ALIASES if aliases is None else aliases
+    normalized = normalize_place_name(place_name)
+    return aliases.get(normalized, normalized)
+
+
+def normalize_aliases(aliases: Mapping[str, str]) -> dict:
+    """
+    Normalize both sides of an alias table so lookups match canonical keys.
+
+    Args:
+        aliases (mapping): Alternative name to preferred name, in any spelling.
+
+    Returns:
+        dict: The same table in normalized form.
+    """
+    return {
+        normalize_place_name(alias): normalize_place_name(target)
+        for alias, target in aliases.items()
+    }
@@ -0,0 +1,184 @@
+"""Result cache for repeated itineraries keyed by a canonical leg fingerprint"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from operator import attrgetter
+from typing import Dict, Hashable, Optional, Sequence, Tuple
+
+from src.calculator import (
+    Flight,
+    TravelTimes,
+    compute_travel_times,
+    create_utc_datetime,
+    create_zoned_utc_datetime,
+)
+
+_EPOCH = datetime(1970, 1, 1)
+
+Fingerprint = Tuple[int, ...]
+
+# The fields a leg's result depends on, exactly as given
+_leg_spelling = attrgetter(
+    "departure_date",
+    "departure_time",
+    "departure_timezone_utc_offset_in_hours",
+    "departure_timezone",
+    "arrival_date",
+    "arrival_time",
+    "arrival_timezone_utc_offset_in_hours",
+    "arrival_timezone",
+)
+
+
+def _utc_microseconds_and_offset(
+    date_str: str,
+    time_str: str,
+    offset_hours: Optional[float],
+    timezone_name: Optional[str],
+) -> Tuple[int, float]:
+    if offset_hours is None and timezone_name is not None:
+        utc, offset_hours = create_zoned_utc_datetime(date_str, time_str, timezone_name)
+    else:
+        utc = create_utc_datetime(date_str, time_str, offset_hours)
+    return (utc - _EPOCH) // timedelta(microseconds=1), offset_hours
+
+
+def itinerary_fingerprint(flights: Sequence[Flight]) -> Fingerprint:
+    """
+    Canonical hashable key for an itinerary.
+
+    Each leg contributes its departure and arrival as UTC microseconds since the
+    epoch (so seconds-precision times are kept apart) plus both UTC offsets in
+    minutes. Equivalent spellings of the same schedule (e.g. '8:05', '08:05'
+    and '08:05:00') map to the same key, and legs given by zone name share keys
+    with legs given by the offsets those zones resolve to.
+
+    :param flights: List of Flight objects.
+    :return: Flat tuple of four integers per leg.
+    :raises ValueError: If a date, time or zone name cannot be parsed.
+    """
+    key = []
+    for flight in flights:
+        departure, departure_offset = _utc_microseconds_and_offset(
+            flight.departure_date,
+            flight.departure_time,
+            flight.departure_timezone_utc_offset_in_hours,
+            flight.departure_timezone,
+        )
+        arrival, arrival_offset = _utc_microseconds_and_offset(
+            flight.arrival_date,
+            flight.arrival_time,
+            flight.arrival_timezone_utc_offset_in_hours,
+            flight.arrival_timezone,
+        )
+        key.extend(
+            (departure, arrival, round(departure_offset * 60), round(arrival_offset * 60))
+        )
+    return tuple(key)
+
+
+class ItineraryResultCache:
+    """
+    Bounded LRU cache of compute_travel_times results.
+
+    Lookups first try the raw date, time, offset and zone strings of each leg,
+    which costs no parsing; only a spelling not seen before is parsed into its
+    itinerary_fingerprint, so equivalent spellings still share one result.
+
+    Safe to share between threads; the calculation itself runs outside the lock.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        """
+        Initializes the ItineraryResultCache.
+
+        :param maxsize: Maximum number of cached itineraries.
+        """
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Fingerprint, TravelTimes]" = OrderedDict()
+        self._spellings: "OrderedDict[Hashable, Fingerprint]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def calculate(self, flights: Sequence[Flight]) -> TravelTimes:
+        """
+        Calculate travel times, reusing the result of an identical earlier itinerary.
+
+        :param flights: List of Flight objects.
+        :return: TravelTimes, shared with other callers; it is immutable.
+        :raises ValueError: As compute_travel_times; errors are not cached.
+        """
+        spelling = tuple(map(_leg_spelling, flights))
+        with self._lock:
+            try:
+                key = self._spellings.get(spelling)
+            except TypeError:
+                key = spelling = None
+            result = None if key is None else self._entries.get(key)
+            if result is not None:
+                self._spellings.move_to_end(spelling)
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return result
+
+        try:
+            key = itinerary_fingerprint(flights)
+        except (TypeError, ValueError):
+            # Let the calculator raise its usual, more descriptive error
+            return compute_travel_times(flights)
+
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if result is None:
+            result = compute_travel_times(flights)
+        with self._lock:
+            self._entries[key] = result
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            if spelling is not None:
+                self._spellings[spelling] = key
+                self._spellings.move_to_end(spelling)
+                if len(self._spellings) > self.maxsize:
+                    self._spellings.popitem(last=False)
+        return result
+
+    def clear(self):
+        """
+        Drop every cached result and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._spellings.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return size, hit, miss and eviction counts and the hit rate.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
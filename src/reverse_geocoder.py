@@ -0,0 +1,361 @@
+"""Offline reverse geocoding of coordinates to the nearest known city
+
+Cities are indexed in a KD-tree over points on the unit sphere, so nearest
+neighbours are correct across the antimeridian and near the poles. Queries are
+answered for whole arrays at once: every point descends to its own leaf, then
+all points walk the tree level by level together, visiting only the boxes that
+could still hold a closer city.
+
+The bundled table (src/data/cities.csv) holds the principal city of every
+zone in the tz database's zone.tab plus some other major cities. Any CSV with
+the columns name, country, latitude, longitude and timezone can replace it.
+"""
+
+import csv
+import math
+import os
+from functools import lru_cache
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Union
+
+import numpy as np
+
+from src.calculator import Flight
+from src.speed_checks import EARTH_RADIUS_KM
+
+DEFAULT_CITIES = os.path.join(os.path.dirname(__file__), "data", "cities.csv")
+DEFAULT_LEAF_SIZE = 16
+
+# Queries per vectorized pass; bounds the temporary (points, leaf, 3) arrays
+_CHUNK_SIZE = 65536
+# Coordinate of padding slots in leaves, far outside the unit sphere
+_FAR = 1e6
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+
+def _unit_vectors(latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    phi = np.radians(latitudes)
+    lam = np.radians(longitudes)
+    cos_phi = np.cos(phi)
+    return np.stack([cos_phi * np.cos(lam), cos_phi * np.sin(lam), np.sin(phi)], -1)
+
+
+class _KDTree:
+    """
+    Static KD-tree stored as heap-ordered arrays; node 1 is the root and
+    node k has children 2k and 2k + 1. Leaves hold at most leaf_size points.
+    """
+
+    def __init__(self, points: np.ndarray, leaf_size: int):
+        count = len(points)
+        self.depth = max(0, math.ceil(math.log2(max(count, 1) / leaf_size)))
+        leaves = 1 << self.depth
+        self.leaves = leaves
+        self.lo = np.full((2 * leaves, 3), np.inf)
+        self.hi = np.full((2 * leaves, 3), -np.inf)
+        self.split_dim = np.zeros(leaves, dtype=np.int64)
+        self.split_value = np.full(leaves, np.inf)
+
+        order = np.arange(count)
+        for level in range(self.depth + 1):
+            width = 1 << level
+            for i in range(width):
+                node = width + i
+                start, end = i * count // width, (i + 1) * count // width
+                if end == start:
+                    continue
+                segment = points[order[start:end]]
+                self.lo[node] = segment.min(0)
+                self.hi[node] = segment.max(0)
+                if level == self.depth:
+                    continue
+                dim = int(np.argmax(self.hi[node] - self.lo[node]))
+                middle = (2 * i + 1) * count // (2 * width)
+                if start < middle < end:
+                    k = middle - start
+                    partition = np.argpartition(segment[:, dim], k)
+                    order[start:end] = order[start:end][partition]
+                    self.split_value[node] = points[order[middle], dim]
+                self.split_dim[node] = dim
+
+        bounds = np.arange(leaves + 1) * count // leaves
+        width = max(int(np.max(np.diff(bounds))), 1)
+        self.leaf_index = np.full((leaves, width), -1, dtype=np.int64)
+        self.leaf_points = np.full((leaves, width, 3), _FAR)
+        for leaf in range(leaves):
+            members = order[bounds[leaf] : bounds[leaf + 1]]
+            self.leaf_index[leaf, : len(members)] = members
+            self.leaf_points[leaf, : len(members)] = points[members]
+
+    def _leaf_candidates(self, queries, query_ids, leaves):
+        offsets = self.leaf_points[leaves] - queries[query_ids, None, :]
+        squared = np.einsum("ijk,ijk->ij", offsets, offsets)
+        slot = squared.argmin(1)
+        rows = np.arange(len(leaves))
+        return squared[rows, slot], self.leaf_index[leaves, slot]
+
+    def query(self, queries: np.ndarray):
+        """
+        Returns:
+            tuple: Squared chord distance to, and index of, each query's
+            nearest point.
+        """
+        count = len(queries)
+        everyone = np.arange(count)
+
+        # Initial guess from the leaf each query falls into
+        node = np.ones(count, dtype=np.int64)
+        for _ in range(self.depth):
+            dim = self.split_dim[node]
+            node = 2 * node + (queries[everyone, dim] >= self.split_value[node])
+        home = node - self.leaves
+        best, best_index = self._leaf_candidates(queries, everyone, home)
+
+        # Visit every other box that could hold a closer point
+        query_ids, nodes = everyone, np.ones(count, dtype=np.int64)
+        for level in range(self.depth + 1):
+            points = queries[query_ids]
+            gap = points - np.clip(points, self.lo[nodes], self.hi[nodes])
+            keep = np.einsum("ij,ij->i", gap, gap) < best[query_ids]
+            query_ids, nodes = query_ids[keep], nodes[keep]
+            if level < self.depth:
+                query_ids = np.repeat(query_ids, 2)
+                nodes = (2 * nodes[:, None] + np.array([0, 1])).reshape(-1)
+
+        leaves = nodes - self.leaves
+        other = leaves != home[query_ids]
+        query_ids, leaves = query_ids[other], leaves[other]
+        if len(query_ids):
+            squared, index = self._leaf_candidates(queries, query_ids, leaves)
+            better = squared < best[query_ids]
+            query_ids, squared, index = query_ids[better], squared[better], index[better]
+            # Keep only each query's closest candidate
+            order = np.lexsort((squared, query_ids))
+            query_ids, squared, index = query_ids[order], squared[order], index[order]
+            first = np.ones(len(query_ids), dtype=bool)
+            first[1:] = query_ids[1:] != query_ids[:-1]
+            best[query_ids[first]] = squared[first]
+            best_index[query_ids[first]] = index[first]
+        return best, best_index
+
+
+class NearestCities(NamedTuple):
+    """
+    Nearest known city of every queried point, shaped like the inputs.
+
+    Points farther than the requested maximum distance get index -1 and None
+    for name, country and timezone.
+    """
+
+    index: np.ndarray
+    name: np.ndarray
+    country: np.ndarray
+    timezone: np.ndarray
+    distance_km: np.ndarray
+
+
+class ReverseGeocoder:
+    """
+    Maps coordinates to the nearest city of a fixed table, without network.
+
+    Safe to share between threads; the index is read-only once built.
+    """
+
+    def __init__(
+        self,
+        names: Sequence[str],
+        countries: Sequence[str],
+        latitudes: ArrayLike,
+        longitudes: ArrayLike,
+        timezones: Sequence[str],
+        leaf_size: int = DEFAULT_LEAF_SIZE,
+    ):
+        """
+        Args:
+            names (sequence): City names.
+            countries (sequence): Country of each city.
+            latitudes (array-like): Latitude of each city in degrees.
+            longitudes (array-like): Longitude of each city in degrees.
+            timezones (sequence): IANA zone name of each city.
+            leaf_size (int): Most cities per KD-tree leaf.
+        """
+        self.names = np.array(names, dtype=object)
+        self.countries = np.array(countries, dtype=object)
+        self.timezones = np.array(timezones, dtype=object)
+        self.latitudes = np.asarray(latitudes, dtype=np.float64)
+        self.longitudes = np.asarray(longitudes, dtype=np.float64)
+        if not (
+            len(self.names)
+            == len(self.countries)
+            == len(self.timezones)
+            == len(self.latitudes)
+            == len(self.longitudes)
+        ):
+            raise ValueError("City columns must all have the same length")
+        if not len(self.names):
+            raise ValueError("At least one city is required")
+        self._tree = _KDTree(_unit_vectors(self.latitudes, self.longitudes), leaf_size)
+
+    @classmethod
+    def from_csv(
+        cls, path: str = DEFAULT_CITIES, leaf_size: int = DEFAULT_LEAF_SIZE
+    ) -> "ReverseGeocoder":
+        """
+        Build the index from a CSV file.
+
+        Args:
+            path (str): File with name, country, latitude, longitude and
+                timezone columns. Defaults to the bundled city table.
+            leaf_size (int): Most cities per KD-tree leaf.
+
+        Returns:
+            ReverseGeocoder: The index.
+        """
+        with open(path, newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        return cls(
+            [row["name"] for row in rows],
+            [row["country"] for row in rows],
+            [float(row["latitude"]) for row in rows],
+            [float(row["longitude"]) for row in rows],
+            [row["timezone"] for row in rows],
+            leaf_size,
+        )
+
+    def __len__(self):
+        return len(self.names)
+
+    def nearest(
+        self,
+        latitudes: ArrayLike,
+        longitudes: ArrayLike,
+        max_distance_km: Optional[float] = None,
+    ) -> NearestCities:
+        """
+        Nearest city of every point.
+
+        Args:
+            latitudes (array-like): Latitudes in degrees.
+            longitudes (array-like): Longitudes in degrees, any range.
+            max_distance_km (float, optional): Leave points without a city
+                within this great-circle distance unmatched.
+
+        Returns:
+            NearestCities: Matches shaped like the broadcast inputs.
+        """
+        latitudes, longitudes = np.broadcast_arrays(
+            np.asarray(latitudes, dtype=np.float64),
+            np.asarray(longitudes, dtype=np.float64),
+        )
+        shape = latitudes.shape
+        queries = _unit_vectors(latitudes.reshape(-1), longitudes.reshape(-1))
+        squared = np.empty(len(queries))
+        index = np.empty(len(queries), dtype=np.int64)
+        for start in range(0, len(queries), _CHUNK_SIZE):
+            chunk = slice(start, start + _CHUNK_SIZE)
+            squared[chunk], index[chunk] = self._tree.query(queries[chunk])
+
+        chord = np.sqrt(squared)
+        distance = 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(chord / 2, 1.0))
+        if max_distance_km is not None:
+            index[distance > max_distance_km] = -1
+        found = index >= 0
+
+        def labels(column):
+            result = np.full(len(index), None, dtype=object)
+            result[found] = column[index[found]]
+            return result.reshape(shape)
+
+        return NearestCities(
+            index=index.reshape(shape),
+            name=labels(self.names),
+            country=labels(self.countries),
+            timezone=labels(self.timezones),
+            distance_km=distance.reshape(shape),
+        )
+
+
+@lru_cache(maxsize=None)
+def default_reverse_geocoder() -> ReverseGeocoder:
+    """
+    Returns:
+        ReverseGeocoder: Index over the bundled city table, built once.
+    """
+    return ReverseGeocoder.from_csv()
+
+
+class PositionalLeg(NamedTuple):
+    """
+    A flight leg known by endpoint coordinates and local times.
+    """
+
+    departure_latitude: float
+    departure_longitude: float
+    departure_date: str
+    departure_time: str
+    arrival_latitude: float
+    arrival_longitude: float
+    arrival_date: str
+    arrival_time: str
+
+
+def flights_from_positions(
+    legs: Sequence[PositionalLeg],
+    geocoder: Optional[ReverseGeocoder] = None,
+    max_distance_km: Optional[float] = None,
+) -> List[Flight]:
+    """
+    Build Flight objects from positional data, labelling each endpoint with
+    its nearest city and timezone.
+
+    Every endpoint is reverse geocoded in one batch.
+
+    Args:
+        legs (sequence of PositionalLeg): The legs, in travel order.
+        geocoder (ReverseGeocoder, optional): Defaults to the bundled cities.
+        max_distance_km (float, optional): Reject endpoints with no city
+            within this distance.
+
+    Returns:
+        list of Flight: Flights with zone names, so offsets follow DST.
+
+    Raises:
+        ValueError: If an endpoint has no city within max_distance_km.
+    """
+    geocoder = default_reverse_geocoder() if geocoder is None else geocoder
+    if not legs:
+        return []
+    latitudes = [
+        latitude
+        for leg in legs
+        for latitude in (leg.departure_latitude, leg.arrival_latitude)
+    ]
+    longitudes = [
+        longitude
+        for leg in legs
+        for longitude in (leg.departure_longitude, leg.arrival_longitude)
+    ]
+    cities = geocoder.nearest(latitudes, longitudes, max_distance_km)
+
+    flights = []
+    for i, leg in enumerate(legs):
+        departure, arrival = 2 * i, 2 * i + 1
+        for endpoint, label in ((departure, "departure"), (arrival, "arrival")):
+            if cities.index[endpoint] < 0:
+                raise ValueError(
+                    f"Leg {i}: no known city within {max_distance_km} km of the "
+                    f"{label} position ({latitudes[endpoint]}, {longitudes[endpoint]})"
+                )
+        flights.append(
+            Flight.from_zones(
+                departure_city=cities.name[departure],
+                departure_date=leg.departure_date,
+                departure_time=leg.departure_time,
+                departure_timezone=cities.timezone[departure],
+                arrival_city=cities.name[arrival],
+                arrival_date=leg.arrival_date,
+                arrival_time=leg.arrival_time,
+                arrival_timezone=cities.timezone[arrival],
+            )
+        )
+    return flights
@@ -0,0 +1,445 @@
+"""Itinerary search over a flight schedule
+
+FlightSchedule validates a set of flights once and keeps them in UTC minutes,
+grouped by departure city and sorted by departure time, with a second order
+by arrival time for backward scans. Searches run on the
+time-expanded graph whose nodes are the flights themselves: flight b can follow
+flight a when it leaves a's arrival city at least the minimum connection time
+after a lands. That graph is acyclic, since every connection moves forward in
+time.
+"""
+
+import heapq
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+from math import inf
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src import zone_offsets
+from src.calculator import Flight, TravelTimes, compute_travel_times, iter_travel_events
+from src.schedule_index import DEFAULT_MIN_CONNECTION
+
+_EPOCH = datetime(1970, 1, 1)
+_ONE_MINUTE = timedelta(minutes=1)
+
+# Heap entry kinds of the k-shortest enumeration
+_ORIGIN, _RANGE, _DONE = 0, 1, 2
+
+
+class ScheduledItinerary(NamedTuple):
+    """
+    An itinerary found in a schedule, with its totals from compute_travel_times.
+    """
+
+    flights: Tuple[Flight, ...]
+    travel_times: TravelTimes
+
+
+def _minutes(utc: Optional[datetime], default: float) -> float:
+    """
+    UTC minutes since the epoch; naive datetimes are taken to be UTC and aware
+    ones are converted.
+    """
+    if utc is None:
+        return default
+    if utc.tzinfo is not None:
+        utc = utc.astimezone(timezone.utc).replace(tzinfo=None)
+    return (utc - _EPOCH) / _ONE_MINUTE
+
+
+class _RangeMinimum:
+    """
+    Sparse table answering "position of the smallest value in [lo, hi)" in O(1).
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = values.tolist()
+        levels = [np.arange(len(values), dtype=np.int32)]
+        width = 1
+        while 2 * width <= len(values):
+            previous = levels[-1]
+            left = previous[: len(values) - 2 * width + 1]
+            right = previous[width : width + len(left)]
+            levels.append(np.where(values[right] < values[left], right, left))
+            width *= 2
+        self.levels = levels
+
+    def argmin(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        left = int(self.levels[level][lo])
+        right = int(self.levels[level][hi - (1 << level)])
+        return right if self.values[right] < self.values[left] else left
+
+
+class FlightSchedule:
+    """
+    Pre-sorted index of a flight schedule for itinerary searches.
+
+    Immutable once built, so one instance can serve searches from many threads.
+    """
+
+    def __init__(
+        self,
+        flights: Sequence[Flight],
+        nonexistent: str = zone_offsets.RAISE,
+        ambiguous: str = zone_offsets.RAISE,
+    ):
+        """
+        Initializes the FlightSchedule.
+
+        :param flights: Flight objects, in any order.
+        :param nonexistent: Policy for skipped local times, see compute_travel_times.
+        :param ambiguous: Policy for repeated local times, see compute_travel_times.
+        :raises ValueError: If a flight is invalid; the message names its index.
+        """
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
+        city_ids: Dict[str, int] = {}
+        departure_city, arrival_city, departure, arrival = [], [], [], []
+        for index, flight in enumerate(flights):
+            try:
+                (event,) = iter_travel_events([flight], nonexistent, ambiguous)
+            except ValueError as e:
+                raise ValueError(f"Flight {index}: {e}")
+            departure_city.append(city_ids.setdefault(flight.departure_city, len(city_ids)))
+            arrival_city.append(city_ids.setdefault(flight.arrival_city, len(city_ids)))
+            departure.append(_minutes(event.departure_utc, 0.0))
+            arrival.append(_minutes(event.arrival_utc, 0.0))
+
+        self._city_ids = city_ids
+        departure_city = np.array(departure_city, dtype=np.int64)
+        departure = np.array(departure, dtype=np.float64)
+        # Grouped by departure city, then by departure time
+        order = np.lexsort((departure, departure_city))
+        self._flights: List[Flight] = [flights[i] for i in order]
+        self._departure = departure[order]
+        self._arrival = np.array(arrival, dtype=np.float64)[order]
+        self._departure_city = departure_city[order]
+        self._arrival_city = np.array(arrival_city, dtype=np.int64)[order]
+        self._city_start = np.searchsorted(
+            self._departure_city, np.arange(len(city_ids) + 1)
+        )
+
+        # One sorted key over every (city, departure) pair lets a single
+        # searchsorted find the first feasible connection of every flight
+        self._base = float(self._departure.min()) if len(order) else 0.0
+        self._span = float(self._departure.max()) - self._base + 1 if len(order) else 1.0
+        self._key = self._departure_city * self._span + (self._departure - self._base)
+
+        # Destination-independent state of the backward sweep, as lists since
+        # it is walked one flight at a time
+        count = len(order)
+        self._arrival_city_end = self._city_start[1:][self._arrival_city]
+        last_in_city = np.zeros(count, dtype=bool)
+        last_in_city[self._city_start[1:][np.diff(self._city_start) > 0] - 1] = True
+        # Latest departures first; ties are broken by position so that every
+        # city's suffix minimum is filled from right to left
+        self._sweep = np.lexsort((np.arange(count), self._departure))[::-1]
+        self._sweep_departure = self._departure[self._sweep]
+        self._lists = (
+            self._departure.tolist(),
+            self._arrival.tolist(),
+            self._departure_city.tolist(),
+            self._arrival_city.tolist(),
+            self._arrival_city_end.tolist(),
+            last_in_city.tolist(),
+        )
+
+        # Latest arrivals first, for the arrive-by connection scan
+        by_arrival = np.lexsort((np.arange(count), -self._arrival))
+        self._by_arrival = by_arrival.tolist()
+        self._negated_arrival = (-self._arrival[by_arrival]).tolist()
+
+    def __len__(self):
+        return len(self._flights)
+
+    def cities(self) -> List[str]:
+        """
+        :return: Every city that has a departure or an arrival, in first-seen order.
+        """
+        return list(self._city_ids)
+
+    def _city_key(self, city: np.ndarray, minutes: np.ndarray) -> np.ndarray:
+        # Times after the last departure land on the next city's first key,
+        # so they find no connection instead of the latest departure
+        offset = np.clip(minutes - self._base, 0, self._span)
+        return city * self._span + offset
+
+    def _itinerary(self, positions: Sequence[int]) -> ScheduledItinerary:
+        flights = tuple(self._flights[p] for p in positions)
+        return ScheduledItinerary(
+            flights, compute_travel_times(flights, self.nonexistent, self.ambiguous)
+        )
+
+    def _best_arrivals(
+        self, origin: int, destination: int, connection: float, earliest: float
+    ) -> Tuple[np.ndarray, List[int]]:
+        """
+        Earliest arrival at the destination reachable by taking each flight,
+        inf where none is, by one backward sweep in departure order.
+
+        Also returns, per flight, the position of its first feasible connection.
+        """
+        count = len(self._flights)
+        next_position = np.searchsorted(
+            self._key,
+            self._city_key(self._arrival_city, self._arrival + connection),
+        ).tolist()
+        _, arrival, departure_city, arrival_city, city_end, last_in_city = self._lists
+
+        best = [inf] * count
+        suffix = [inf] * (count + 1)
+        # Flights leaving before the earliest departure can be on no itinerary
+        kept = int(np.searchsorted(-self._sweep_departure, -earliest, "right"))
+        for p in self._sweep[:kept].tolist():
+            if departure_city[p] == destination or arrival_city[p] == origin:
+                value = inf
+            elif arrival_city[p] == destination:
+                value = arrival[p]
+            elif next_position[p] < city_end[p]:
+                value = suffix[next_position[p]]
+            else:
+                value = inf
+            best[p] = value
+            if last_in_city[p] or value < suffix[p + 1]:
+                suffix[p] = value
+            else:
+                suffix[p] = suffix[p + 1]
+        return np.array(best), next_position
+
+    def itineraries(
+        self,
+        origin: str,
+        destination: str,
+        earliest_departure: Optional[datetime] = None,
+        latest_departure: Optional[datetime] = None,
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+        max_legs: Optional[int] = None,
+    ) -> Iterator[ScheduledItinerary]:
+        """
+        Lazily enumerate itineraries from origin to destination, shortest total
+        travel time first.
+
+        Itineraries never visit a city twice and end at their first arrival at
+        the destination. A single backward sweep computes, for every flight, the
+        earliest arrival it can still reach; the enumeration is then a best-first
+        search over partial itineraries with that exact bound. Feasible next
+        flights form a range of a city's departures, which is split around its
+        best member as in Eppstein's algorithm, so each further itinerary costs
+        a few heap operations per leg and the caller pays only for what it
+        consumes.
+
+        :param origin: Departure city name.
+        :param destination: Arrival city name.
+        :param earliest_departure: Earliest UTC departure of the first flight.
+        :param latest_departure: Latest UTC departure of the first flight.
+        :param min_connection: Minimum layover between flights, must be positive.
+        :param max_legs: Most flights per itinerary, unlimited if None.
+        :return: Iterator of ScheduledItinerary in order of total travel time;
+            ties keep the earlier first departure first.
+        :raises ValueError: If origin equals destination or a limit is not positive.
+        """
+        if origin == destination:
+            raise ValueError("Origin and destination must differ")
+        if min_connection <= timedelta(0):
+            raise ValueError("min_connection must be positive")
+        if max_legs is not None and max_legs < 1:
+            raise ValueError("max_legs must be positive")
+        return self._itineraries(
+            origin,
+            destination,
+            _minutes(earliest_departure, -inf),
+            _minutes(latest_departure, inf),
+            min_connection / _ONE_MINUTE,
+            max_legs or len(self._flights),
+        )
+
+    def _itineraries(
+        self,
+        origin_name: str,
+        destination_name: str,
+        earliest: float,
+        latest: float,
+        connection: float,
+        max_legs: int,
+    ) -> Iterator[ScheduledItinerary]:
+        origin = self._city_ids.get(origin_name)
+        destination = self._city_ids.get(destination_name)
+        if origin is None or destination is None:
+            return
+        best, next_position = self._best_arrivals(
+            origin, destination, connection, earliest
+        )
+        lo, hi = self._city_start[origin], self._city_start[origin + 1]
+        candidates = lo + np.flatnonzero(
+            (self._departure[lo:hi] >= earliest)
+            & (self._departure[lo:hi] <= latest)
+            & np.isfinite(best[lo:hi])
+        )
+        if not len(candidates):
+            return
+        # The first flight fixes the start of the clock, so origin departures
+        # are ranked by best arrival minus their own departure
+        first_cost = best[candidates] - self._departure[candidates]
+        ranked = candidates[np.argsort(first_cost, kind="stable")].tolist()
+        first_cost = np.sort(first_cost, kind="stable").tolist()
+
+        ranges = _RangeMinimum(best)
+        departure, arrival, _, arrival_city, city_end, _ = self._lists
+        best = ranges.values
+
+        counter = 0
+        heap = [(first_cost[0], counter, _ORIGIN, 0, ())]
+
+        def take(path, position):
+            # Extend path by the flight at position; the new entry keeps the
+            # cost of its parent because the bound is exact
+            nonlocal counter
+            start = departure[path[0]] if path else departure[position]
+            city = arrival_city[position]
+            if city == origin or any(arrival_city[p] == city for p in path):
+                return
+            path = path + (position,)
+            counter += 1
+            if city == destination:
+                heapq.heappush(heap, (arrival[position] - start, counter, _DONE, 0, path))
+            elif len(path) < max_legs:
+                push_range(path, next_position[position], city_end[position], start)
+
+        def push_range(path, lo, hi, start):
+            nonlocal counter
+            if lo < hi:
+                m = ranges.argmin(lo, hi)
+                if best[m] < inf:
+                    counter += 1
+                    heapq.heappush(
+                        heap, (best[m] - start, counter, _RANGE, (lo, m, hi), path)
+                    )
+
+        while heap:
+            cost, _, kind, state, path = heapq.heappop(heap)
+            if kind == _DONE:
+                yield self._itinerary(path)
+            elif kind == _ORIGIN:
+                if state + 1 < len(ranked):
+                    counter += 1
+                    heapq.heappush(
+                        heap, (first_cost[state + 1], counter, _ORIGIN, state + 1, ())
+                    )
+                take((), ranked[state])
+            else:
+                lo, m, hi = state
+                start = departure[path[0]]
+                push_range(path, lo, m, start)
+                push_range(path, m + 1, hi, start)
+                take(path, m)
+
+    def latest_departure(
+        self,
+        origin: str,
+        destination: str,
+        arrive_by: datetime,
+        earliest_departure: Optional[datetime] = None,
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+    ) -> Optional[ScheduledItinerary]:
+        """
+        The itinerary that leaves origin as late as possible and still reaches
+        destination by arrive_by.
+
+        A backward connection scan: flights are visited latest arrival first,
+        and each city keeps the latest time it must be left to make the
+        deadline. A flight is usable if it lands in time for the latest usable
+        departure from its arrival city; the scan stops once flights land
+        before the best departure found at the origin. On the pre-sorted index
+        this touches only the flights between that departure and arrive_by.
+
+        :param origin: Departure city name.
+        :param destination: Arrival city name.
+        :param arrive_by: Latest arrival at the destination; naive datetimes
+            are UTC, aware ones (e.g. local time with its zone) are converted.
+        :param earliest_departure: Earliest departure of the first flight, same
+            convention as arrive_by.
+        :param min_connection: Minimum layover between flights, must be positive.
+        :return: ScheduledItinerary with totals from compute_travel_times, or
+            None if no itinerary arrives in time.
+        :raises ValueError: If origin equals destination or min_connection is
+            not positive.
+        """
+        if origin == destination:
+            raise ValueError("Origin and destination must differ")
+        if min_connection <= timedelta(0):
+            raise ValueError("min_connection must be positive")
+        origin_id = self._city_ids.get(origin)
+        destination_id = self._city_ids.get(destination)
+        if origin_id is None or destination_id is None:
+            return None
+
+        connection = min_connection / _ONE_MINUTE
+        earliest = _minutes(earliest_departure, -inf)
+        departure, arrival, departure_city, arrival_city, _, _ = self._lists
+        # Latest arrival in each city that still makes the deadline
+        land_by = [-inf] * len(self._city_ids)
+        land_by[destination_id] = _minutes(arrive_by, inf)
+        chosen = [-1] * len(self._city_ids)
+
+        latest = [-inf] * len(self._city_ids)
+        # The scan can stop at flights landing before this
+        stop = earliest
+        first = bisect_left(self._negated_arrival, -land_by[destination_id])
+        for p in islice(self._by_arrival, first, None):
+            if arrival[p] < stop:
+                break
+            city = departure_city[p]
+            leaves = departure[p]
+            if (
+                leaves > latest[city]
+                and arrival[p] <= land_by[arrival_city[p]]
+                and leaves >= earliest
+                and city != destination_id
+            ):
+                latest[city] = leaves
+                chosen[city] = p
+                land_by[city] = leaves - connection
+                if city == origin_id:
+                    stop = leaves
+
+        if chosen[origin_id] < 0:
+            return None
+        # Following each city's latest usable departure never revisits a city,
+        # since a revisit would have left it later still
+        path = [chosen[origin_id]]
+        while arrival_city[path[-1]] != destination_id:
+            path.append(chosen[arrival_city[path[-1]]])
+        return self._itinerary(path)
+
+
+def k_shortest_itineraries(
+    schedule: FlightSchedule,
+    origin: str,
+    destination: str,
+    k: int,
+    earliest_departure: Optional[datetime] = None,
+    latest_departure: Optional[datetime] = None,
+    min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+    max_legs: Optional[int] = None,
+) -> List[ScheduledItinerary]:
+    """
+    The k itineraries with the shortest total travel time between two cities.
+
+    :param schedule: FlightSchedule to search.
+    :param k: Number of itineraries wanted; fewer are returned if fewer exist.
+    :return: List of ScheduledItinerary, shortest first; see
+        FlightSchedule.itineraries for the other parameters.
+    """
+    found = schedule.itineraries(
+        origin,
+        destination,
+        earliest_departure,
+        latest_departure,
+        min_connection,
+        max_legs,
+    )
+    return [itinerary for _, itinerary in zip(range(k), found)]
@@ -0,0 +1,336 @@
+"""Inverted index from flight legs to stored itineraries for schedule changes
+
+When a flight is retimed, only the itineraries containing it can change.
+ItineraryIndex maps each leg's identity to the itineraries that fly it, so a
+schedule change recomputes just those and reports connections that broke
+(negative layover) or became tighter than the minimum connection time.
+"""
+
+import threading
+from datetime import datetime, timedelta
+from typing import (
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from src import zone_offsets
+from src.calculator import (
+    Flight,
+    TravelTimes,
+    compute_travel_times,
+    create_utc_datetime,
+    create_zoned_utc_datetime,
+)
+
+DEFAULT_MIN_CONNECTION = timedelta(minutes=45)
+
+BROKEN = "broken"
+TIGHT = "tight"
+
+LegKey = Tuple[str, datetime, str]
+
+
+def leg_key(flight: Flight) -> LegKey:
+    """
+    Identity of a scheduled leg: route and local departure time.
+
+    Equivalent spellings of the departure time, such as '8:05' and '08:05:00',
+    give the same key.
+
+    :param flight: Flight object.
+    :return: (departure city, local departure datetime, arrival city).
+    :raises ValueError: If the departure date or time cannot be parsed.
+    """
+    # With a zero offset the "UTC" result is just the parsed local time
+    local_departure = create_utc_datetime(
+        flight.departure_date, flight.departure_time, 0
+    )
+    return (flight.departure_city, local_departure, flight.arrival_city)
+
+
+class ConnectionIssue(NamedTuple):
+    """
+    A connection that no longer works after a schedule change.
+
+    leg_index is the 0-based index of the outbound leg, so the connection is
+    between legs leg_index - 1 and leg_index. status is BROKEN for a negative
+    layover and TIGHT for one shorter than the minimum connection time.
+    """
+
+    itinerary_id: Hashable
+    leg_index: int
+    layover: timedelta
+    status: str
+
+
+class ScheduleImpact(NamedTuple):
+    """
+    Outcome of applying a schedule change.
+
+    - affected: ids of every itinerary containing a changed leg.
+    - results: recomputed TravelTimes of the affected itineraries that are
+      still flyable.
+    - broken, tight: connections with negative or too short layovers.
+    - invalid: affected itineraries whose legs can no longer be evaluated
+      (e.g. arrival before departure), with the error message.
+    """
+
+    affected: Tuple[Hashable, ...]
+    results: Dict[Hashable, TravelTimes]
+    broken: List[ConnectionIssue]
+    tight: List[ConnectionIssue]
+    invalid: Dict[Hashable, str]
+
+
+class ItineraryIndex:
+    """
+    Stored itineraries with an inverted index from leg identity to itinerary.
+
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        itineraries: Optional[Mapping[Hashable, Sequence[Flight]]] = None,
+        key: Callable[[Flight], Hashable] = leg_key,
+        nonexistent: str = zone_offsets.RAISE,
+        ambiguous: str = zone_offsets.RAISE,
+    ):
+        """
+        Initializes the ItineraryIndex.
+
+        :param itineraries: Initial itineraries by id.
+        :param key: Leg identity; legs with equal keys are the same flight.
+        :param nonexistent: Policy for skipped local times, see compute_travel_times.
+        :param ambiguous: Policy for repeated local times, see compute_travel_times.
+        """
+        self._key = key
+        self.nonexistent = nonexistent
+        self.ambiguous = ambiguous
+        self._itineraries: Dict[Hashable, List[Flight]] = {}
+        self._results: Dict[Hashable, TravelTimes] = {}
+        self._legs: Dict[Hashable, Set[Hashable]] = {}
+        self._lock = threading.Lock()
+        for itinerary_id, flights in (itineraries or {}).items():
+            self.add(itinerary_id, flights)
+
+    def __len__(self):
+        return len(self._itineraries)
+
+    def __contains__(self, itinerary_id: Hashable) -> bool:
+        return itinerary_id in self._itineraries
+
+    def _compute(self, flights: Sequence[Flight]) -> TravelTimes:
+        return compute_travel_times(flights, self.nonexistent, self.ambiguous)
+
+    def add(self, itinerary_id: Hashable, flights: Sequence[Flight]) -> TravelTimes:
+        """
+        Store an itinerary, replacing any earlier one with the same id.
+
+        :param itinerary_id: Caller's id for the itinerary.
+        :param flights: List of Flight objects.
+        :return: TravelTimes of the itinerary.
+        :raises ValueError: If the itinerary is invalid; nothing is stored then.
+        """
+        flights = list(flights)
+        result = self._compute(flights)
+        keys = {self._key(flight) for flight in flights}
+        with self._lock:
+            self._unindex(itinerary_id)
+            self._itineraries[itinerary_id] = flights
+            self._results[itinerary_id] = result
+            for key in keys:
+                self._legs.setdefault(key, set()).add(itinerary_id)
+        return result
+
+    def _unindex(self, itinerary_id: Hashable):
+        for flight in self._itineraries.pop(itinerary_id, ()):
+            ids = self._legs.get(self._key(flight))
+            if ids is not None:
+                ids.discard(itinerary_id)
+                if not ids:
+                    del self._legs[self._key(flight)]
+        self._results.pop(itinerary_id, None)
+
+    def remove(self, itinerary_id: Hashable):
+        """
+        Forget an itinerary; unknown ids are ignored.
+        """
+        with self._lock:
+            self._unindex(itinerary_id)
+
+    def itinerary(self, itinerary_id: Hashable) -> List[Flight]:
+        """
+        :return: Copy of the stored flights of an itinerary.
+        :raises KeyError: If the id is unknown.
+        """
+        return list(self._itineraries[itinerary_id])
+
+    def result(self, itinerary_id: Hashable) -> Optional[TravelTimes]:
+        """
+        :return: Latest TravelTimes of an itinerary, or None if a schedule
+            change left it unflyable.
+        :raises KeyError: If the id is unknown.
+        """
+        if itinerary_id not in self._itineraries:
+            raise KeyError(itinerary_id)
+        return self._results.get(itinerary_id)
+
+    def itineraries_with(self, leg: Union[Flight, Hashable]) -> Set[Hashable]:
+        """
+        Ids of the itineraries containing a leg.
+
+        :param leg: A Flight, or a leg key as produced by the index's key function.
+        :return: Set of itinerary ids, empty if no itinerary flies the leg.
+        """
+        key = self._key(leg) if isinstance(leg, Flight) else leg
+        return set(self._legs.get(key, ()))
+
+    def _leg_times(self, flight: Flight) -> Tuple[datetime, datetime]:
+        times = []
+        for date_str, time_str, offset, zone in (
+            (
+                flight.departure_date,
+                flight.departure_time,
+                flight.departure_timezone_utc_offset_in_hours,
+                flight.departure_timezone,
+            ),
+            (
+                flight.arrival_date,
+                flight.arrival_time,
+                flight.arrival_timezone_utc_offset_in_hours,
+                flight.arrival_timezone,
+            ),
+        ):
+            if offset is None and zone is not None:
+                utc, _ = create_zoned_utc_datetime(
+                    date_str, time_str, zone, self.nonexistent, self.ambiguous
+                )
+            else:
+                utc = create_utc_datetime(date_str, time_str, offset)
+            times.append(utc)
+        return times[0], times[1]
+
+    def _connections(
+        self, flights: Sequence[Flight]
+    ) -> Tuple[List[Tuple[int, timedelta]], Optional[str]]:
+        """
+        Layover before every leg after the first, or an error message if a
+        leg itself cannot be evaluated.
+        """
+        layovers = []
+        previous_arrival = None
+        for index, flight in enumerate(flights):
+            try:
+                departure, arrival = self._leg_times(flight)
+            except (TypeError, ValueError) as e:
+                return [], f"Flight {index + 1}: {e}"
+            if arrival < departure:
+                return [], (
+                    f"Flight {index + 1}: Arrival time cannot be before departure time"
+                )
+            if previous_arrival is not None:
+                layovers.append((index, departure - previous_arrival))
+            previous_arrival = arrival
+        return layovers, None
+
+    def apply_change(
+        self,
+        changes: Mapping[Union[Flight, Hashable], Flight],
+        min_connection: timedelta = DEFAULT_MIN_CONNECTION,
+    ) -> ScheduleImpact:
+        """
+        Retime legs and re-evaluate only the itineraries that contain them.
+
+        Stored itineraries are updated in place; those left with a broken
+        connection or an invalid leg keep their flights but lose their result.
+
+        :param changes: Old leg (Flight or leg key) to the replacement Flight.
+        :param min_connection: Layovers shorter than this are reported as tight.
+        :return: ScheduleImpact.
+        :raises ValueError: If a replacement flight's departure cannot be parsed;
+            nothing is changed then.
+        """
+        # Resolve every key first so a bad replacement leaves the index untouched
+        replacements = {
+            (self._key(old) if isinstance(old, Flight) else old): (new, self._key(new))
+            for old, new in changes.items()
+        }
+
+        with self._lock:
+            # Find every leg to replace against the original keys before
+            # substituting any, so that a batch whose new key is another
+            # change's old key (retiming a whole bank) is applied at once
+            affected: Dict[Hashable, None] = {}
+            substitutions: List[Tuple[Hashable, int, Flight]] = []
+            moved: List[Tuple[Set[Hashable], Hashable]] = []
+            for old_key, (new_flight, new_key) in replacements.items():
+                ids = self._legs.get(old_key)
+                if not ids:
+                    continue
+                for itinerary_id in ids:
+                    for index, flight in enumerate(self._itineraries[itinerary_id]):
+                        if self._key(flight) == old_key:
+                            substitutions.append((itinerary_id, index, new_flight))
+                    affected[itinerary_id] = None
+                moved.append((ids, new_key))
+
+            for itinerary_id, index, new_flight in substitutions:
+                self._itineraries[itinerary_id][index] = new_flight
+            for old_key in replacements:
+                self._legs.pop(old_key, None)
+            for ids, new_key in moved:
+                self._legs.setdefault(new_key, set()).update(ids)
+            snapshot = {
+                itinerary_id: list(self._itineraries[itinerary_id])
+                for itinerary_id in affected
+            }
+
+        results: Dict[Hashable, TravelTimes] = {}
+        broken: List[ConnectionIssue] = []
+        tight: List[ConnectionIssue] = []
+        invalid: Dict[Hashable, str] = {}
+        for itinerary_id, flights in snapshot.items():
+            layovers, error = self._connections(flights)
+            if error is not None:
+                invalid[itinerary_id] = error
+                continue
+            flyable = True
+            for leg_index, layover in layovers:
+                if layover < timedelta(0):
+                    broken.append(
+                        ConnectionIssue(itinerary_id, leg_index, layover, BROKEN)
+                    )
+                    flyable = False
+                elif layover < min_connection:
+                    tight.append(
+                        ConnectionIssue(itinerary_id, leg_index, layover, TIGHT)
+                    )
+            if flyable:
+                results[itinerary_id] = self._compute(flights)
+
+        with self._lock:
+            for itinerary_id in snapshot:
+                if itinerary_id not in self._itineraries:
+                    continue
+                if itinerary_id in results:
+                    self._results[itinerary_id] = results[itinerary_id]
+                else:
+                    self._results.pop(itinerary_id, None)
+
+        return ScheduleImpact(
+            affected=tuple(snapshot),
+            results=results,
+            broken=broken,
+            tight=tight,
+            invalid=invalid,
+        )
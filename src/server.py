@@ -0,0 +1,588 @@
+"""Asyncio HTTP JSON service exposing the travel time calculator"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from src import cache_snapshot, instrumentation
+from src.calculator import Flight, compute_travel_times, format_timedelta
+from src.timezone_cache import TimezoneCache, default_cache
+
+FLIGHT_FIELDS = (
+    "departure_city",
+    "departure_date",
+    "departure_time",
+    "departure_timezone_utc_offset_in_hours",
+    "arrival_city",
+    "arrival_date",
+    "arrival_time",
+    "arrival_timezone_utc_offset_in_hours",
+)
+
+# Optional IANA zone names; each replaces the matching offset field when given
+ZONE_FIELDS = {
+    "departure_timezone": "departure_timezone_utc_offset_in_hours",
+    "arrival_timezone": "arrival_timezone_utc_offset_in_hours",
+}
+
+MAX_BODY_BYTES = 64 * 1024 * 1024
+
+STATUS_REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class RequestError(Exception):
+    """
+    Raised by request handlers to answer with an HTTP error status.
+    """
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def flight_from_dict(data: Dict[str, Any]) -> Flight:
+    """
+    Build a Flight from its JSON representation.
+
+    :param data: Mapping with one key per Flight constructor argument, or with
+        'departure_city', 'arrival_city' and ISO-8601 'departure' and 'arrival'
+        timestamps that embed their UTC offsets. 'departure_timezone' and
+        'arrival_timezone' IANA zone names may stand in for the offsets.
+    :return: Flight object.
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Each flight must be a JSON object")
+    if "departure" in data and "arrival" in data:
+        return Flight.from_iso(
+            departure_city=data.get("departure_city", ""),
+            departure=data["departure"],
+            arrival_city=data.get("arrival_city", ""),
+            arrival=data["arrival"],
+        )
+    zones = {zone: data[zone] for zone in ZONE_FIELDS if data.get(zone) is not None}
+    optional = {ZONE_FIELDS[zone] for zone in zones}
+    missing = [
+        field for field in FLIGHT_FIELDS if field not in data and field not in optional
+    ]
+    if missing:
+        raise ValueError(f"Missing flight fields: {', '.join(missing)}")
+    return Flight(**{field: data.get(field) for field in FLIGHT_FIELDS}, **zones)
+
+
+def flight_to_dict(flight: Flight) -> Dict[str, Any]:
+    """
+    Convert a Flight to its JSON representation.
+
+    :param flight: Flight object.
+    :return: Mapping with one key per Flight constructor argument; zone names
+        are only included when set.
+    """
+    data = {field: getattr(flight, field) for field in FLIGHT_FIELDS}
+    for zone in ZONE_FIELDS:
+        if getattr(flight, zone) is not None:
+            data[zone] = getattr(flight, zone)
+    return data
+
+
+def _timedelta_to_dict(td: timedelta) -> Dict[str, Any]:
+    return {
+        "seconds": int(td.total_seconds()),
+        "formatted": format_timedelta(td),
+    }
+
+
+def calculate_itinerary(flights_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Calculate the travel times for one itinerary given as JSON data.
+
+    :param flights_data: List of flight mappings.
+    :return: JSON-serializable result mapping.
+    """
+    if not isinstance(flights_data, list):
+        raise ValueError("'flights' must be a list")
+    flights = [flight_from_dict(data) for data in flights_data]
+    total_air_time, total_travel_time, total_layover_time, layover_times = (
+        compute_travel_times(flights)
+    )
+    return {
+        "total_air_time": _timedelta_to_dict(total_air_time),
+        "total_travel_time": _timedelta_to_dict(total_travel_time),
+        "total_layover_time": _timedelta_to_dict(total_layover_time),
+        "layover_times": [_timedelta_to_dict(layover) for layover in layover_times],
+    }
+
+
+def calculate_batch(itineraries_data: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Calculate a batch of itineraries, reporting errors per itinerary.
+
+    Runs inside the worker processes, so it must stay a module-level function.
+
+    :param itineraries_data: List of itineraries, each a list of flight mappings.
+    :return: One result or ``{"error": ...}`` mapping per itinerary.
+    """
+    results = []
+    for flights_data in itineraries_data:
+        try:
+            results.append(calculate_itinerary(flights_data))
+        except (ValueError, TypeError) as e:
+            results.append({"error": str(e)})
+    return results
+
+
+def resolve_timezone(
+    place_name: str, cache: TimezoneCache = default_cache
+) -> Dict[str, Any]:
+    """
+    Resolve a place name to its timezone as JSON data.
+
+    :param place_name: The name of the place (e.g., "New York").
+    :param cache: Timezone cache to resolve through.
+    :return: JSON-serializable mapping with the timezone name and UTC offset.
+    """
+    timezone_name, utc_offset_hours = cache.resolve(place_name)
+    return {
+        "place": place_name,
+        "timezone": timezone_name,
+        "utc_offset_hours": utc_offset_hours,
+    }
+
+
+def resolve_timezones(
+    place_names: List[str], cache: TimezoneCache = default_cache
+) -> Dict[str, Dict[str, Any]]:
+    """
+    Resolve several place names at once, reporting errors per place.
+
+    :param place_names: The names of the places.
+    :param cache: Timezone cache to resolve through.
+    :return: Mapping from each place name to its timezone data or ``{"error": ...}``.
+    """
+    results = {}
+    for place_name, resolved in cache.resolve_many(place_names).items():
+        if isinstance(resolved, ValueError):
+            results[place_name] = {"place": place_name, "error": str(resolved)}
+        else:
+            results[place_name] = {
+                "place": place_name,
+                "timezone": resolved[0],
+                "utc_offset_hours": resolved[1],
+            }
+    return results
+
+
+class ServiceMetrics:
+    """
+    Request timing and queue depth counters for the service.
+
+    Only touched from the event loop thread, so no locking is needed.
+    """
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.in_flight_requests = 0
+        self.pool_queue_depth = 0
+        self.max_pool_queue_depth = 0
+        self.endpoints: Dict[str, Dict[str, float]] = {}
+
+    def record_request(self, endpoint: str, status: int, elapsed: float):
+        """
+        Record the outcome and latency of one request.
+
+        :param endpoint: Endpoint key such as 'POST /calculate'.
+        :param status: HTTP status code returned.
+        :param elapsed: Request latency in seconds.
+        """
+        stats = self.endpoints.setdefault(
+            endpoint,
+            {"count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        )
+        stats["count"] += 1
+        if status >= 400:
+            stats["errors"] += 1
+        stats["total_seconds"] += elapsed
+        stats["max_seconds"] = max(stats["max_seconds"], elapsed)
+
+    def pool_job_started(self):
+        self.pool_queue_depth += 1
+        self.max_pool_queue_depth = max(
+            self.max_pool_queue_depth, self.pool_queue_depth
+        )
+
+    def pool_job_finished(self):
+        self.pool_queue_depth -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the current metrics as a JSON-serializable mapping.
+        """
+        endpoints = {}
+        for endpoint, stats in self.endpoints.items():
+            endpoints[endpoint] = dict(
+                stats,
+                mean_seconds=stats["total_seconds"] / stats["count"],
+            )
+        return {
+            "uptime_seconds": time.monotonic() - self.started_at,
+            "in_flight_requests": self.in_flight_requests,
+            "pool_queue_depth": self.pool_queue_depth,
+            "max_pool_queue_depth": self.max_pool_queue_depth,
+            "endpoints": endpoints,
+        }
+
+
+class TravelTimeService:
+    """
+    Minimal HTTP/1.1 JSON service around TravelTimeCalculator and the timezone resolver.
+
+    Endpoints:
+        - POST /calculate: ``{"flights": [...]}`` for a single itinerary.
+        - POST /calculate/batch: ``{"itineraries": [[...], ...]}``, run in a process pool.
+        - POST /timezone: ``{"place": "..."}``.
+        - POST /timezones: ``{"places": [...]}``, one round-trip for a whole form.
+        - GET /metrics: request timing and queue depth metrics.
+        - GET /metrics/prometheus: calculator and timezone instrumentation as Prometheus text.
+        - GET /health: liveness check.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        workers: Optional[int] = None,
+        batch_chunk_size: int = 1000,
+        timezone_cache: Optional[TimezoneCache] = None,
+    ):
+        """
+        Initializes the TravelTimeService.
+
+        :param host: Interface to bind to.
+        :param port: Port to bind to, 0 picks a free port.
+        :param workers: Number of worker processes for batches (defaults to CPU count).
+        :param batch_chunk_size: Itineraries per process pool task.
+        :param timezone_cache: Cache for timezone lookups (defaults to the shared cache).
+        """
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.batch_chunk_size = batch_chunk_size
+        self.timezone_cache = (
+            default_cache if timezone_cache is None else timezone_cache
+        )
+        self.metrics = ServiceMetrics()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._routes = {
+            ("POST", "/calculate"): self._handle_calculate,
+            ("POST", "/calculate/batch"): self._handle_batch,
+            ("POST", "/timezone"): self._handle_timezone,
+            ("POST", "/timezones"): self._handle_timezones,
+            ("GET", "/metrics"): self._handle_metrics,
+            ("GET", "/metrics/prometheus"): self._handle_prometheus,
+            ("GET", "/health"): self._handle_health,
+        }
+
+    async def start(self):
+        """
+        Start the process pool and begin listening for connections.
+        """
+        # Workers are created lazily while connections are open; forked workers
+        # would inherit the client sockets and keep them from closing
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._server = await asyncio.start_server(
+            self._handle_connection, self.host, self.port
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        """
+        Start the service and serve until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stop listening and shut down the process pool.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+            self._pool = None
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                started = time.perf_counter()
+                self.metrics.in_flight_requests += 1
+                try:
+                    status, payload = await self._dispatch(method, path, body)
+                finally:
+                    self.metrics.in_flight_requests -= 1
+                self.metrics.record_request(
+                    f"{method} {path}", status, time.perf_counter() - started
+                )
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except RequestError as e:
+            await self._write_response(writer, e.status, {"error": e.message}, False)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_request(
+        self, reader: asyncio.StreamReader
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        request_line = await reader.readline()
+        if not request_line:
+            return None
+        try:
+            method, target, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise RequestError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise RequestError(400, "Invalid Content-Length header")
+        if content_length > MAX_BODY_BYTES:
+            raise RequestError(413, "Request body too large")
+        body = await reader.readexactly(content_length) if content_length else b""
+        path = target.split("?", 1)[0]
+        return method.upper(), path, headers, body
+
+    async def _write_response(
+        self,
+        writer: asyncio.StreamWriter,
+        status: int,
+        payload: Any,
+        keep_alive: bool,
+    ):
+        if isinstance(payload, str):
+            content_type = "text/plain; version=0.0.4"
+            body = payload.encode("utf-8")
+        else:
+            content_type = "application/json"
+            body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status} {STATUS_REASONS.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            # The web UI is served from another origin and calls us directly
+            "Access-Control-Allow-Origin: *\r\n"
+            "Access-Control-Allow-Methods: GET, POST, OPTIONS\r\n"
+            "Access-Control-Allow-Headers: Content-Type\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            "\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    async def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Any]:
+        handler = self._routes.get((method, path))
+        known_path = any(route_path == path for _, route_path in self._routes)
+        if method == "OPTIONS" and known_path:
+            # CORS preflight, the allow headers go out with every response
+            return 200, {}
+        if handler is None:
+            if known_path:
+                return 405, {"error": f"Method {method} not allowed for {path}"}
+            return 404, {"error": f"Unknown endpoint: {path}"}
+        try:
+            data = json.loads(body) if body else {}
+        except ValueError as e:
+            return 400, {"error": f"Invalid JSON body: {e}"}
+        try:
+            return 200, await handler(data)
+        except RequestError as e:
+            return e.status, {"error": e.message}
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Internal error: {e}"}
+
+    async def _run_in_pool(self, func, *args):
+        loop = asyncio.get_running_loop()
+        self.metrics.pool_job_started()
+        try:
+            return await loop.run_in_executor(self._pool, func, *args)
+        finally:
+            self.metrics.pool_job_finished()
+
+    async def _handle_calculate(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict) or "flights" not in data:
+            raise RequestError(400, "Expected a JSON object with a 'flights' list")
+        # Single itineraries are cheap, answering inline beats a pool round-trip
+        return calculate_itinerary(data["flights"])
+
+    async def _handle_batch(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict) or not isinstance(data.get("itineraries"), list):
+            raise RequestError(
+                400, "Expected a JSON object with an 'itineraries' list"
+            )
+        itineraries = data["itineraries"]
+        chunks = [
+            itineraries[start : start + self.batch_chunk_size]
+            for start in range(0, len(itineraries), self.batch_chunk_size)
+        ]
+        chunk_results = await asyncio.gather(
+            *(self._run_in_pool(calculate_batch, chunk) for chunk in chunks)
+        )
+        return {"results": [result for chunk in chunk_results for result in chunk]}
+
+    async def _handle_timezone(self, data: Any) -> Dict[str, Any]:
+        if not isinstance(data, dict) or not isinstance(data.get("place"), str):
+            raise RequestError(400, "Expected a JSON object with a 'place' string")
+        # Geocoding is network-bound, so a thread keeps the event loop responsive
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, resolve_timezone, data["place"], self.timezone_cache
+        )
+
+    async def _handle_timezones(self, data: Any) -> Dict[str, Any]:
+        places = data.get("places") if isinstance(data, dict) else None
+        if not isinstance(places, list) or not all(
+            isinstance(place, str) for place in places
+        ):
+            raise RequestError(400, "Expected a JSON object with a 'places' list")
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            None, resolve_timezones, places, self.timezone_cache
+        )
+        return {"results": results}
+
+    async def _handle_metrics(self, data: Any) -> Dict[str, Any]:
+        return dict(
+            self.metrics.snapshot(),
+            timezone_cache=self.timezone_cache.stats(),
+            timezone_cache_stages=self.timezone_cache.stage_stats(),
+            instrumentation=instrumentation.metrics.snapshot(),
+        )
+
+    async def _handle_prometheus(self, data: Any) -> str:
+        return instrumentation.metrics.to_prometheus()
+
+    async def _handle_health(self, data: Any) -> Dict[str, Any]:
+        return {"status": "ok"}
+
+
+def _report_warm_up(future: "asyncio.Future"):
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        print(f"Cache warm-up failed: {error}")
+    else:
+        print(f"Cache warm-up finished: {future.result()}")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Travel time calculator HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-chunk-size", type=int, default=1000)
+    parser.add_argument(
+        "--instrument",
+        action="store_true",
+        help="Record calculator and timezone metrics (batch workers are not covered)",
+    )
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help="Timezone cache snapshot to load at startup and save at shutdown",
+    )
+    parser.add_argument(
+        "--warm-up-log",
+        default=None,
+        help="Log of past place queries to resolve in the background at startup",
+    )
+    parser.add_argument("--warm-up-limit", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.instrument:
+        instrumentation.enable()
+
+    service = TravelTimeService(
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        batch_chunk_size=args.batch_chunk_size,
+    )
+
+    cache = service.timezone_cache
+    if args.snapshot and os.path.exists(args.snapshot):
+        report = cache_snapshot.load_snapshot(cache, args.snapshot)
+        print(
+            f"Loaded {report.loaded} cached places from {args.snapshot}, "
+            f"{report.invalidated} invalidated (tzdata {report.snapshot_version} "
+            f"-> {report.tzdata_version})"
+        )
+
+    async def run():
+        await service.start()
+        print(f"Serving on http://{service.host}:{service.port}")
+        if args.warm_up_log:
+            # Serve right away; the warm-up geocodes in a thread meanwhile
+            warming = asyncio.get_running_loop().run_in_executor(
+                None,
+                cache_snapshot.warm_up,
+                cache,
+                cache_snapshot.read_query_log(args.warm_up_log),
+                args.warm_up_limit,
+            )
+            warming.add_done_callback(_report_warm_up)
+        try:
+            await service.serve_forever()
+        finally:
+            await service.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if args.snapshot:
+            cache_snapshot.save_snapshot(cache, args.snapshot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""Resolved places shared between processes through a shared memory hash table
+
+One process creates the table; others attach to it by name (or receive it
+pickled, e.g. as a ProcessPoolExecutor initializer argument). Plugged into
+TimezoneCache as its shared backend, one worker's geocoding result becomes a
+hit in every other worker.
+
+The table is an open-addressing hash table of fixed-size slots. Entries are
+only ever inserted or overwritten, never removed, so a reader can stop probing
+at the first empty slot. Each slot carries a sequence counter that a writer
+makes odd before changing the slot and even again afterwards; a reader copies
+the slot and retries if the counter was odd or changed meanwhile (a seqlock).
+Reads therefore take no lock. Writers serialize on an flock()ed file next to
+the segment's name.
+"""
+
+import fcntl
+import hashlib
+import os
+import struct
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, Optional
+
+from src.get_utc_offset_in_hours import ResolvedPlace
+
+DEFAULT_CAPACITY = 65536
+
+# Longest key and timezone name, in UTF-8 bytes; longer entries are not shared
+MAX_KEY_BYTES = 96
+MAX_ZONE_BYTES = 40
+
+_MAGIC = b"TZSHM001"
+# magic, capacity, entry count
+_HEADER = struct.Struct("<8sQQ")
+_HEADER_SIZE = 64
+# sequence, key hash, key length, zone length, latitude, longitude, key, zone
+_SLOT = struct.Struct(f"<QQBB6xdd{MAX_KEY_BYTES}s{MAX_ZONE_BYTES}s")
+_SEQUENCE = struct.Struct("<Q")
+_KEY_OFFSET = struct.calcsize("<QQBB6xdd")
+
+_MAX_READ_ATTEMPTS = 1000
+
+_tracker_lock = threading.Lock()
+
+
+def _key_hash(key: bytes) -> int:
+    # Python's hash() is salted per process, so it cannot index a shared table
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+class SharedPlaceTable:
+    """
+    Fixed-capacity place name to ResolvedPlace table in shared memory.
+
+    Has the get/put interface TimezoneCache expects of a shared backend. Keys
+    are whatever the caller passes; TimezoneCache passes canonical names.
+    """
+
+    def __init__(self, memory: shared_memory.SharedMemory):
+        """
+        Use create() or attach() instead of calling this directly.
+        """
+        magic, capacity, _ = _HEADER.unpack_from(memory.buf, 0)
+        if magic != _MAGIC:
+            raise ValueError(f"Shared memory {memory.name!r} is not a place table")
+        self._memory = memory
+        self._buffer = memory.buf
+        self.name = memory.name
+        self.capacity = capacity
+        self._mask = capacity - 1
+        self._lock_path = os.path.join(
+            tempfile.gettempdir(), f"{self.name.lstrip('/')}.lock"
+        )
+
+    @classmethod
+    def create(
+        cls, capacity: int = DEFAULT_CAPACITY, name: Optional[str] = None
+    ) -> "SharedPlaceTable":
+        """
+        Allocate a new, empty table.
+
+        Args:
+            capacity (int): Number of slots, rounded up to a power of two. Keep
+                it comfortably above the number of distinct places; the table
+                stops accepting entries when full.
+            name (str, optional): Shared memory name; generated when omitted.
+
+        Returns:
+            SharedPlaceTable: The table. The creating process should call
+            unlink() when the table is no longer needed.
+        """
+        if capacity < 1:
+            raise ValueError(f"capacity must be positive, not {capacity}")
+        capacity = 1 << (capacity - 1).bit_length()
+        memory = shared_memory.SharedMemory(
+            name=name, create=True, size=_HEADER_SIZE + capacity * _SLOT.size
+        )
+        memory.buf[: memory.size] = bytes(memory.size)
+        _HEADER.pack_into(memory.buf, 0, _MAGIC, capacity, 0)
+        return cls(memory)
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedPlaceTable":
+        """
+        Open a table another process created.
+
+        Args:
+            name (str): The table's name attribute.
+
+        Returns:
+            SharedPlaceTable: View of the same memory.
+        """
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the segment with this
+            # process's resource tracker, which unlinks it on shutdown and would
+            # destroy it for every other process
+            with _tracker_lock:
+                register = resource_tracker.register
+                resource_tracker.register = lambda name, rtype: None
+                try:
+                    memory = shared_memory.SharedMemory(name=name)
+                finally:
+                    resource_tracker.register = register
+        return cls(memory)
+
+    def __reduce__(self):
+        return SharedPlaceTable.attach, (self.name,)
+
+    def __len__(self):
+        return _HEADER.unpack_from(self._buffer, 0)[2]
+
+    def _offset(self, slot: int) -> int:
+        return _HEADER_SIZE + slot * _SLOT.size
+
+    def _read_slot(self, offset: int) -> tuple:
+        for _ in range(_MAX_READ_ATTEMPTS):
+            fields = _SLOT.unpack_from(self._buffer, offset)
+            sequence = fields[0]
+            if sequence & 1 == 0 and (
+                _SEQUENCE.unpack_from(self._buffer, offset)[0] == sequence
+            ):
+                return fields
+            # A writer is inside this slot; let it finish
+            time.sleep(0)
+        raise TimeoutError(f"Slot at offset {offset} stayed locked by a writer")
+
+    def get(self, key: str) -> Optional[ResolvedPlace]:
+        """
+        Look up an entry without taking any lock.
+
+        Args:
+            key (str): The key the entry was stored under.
+
+        Returns:
+            ResolvedPlace or None: The entry, if any process stored one.
+        """
+        encoded = key.encode()
+        if len(encoded) > MAX_KEY_BYTES:
+            return None
+        key_hash = _key_hash(encoded)
+        slot = key_hash & self._mask
+        for _ in range(self.capacity):
+            (
+                sequence,
+                stored_hash,
+                key_length,
+                zone_length,
+                latitude,
+                longitude,
+                stored_key,
+                zone,
+            ) = self._read_slot(self._offset(slot))
+            if sequence == 0:
+                return None
+            if stored_hash == key_hash and stored_key[:key_length] == encoded:
+                return ResolvedPlace(zone[:zone_length].decode(), latitude, longitude)
+            slot = (slot + 1) & self._mask
+        return None
+
+    @contextmanager
+    def _write_lock(self):
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def put(self, key: str, place: ResolvedPlace) -> bool:
+        """
+        Store or overwrite an entry.
+
+        Args:
+            key (str): The key to store the entry under.
+            place (ResolvedPlace): The resolved timezone and coordinates.
+
+        Returns:
+            bool: False if the entry was not stored because the key or zone
+            name is too long or the table is full.
+        """
+        encoded = key.encode()
+        zone = place.timezone_name.encode()
+        if len(encoded) > MAX_KEY_BYTES or len(zone) > MAX_ZONE_BYTES:
+            return False
+        key_hash = _key_hash(encoded)
+        with self._write_lock():
+            slot = key_hash & self._mask
+            for _ in range(self.capacity):
+                offset = self._offset(slot)
+                sequence, stored_hash, key_length = _SLOT.unpack_from(
+                    self._buffer, offset
+                )[:3]
+                empty = sequence == 0
+                key_start = offset + _KEY_OFFSET
+                if empty or (
+                    stored_hash == key_hash
+                    and bytes(self._buffer[key_start : key_start + key_length])
+                    == encoded
+                ):
+                    break
+                slot = (slot + 1) & self._mask
+            else:
+                return False
+
+            _SEQUENCE.pack_into(self._buffer, offset, sequence + 1)
+            _SLOT.pack_into(
+                self._buffer,
+                offset,
+                sequence + 1,
+                key_hash,
+                len(encoded),
+                len(zone),
+                place.latitude,
+                place.longitude,
+                encoded,
+                zone,
+            )
+            _SEQUENCE.pack_into(self._buffer, offset, sequence + 2)
+            if empty:
+                magic, capacity, count = _HEADER.unpack_from(self._buffer, 0)
+                _HEADER.pack_into(self._buffer, 0, magic, capacity, count + 1)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: Entry count, capacity and load factor.
+        """
+        entries = len(self)
+        return {
+            "entries": entries,
+            "capacity": self.capacity,
+            "load_factor": entries / self.capacity,
+        }
+
+    def close(self):
+        """
+        Detach this process from the table.
+        """
+        self._buffer = None
+        self._memory.close()
+
+    def unlink(self):
+        """
+        Destroy the table for every process; call once, from the creator.
+        """
+        self._memory.unlink()
+        try:
+            os.remove(self._lock_path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,216 @@
+"""Great-circle distance and implied ground speed checks for itinerary legs"""
+
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.calculator import Flight
+from src.itinerary_arrays import LegArrays, leg_arrays
+from src.timezone_cache import TimezoneCache, default_cache
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Comfortably above any airliner's ground speed, even with a strong jet stream
+DEFAULT_MAX_SPEED_KMH = 1200.0
+
+
+def haversine_km(
+    latitude1: np.ndarray,
+    longitude1: np.ndarray,
+    latitude2: np.ndarray,
+    longitude2: np.ndarray,
+) -> np.ndarray:
+    """
+    Great-circle distance between points given in degrees, element-wise.
+
+    :return: Distances in kilometres, broadcast like the inputs.
+    """
+    phi1, phi2 = np.radians(latitude1), np.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = np.radians(np.subtract(longitude2, longitude1)) / 2
+    a = np.sin(half_dphi) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+def city_coordinates(
+    city_names: Iterable[str],
+    cache: Optional[TimezoneCache] = None,
+    resolve: bool = False,
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Coordinates of cities from the timezone cache.
+
+    :param city_names: City names as used in Flight objects.
+    :param cache: TimezoneCache to read; defaults to the shared default cache.
+    :param resolve: Geocode cities missing from the cache. Off by default, so
+        the bad city names a data check is looking for never reach the
+        geocoder.
+    :return: Mapping from city name to (latitude, longitude). Cities that
+        cannot be resolved are left out.
+    """
+    cache = default_cache if cache is None else cache
+    coordinates = {}
+    for name in dict.fromkeys(city_names):
+        if resolve:
+            try:
+                place = cache.resolve_place(name)
+            except ValueError:
+                continue
+        else:
+            place = cache.get(name)
+            if place is None:
+                continue
+        coordinates[name] = (place.latitude, place.longitude)
+    return coordinates
+
+
+class CityDistanceMatrix:
+    """
+    Precomputed great-circle distances between every pair of known cities.
+
+    Distances are stored as float32 to halve the n x n memory; looking up a
+    leg is then a plain array gather with no trigonometry. Building the matrix
+    costs n x n haversines, so keep one and reuse it across batches.
+    """
+
+    def __init__(self, coordinates: Mapping[str, Tuple[float, float]]):
+        """
+        :param coordinates: Mapping from city name to (latitude, longitude).
+        """
+        self.coordinates: Dict[str, Tuple[float, float]] = dict(coordinates)
+        self.names: List[str] = list(coordinates)
+        self.index: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        points = np.array([coordinates[name] for name in self.names], dtype=np.float64)
+        points = points.reshape(-1, 2)
+        latitude, longitude = points[:, 0], points[:, 1]
+        self.kilometres = haversine_km(
+            latitude[:, None], longitude[:, None], latitude[None, :], longitude[None, :]
+        ).astype(np.float32)
+
+    def __len__(self):
+        return len(self.names)
+
+    def covers(self, coordinates: Mapping[str, Tuple[float, float]]) -> bool:
+        """
+        Whether every city is in the matrix at the same coordinates.
+        """
+        return all(
+            self.coordinates.get(name) == point for name, point in coordinates.items()
+        )
+
+    def indices(self, city_names: Iterable[str]) -> np.ndarray:
+        """
+        Matrix indices of cities, -1 for unknown ones.
+        """
+        return np.array(
+            [self.index.get(name, -1) for name in city_names], dtype=np.int64
+        )
+
+    def distances(self, origins: np.ndarray, destinations: np.ndarray) -> np.ndarray:
+        """
+        Distances in kilometres between index arrays; NaN where either is unknown.
+        """
+        known = (origins >= 0) & (destinations >= 0)
+        result = np.full(len(origins), np.nan)
+        result[known] = self.kilometres[origins[known], destinations[known]]
+        return result
+
+
+class SpeedCheck(NamedTuple):
+    """
+    Per-leg distance and implied speed, flat over all legs as in LegArrays.
+
+    speed_kmh is infinite for zero-duration legs between different cities and
+    NaN where a city's coordinates are unknown; such legs are never flagged.
+    matrix is the CityDistanceMatrix used, for reuse in the next check.
+    """
+
+    legs: LegArrays
+    distance_km: np.ndarray
+    speed_kmh: np.ndarray
+    flagged: np.ndarray
+    matrix: Optional[CityDistanceMatrix] = None
+
+    def flagged_legs(self) -> List[Tuple[int, int]]:
+        """
+        (itinerary index, 0-based leg index) of every flagged leg.
+        """
+        owners = self.legs.owner[self.flagged]
+        positions = self.flagged - self.legs.bounds[owners]
+        return list(zip(owners.tolist(), positions.tolist()))
+
+
+def check_speeds(
+    itineraries: Sequence[Sequence[Flight]],
+    distances: CityDistanceMatrix,
+    max_speed_kmh: float = DEFAULT_MAX_SPEED_KMH,
+    legs: Optional[LegArrays] = None,
+) -> SpeedCheck:
+    """
+    Flag legs whose distance cannot be covered in their block time.
+
+    Catches data errors such as a wrong UTC offset or a swapped date, which
+    shorten a leg's duration without making it negative.
+
+    :param itineraries: Itineraries to check.
+    :param distances: Distance matrix covering the cities of the itineraries.
+    :param max_speed_kmh: Fastest plausible ground speed.
+    :param legs: LegArrays of the same itineraries, if already built.
+    :return: SpeedCheck.
+    :raises ValueError: If a leg is invalid; the message names the itinerary.
+    """
+    if legs is None:
+        legs = leg_arrays(itineraries)
+    origins = distances.indices(
+        flight.departure_city for flights in itineraries for flight in flights
+    )
+    destinations = distances.indices(
+        flight.arrival_city for flights in itineraries for flight in flights
+    )
+    distance = distances.distances(origins, destinations)
+    hours = (legs.arrival - legs.departure) / 60
+    with np.errstate(divide="ignore", invalid="ignore"):
+        speed = np.where(distance > 0, distance / hours, 0.0)
+    speed[np.isnan(distance)] = np.nan
+    return SpeedCheck(
+        legs=legs,
+        distance_km=distance,
+        speed_kmh=speed,
+        flagged=np.flatnonzero(speed > max_speed_kmh),
+        matrix=distances,
+    )
+
+
+def check_speeds_cached(
+    itineraries: Sequence[Sequence[Flight]],
+    cache: Optional[TimezoneCache] = None,
+    max_speed_kmh: float = DEFAULT_MAX_SPEED_KMH,
+    resolve: bool = False,
+    distances: Optional[CityDistanceMatrix] = None,
+) -> SpeedCheck:
+    """
+    check_speeds with city coordinates taken from the timezone cache.
+
+    The distance matrix is only rebuilt when a city is missing from the one
+    given, so passing the previous result's matrix back in lets repeated
+    batches over the same network skip the n x n haversines.
+
+    :param itineraries: Itineraries to check.
+    :param cache: TimezoneCache to read; defaults to the shared default cache.
+    :param max_speed_kmh: Fastest plausible ground speed.
+    :param resolve: Geocode cities missing from the cache.
+    :param distances: Matrix from an earlier check, e.g. SpeedCheck.matrix.
+    :return: SpeedCheck.
+    """
+    cities = (
+        city
+        for flights in itineraries
+        for flight in flights
+        for city in (flight.departure_city, flight.arrival_city)
+    )
+    coordinates = city_coordinates(cities, cache, resolve)
+    if distances is None:
+        distances = CityDistanceMatrix(coordinates)
+    elif not distances.covers(coordinates):
+        distances = CityDistanceMatrix({**distances.coordinates, **coordinates})
+    return check_speeds(itineraries, distances, max_speed_kmh)
@@ -0,0 +1,333 @@
+"""In-process cache in front of the place name to timezone pipeline"""
+
+import threading
+import time
+from typing import Callable, Dict, Iterable, Mapping, Optional, Tuple, Union
+
+from src import get_utc_offset_in_hours
+from src.get_utc_offset_in_hours import ResolvedPlace, get_utc_offset_hours
+from src.instrumentation import metrics
+from src.place_names import DEFAULT_ALIASES, canonical_place_name, normalize_aliases
+
+_cache_hits = metrics.counter(
+    "timezone_cache_hits_total", "Timezone lookups answered from the cache."
+)
+_cache_misses = metrics.counter(
+    "timezone_cache_misses_total", "Timezone lookups that had to be geocoded."
+)
+_canonical_hits = metrics.counter(
+    "timezone_cache_canonical_hits_total",
+    "Timezone cache hits found only after canonicalizing the place name.",
+)
+_negative_hits = metrics.counter(
+    "timezone_cache_negative_hits_total",
+    "Lookups of places recently found not to exist, answered without geocoding.",
+)
+_shared_hits = metrics.counter(
+    "timezone_cache_shared_hits_total",
+    "Timezone cache hits answered by a place another process resolved.",
+)
+
+DEFAULT_NEGATIVE_TTL = 3600.0
+DEFAULT_MAX_NEGATIVE_ENTRIES = 10_000
+
+STAGES = ("exact", "canonical", "shared", "negative")
+
+
+class TimezoneCache:
+    """
+    Caches resolved places so each place name is geocoded at most once.
+
+    Lookups go through four stages: the name as given, its canonical form
+    (casefolded, accents and punctuation stripped, aliases applied), an optional shared backend filled by other processes, and a
+    negative cache of names that recently failed to resolve. Only the timezone
+    name and coordinates are cached; UTC offsets are computed on every lookup
+    so cached entries stay correct across DST changes.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        resolver: Optional[Callable[[str], ResolvedPlace]] = None,
+        aliases: Optional[Mapping[str, str]] = None,
+        negative_ttl: float = DEFAULT_NEGATIVE_TTL,
+        max_negative_entries: int = DEFAULT_MAX_NEGATIVE_ENTRIES,
+        clock: Callable[[], float] = time.monotonic,
+        shared=None,
+    ):
+        """
+        Args:
+            resolver (callable, optional): Function mapping a place name to a
+                ResolvedPlace. Defaults to resolve_place_with_suggestions.
+            aliases (mapping, optional): Alternative name to preferred name.
+                Defaults to place_names.DEFAULT_ALIASES.
+            negative_ttl (float): Seconds a failed lookup is remembered; 0
+                disables the negative cache.
+            max_negative_entries (int): Bound on remembered failures.
+            clock (callable): Monotonic clock in seconds, replaceable in tests.
+            shared (optional): Cross-process store with get(key) and
+                put(key, place), e.g. a shared_cache.SharedPlaceTable. It is
+                consulted on a local miss and receives every resolved place.
+        """
+        self._resolver = resolver
+        self._aliases = (
+            DEFAULT_ALIASES if aliases is None else normalize_aliases(aliases)
+        )
+        self.negative_ttl = negative_ttl
+        self.max_negative_entries = max_negative_entries
+        self._clock = clock
+        self.shared = shared
+        # Spelling as given -> entry, and canonical name -> entry
+        self._exact: Dict[str, ResolvedPlace] = {}
+        self._entries: Dict[str, ResolvedPlace] = {}
+        # Canonical name -> (expiry time, error message)
+        self._negative: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._stage_lookups = dict.fromkeys(STAGES, 0)
+        self._stage_hits = dict.fromkeys(STAGES, 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def canonical_name(self, place_name: str) -> str:
+        """
+        Args:
+            place_name (str): The name of the place.
+
+        Returns:
+            str: The key the place is cached under.
+        """
+        return canonical_place_name(place_name, self._aliases)
+
+    def get(self, place_name: str) -> Optional[ResolvedPlace]:
+        """
+        Look up a place without resolving it.
+
+        Args:
+            place_name (str): The name of the place, in any spelling.
+
+        Returns:
+            ResolvedPlace or None: The cached entry, if any.
+        """
+        place = self._exact.get(place_name)
+        if place is None:
+            place = self._entries.get(self.canonical_name(place_name))
+        return place
+
+    def put(self, place_name: str, place: ResolvedPlace):
+        """
+        Store a resolved place.
+
+        Args:
+            place_name (str): The name of the place.
+            place (ResolvedPlace): The resolved timezone and coordinates.
+        """
+        key = self.canonical_name(place_name)
+        with self._lock:
+            self._entries[key] = place
+            self._exact[place_name] = place
+            self._negative.pop(key, None)
+
+    def entries(self) -> Dict[str, ResolvedPlace]:
+        """
+        Returns:
+            dict: Copy of the cached places, keyed by canonical name.
+        """
+        with self._lock:
+            return dict(self._entries)
+
+    def clear(self):
+        """
+        Drop every cached entry and remembered failure and reset the statistics.
+        """
+        with self._lock:
+            self._exact.clear()
+            self._entries.clear()
+            self._negative.clear()
+            self.hits = 0
+            self.misses = 0
+            self._stage_lookups = dict.fromkeys(STAGES, 0)
+            self._stage_hits = dict.fromkeys(STAGES, 0)
+
+    def _record(self, stage: str, hit: bool):
+        with self._lock:
+            self._stage_lookups[stage] += 1
+            if hit:
+                self._stage_hits[stage] += 1
+                self.hits += 1
+
+    def _remember_failure(self, key: str, message: str):
+        with self._lock:
+            if len(self._negative) >= self.max_negative_entries:
+                now = self._clock()
+                expired = [
+                    name for name, (expiry, _) in self._negative.items() if expiry <= now
+                ]
+                for stale in expired:
+                    del self._negative[stale]
+                while len(self._negative) >= self.max_negative_entries:
+                    # Dicts keep insertion order, so this drops the oldest failure
+                    del self._negative[next(iter(self._negative))]
+            self._negative[key] = (self._clock() + self.negative_ttl, message)
+
+    def resolve_place(self, place_name: str) -> ResolvedPlace:
+        """
+        Resolve a place, geocoding it only on a cache miss.
+
+        Args:
+            place_name (str): The name of the place (e.g., "New York").
+
+        Returns:
+            ResolvedPlace: The timezone name and coordinates of the place.
+
+        Raises:
+            ValueError: If the place or its timezone cannot be found, including
+                when the same canonical name failed within negative_ttl.
+        """
+        place = self._exact.get(place_name)
+        self._record("exact", place is not None)
+        if place is not None:
+            if metrics.enabled:
+                _cache_hits.inc()
+            return place
+
+        key = self.canonical_name(place_name)
+        place = self._entries.get(key)
+        self._record("canonical", place is not None)
+        if place is not None:
+            self._exact[place_name] = place
+            if metrics.enabled:
+                _cache_hits.inc()
+                _canonical_hits.inc()
+            return place
+
+        if self.shared is not None:
+            place = self.shared.get(key)
+            self._record("shared", place is not None)
+            if place is not None:
+                with self._lock:
+                    self._entries[key] = place
+                    self._exact[place_name] = place
+                if metrics.enabled:
+                    _cache_hits.inc()
+                    _shared_hits.inc()
+                return place
+
+        failure = self._negative.get(key)
+        if failure is not None and failure[0] <= self._clock():
+            failure = None
+        self._record("negative", failure is not None)
+        if failure is not None:
+            if metrics.enabled:
+                _negative_hits.inc()
+            raise ValueError(failure[1])
+
+        with self._lock:
+            self.misses += 1
+        if metrics.enabled:
+            _cache_misses.inc()
+        resolver = (
+            self._resolver or get_utc_offset_in_hours.resolve_place_with_suggestions
+        )
+        try:
+            place = resolver(place_name)
+        except ValueError as e:
+            if self.negative_ttl > 0:
+                self._remember_failure(key, str(e))
+            raise
+        self.put(place_name, place)
+        if self.shared is not None:
+            self.shared.put(key, place)
+        return place
+
+    def resolve(self, place_name: str) -> Tuple[str, float]:
+        """
+        Cached equivalent of get_timezone_with_suggestions.
+
+        Args:
+            place_name (str): The name of the place (e.g., "New York").
+
+        Returns:
+            tuple: A tuple containing the timezone name and the UTC offset in hours.
+        """
+        place = self.resolve_place(place_name)
+        return place.timezone_name, get_utc_offset_hours(place.timezone_name)
+
+    def resolve_many(
+        self, place_names: Iterable[str]
+    ) -> Dict[str, Union[Tuple[str, float], ValueError]]:
+        """
+        Resolve several places, geocoding each distinct name once.
+
+        Failures are reported per place instead of aborting the whole batch.
+
+        Args:
+            place_names (iterable of str): The names of the places.
+
+        Returns:
+            dict: Maps each distinct place name to its (timezone name, UTC offset)
+            tuple, or to the ValueError raised while resolving it.
+        """
+        results: Dict[str, Union[Tuple[str, float], ValueError]] = {}
+        for place_name in place_names:
+            if place_name in results:
+                continue
+            try:
+                results[place_name] = self.resolve(place_name)
+            except ValueError as e:
+                results[place_name] = e
+        return results
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns:
+            dict: Entry count, hits, misses and hit rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Returns:
+            dict: Per stage ('exact', 'canonical', 'shared', 'negative'), the lookups
+            that reached it, its hits and its hit rate, plus the number of
+            remembered failures.
+        """
+        with self._lock:
+            stages = {
+                stage: {
+                    "lookups": self._stage_lookups[stage],
+                    "hits": self._stage_hits[stage],
+                    "hit_rate": (
+                        self._stage_hits[stage] / self._stage_lookups[stage]
+                        if self._stage_lookups[stage]
+                        else 0.0
+                    ),
+                }
+                for stage in STAGES
+            }
+            stages["negative"]["entries"] = len(self._negative)
+        return stages
+
+
+default_cache = TimezoneCache()
+
+
+def get_timezone_cached(place_name: str) -> Tuple[str, float]:
+    """
+    Cached get_timezone_with_suggestions backed by the shared default cache.
+
+    Args:
+        place_name (str): The name of the place (e.g., "New York").
+
+    Returns:
+        tuple: A tuple containing the timezone name and the UTC offset in hours.
+    """
+    return default_cache.resolve(place_name)
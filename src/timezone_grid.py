@@ -0,0 +1,258 @@
+"""Precomputed raster grid of timezones for vectorized coordinate lookups
+
+The grid stores one zone id per fixed-size lat/lon cell. Cells whose sample
+points do not all agree straddle a border and are marked with BORDER_CELL;
+only points falling into those cells are resolved with TimezoneFinder's
+polygon test.
+
+Build once, then memory-map it in every process:
+
+    python -m src.timezone_grid build data/tz_grid --resolution 0.25
+"""
+
+import argparse
+import json
+import os
+import threading
+from typing import Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+from timezonefinder import TimezoneFinder
+
+BORDER_CELL = -1
+UNKNOWN_ZONE = 0
+
+GRID_FILE = "grid.npy"
+ZONES_FILE = "zones.json"
+
+DEFAULT_RESOLUTION = 0.25
+DEFAULT_SAMPLES_PER_SIDE = 2
+
+ArrayLike = Union[float, Iterable[float], np.ndarray]
+
+
+def _lattice_zone_names(
+    finder, resolution: float, samples_per_side: int
+) -> Tuple[np.ndarray, List[Optional[str]]]:
+    """
+    Look up the zone at every point of the sampling lattice.
+
+    Returns:
+        tuple: Lattice of indices into the returned list of zone names.
+    """
+    rows = round(180 / resolution)
+    columns = round(360 / resolution)
+    step = resolution / samples_per_side
+    # Keep the poles and the antimeridian inside the polygon data's valid range
+    latitudes = np.clip(
+        -90 + step * np.arange(rows * samples_per_side + 1), -89.9999, 89.9999
+    )
+    longitudes = np.clip(
+        -180 + step * np.arange(columns * samples_per_side + 1), -180.0, 179.9999
+    )
+
+    names: List[Optional[str]] = [None]
+    ids = {None: UNKNOWN_ZONE}
+    lattice = np.empty((len(latitudes), len(longitudes)), dtype=np.int32)
+    for row, latitude in enumerate(latitudes.tolist()):
+        for column, longitude in enumerate(longitudes.tolist()):
+            name = finder.timezone_at(lng=longitude, lat=latitude)
+            zone_id = ids.get(name)
+            if zone_id is None:
+                zone_id = ids[name] = len(names)
+                names.append(name)
+            lattice[row, column] = zone_id
+    return lattice, names
+
+
+def build_grid(
+    path: str,
+    resolution: float = DEFAULT_RESOLUTION,
+    samples_per_side: int = DEFAULT_SAMPLES_PER_SIDE,
+    finder=None,
+) -> "TimezoneGrid":
+    """
+    Build the grid with polygon lookups and save it to a directory.
+
+    A cell gets a zone id when all (samples_per_side + 1) ** 2 lattice points on
+    and inside its edges agree; otherwise it is a border cell. Small enclaves
+    that slip between sample points are the price of the resolution.
+
+    Args:
+        path (str): Directory to write grid.npy and zones.json to.
+        resolution (float): Cell size in degrees; must divide 180.
+        samples_per_side (int): Lattice intervals per cell side.
+        finder (optional): Object with TimezoneFinder's timezone_at(lng=, lat=).
+
+    Returns:
+        TimezoneGrid: The saved grid, memory-mapped from disk.
+    """
+    if resolution <= 0 or abs(180 / resolution - round(180 / resolution)) > 1e-9:
+        raise ValueError(f"resolution must divide 180 degrees, not {resolution}")
+    finder = TimezoneFinder() if finder is None else finder
+    lattice, names = _lattice_zone_names(finder, resolution, samples_per_side)
+
+    k = samples_per_side
+    rows = (lattice.shape[0] - 1) // k
+    columns = (lattice.shape[1] - 1) // k
+    grid = lattice[0 : rows * k : k, 0 : columns * k : k].copy()
+    uniform = np.ones((rows, columns), dtype=bool)
+    for row_offset in range(k + 1):
+        for column_offset in range(k + 1):
+            samples = lattice[
+                row_offset : row_offset + rows * k : k,
+                column_offset : column_offset + columns * k : k,
+            ]
+            uniform &= samples == grid
+    grid[~uniform] = BORDER_CELL
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, GRID_FILE), grid.astype(np.int16))
+    with open(os.path.join(path, ZONES_FILE), "w") as f:
+        json.dump({"resolution": resolution, "zones": names}, f)
+    return TimezoneGrid.load(path, finder=finder)
+
+
+class TimezoneGrid:
+    """
+    Raster timezone index answering lookups by array gather.
+
+    Safe to share between threads; the grid itself is read-only.
+    """
+
+    def __init__(
+        self,
+        grid: np.ndarray,
+        zone_names: List[Optional[str]],
+        resolution: float,
+        finder=None,
+    ):
+        """
+        Args:
+            grid (ndarray): (rows, columns) zone ids, row 0 at -90 latitude and
+                column 0 at -180 longitude.
+            zone_names (list): Zone name per id; id 0 is None (no zone).
+            resolution (float): Cell size in degrees.
+            finder (optional): Polygon lookup for border cells; a
+                TimezoneFinder is created on first use when omitted.
+        """
+        self.grid = grid
+        self.zone_names = list(zone_names)
+        self.resolution = resolution
+        self._finder = finder
+        self._ids = {name: zone_id for zone_id, name in enumerate(self.zone_names)}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path: str, finder=None) -> "TimezoneGrid":
+        """
+        Memory-map a grid saved by build_grid.
+
+        Args:
+            path (str): Directory containing grid.npy and zones.json.
+            finder (optional): Polygon lookup for border cells.
+
+        Returns:
+            TimezoneGrid: Grid whose cells are paged in from disk on demand.
+        """
+        with open(os.path.join(path, ZONES_FILE)) as f:
+            meta = json.load(f)
+        grid = np.load(os.path.join(path, GRID_FILE), mmap_mode="r")
+        return cls(grid, meta["zones"], meta["resolution"], finder)
+
+    @property
+    def finder(self):
+        if self._finder is None:
+            self._finder = TimezoneFinder()
+        return self._finder
+
+    def border_fraction(self) -> float:
+        """
+        Returns:
+            float: Share of cells that need the polygon fallback.
+        """
+        border_cells = np.count_nonzero(np.asarray(self.grid) == BORDER_CELL)
+        return float(border_cells) / self.grid.size
+
+    def _zone_id(self, name: Optional[str]) -> int:
+        zone_id = self._ids.get(name)
+        if zone_id is None:
+            # A zone only present inside border cells
+            with self._lock:
+                zone_id = self._ids.get(name)
+                if zone_id is None:
+                    zone_id = self._ids[name] = len(self.zone_names)
+                    self.zone_names.append(name)
+        return zone_id
+
+    def zone_ids(self, latitudes: ArrayLike, longitudes: ArrayLike) -> np.ndarray:
+        """
+        Zone ids for arrays of coordinates.
+
+        Args:
+            latitudes (array-like): Latitudes in degrees.
+            longitudes (array-like): Longitudes in degrees, any range.
+
+        Returns:
+            ndarray: Indices into zone_names, shaped like the broadcast inputs.
+        """
+        latitudes, longitudes = np.broadcast_arrays(
+            np.asarray(latitudes, dtype=np.float64),
+            np.asarray(longitudes, dtype=np.float64),
+        )
+        rows, columns = self.grid.shape
+        row = np.clip(((latitudes + 90) / self.resolution).astype(np.int64), 0, rows - 1)
+        wrapped = np.mod(longitudes + 180, 360)
+        column = np.clip((wrapped / self.resolution).astype(np.int64), 0, columns - 1)
+        ids = np.asarray(self.grid[row, column], dtype=np.int32)
+
+        border = np.flatnonzero(ids == BORDER_CELL)
+        if border.size:
+            flat_ids = ids.reshape(-1)
+            flat_latitudes = latitudes.reshape(-1)[border].tolist()
+            flat_longitudes = (wrapped.reshape(-1)[border] - 180).tolist()
+            for index, latitude, longitude in zip(
+                border.tolist(), flat_latitudes, flat_longitudes
+            ):
+                name = self.finder.timezone_at(lng=longitude, lat=latitude)
+                flat_ids[index] = self._zone_id(name)
+        return ids
+
+    def timezone_names(self, latitudes: ArrayLike, longitudes: ArrayLike) -> np.ndarray:
+        """
+        Zone names for arrays of coordinates.
+
+        Returns:
+            ndarray: Object array of IANA zone names (None where there is none).
+        """
+        # Border cells can add zones, so take the names after the lookup
+        ids = self.zone_ids(latitudes, longitudes)
+        names = np.array(self.zone_names, dtype=object)
+        return names[ids]
+
+    def timezone_at(self, lng: float, lat: float) -> Optional[str]:
+        """
+        Single-point lookup with TimezoneFinder's signature, so the grid can be
+        used wherever a TimezoneFinder is expected.
+        """
+        return self.zone_names[int(self.zone_ids(lat, lng))]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a raster timezone grid.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    build = subparsers.add_parser("build", help="build and save a grid")
+    build.add_argument("path", help="output directory")
+    build.add_argument("--resolution", type=float, default=DEFAULT_RESOLUTION)
+    build.add_argument("--samples", type=int, default=DEFAULT_SAMPLES_PER_SIDE)
+    args = parser.parse_args(argv)
+
+    grid = build_grid(args.path, args.resolution, args.samples)
+    print(
+        f"Saved {grid.grid.shape[0]}x{grid.grid.shape[1]} grid with "
+        f"{len(grid.zone_names) - 1} zones, {grid.border_fraction():.1%} border cells"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""Bulk itinerary validation that collects errors instead of raising"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from src import zone_offsets
+from src.calculator import Flight
+
+INVALID_DEPARTURE_DATE = "invalid_departure_date"
+INVALID_DEPARTURE_TIME = "invalid_departure_time"
+INVALID_DEPARTURE_OFFSET = "invalid_departure_offset"
+INVALID_DEPARTURE_TIMEZONE = "invalid_departure_timezone"
+INVALID_ARRIVAL_DATE = "invalid_arrival_date"
+INVALID_ARRIVAL_TIME = "invalid_arrival_time"
+INVALID_ARRIVAL_OFFSET = "invalid_arrival_offset"
+INVALID_ARRIVAL_TIMEZONE = "invalid_arrival_timezone"
+NONEXISTENT_DEPARTURE_TIME = "nonexistent_departure_time"
+NONEXISTENT_ARRIVAL_TIME = "nonexistent_arrival_time"
+AMBIGUOUS_DEPARTURE_TIME = "ambiguous_departure_time"
+AMBIGUOUS_ARRIVAL_TIME = "ambiguous_arrival_time"
+ARRIVAL_BEFORE_DEPARTURE = "arrival_before_departure"
+DEPARTURE_BEFORE_PREVIOUS_ARRIVAL = "departure_before_previous_arrival"
+
+_DEPARTURE_OFFSET_CODES = {
+    "offset": INVALID_DEPARTURE_OFFSET,
+    "timezone": INVALID_DEPARTURE_TIMEZONE,
+    "nonexistent": NONEXISTENT_DEPARTURE_TIME,
+    "ambiguous": AMBIGUOUS_DEPARTURE_TIME,
+}
+_ARRIVAL_OFFSET_CODES = {
+    "offset": INVALID_ARRIVAL_OFFSET,
+    "timezone": INVALID_ARRIVAL_TIMEZONE,
+    "nonexistent": NONEXISTENT_ARRIVAL_TIME,
+    "ambiguous": AMBIGUOUS_ARRIVAL_TIME,
+}
+
+# Same patterns strptime uses for '%Y-%m-%d' and '%H:%M[:%S[.%f]]', so both accept
+# the same strings (seconds 60 and 61 match strptime's pattern but fail afterwards)
+_DATE_PATTERN = re.compile(
+    r"(\d\d\d\d)-(1[0-2]|0[1-9]|[1-9])-(3[01]|[12]\d|0[1-9]|[1-9]| [1-9])"
+)
+_TIME_PATTERN = re.compile(
+    r"(2[0-3]|[0-1]\d|\d):([0-5]\d|\d)(?::([0-5]\d|\d)(?:\.(\d{1,6}))?)?"
+)
+
+_DAYS_BEFORE_MONTH = (0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+_DAYS_IN_MONTH = (0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+_MICROSECONDS_PER_SECOND = 1_000_000
+_MICROSECONDS_PER_DAY = 86_400_000_000
+
+
+class ValidationError(NamedTuple):
+    """
+    One row of the error table.
+
+    leg_index is 0-based, unlike the 1-based flight numbers in calculator messages.
+    """
+
+    itinerary_id: Hashable
+    leg_index: int
+    code: str
+
+
+def _is_leap(year: int) -> bool:
+    return year % 4 == 0 and (year % 100 != 0 or year % 400 == 0)
+
+
+def _day_number(date_str) -> Optional[int]:
+    """
+    Days since 0001-01-01 for a 'YYYY-MM-DD' string, or None if it is invalid.
+    """
+    match = _DATE_PATTERN.fullmatch(date_str) if isinstance(date_str, str) else None
+    if match is None:
+        return None
+    year, month, day = int(match[1]), int(match[2]), int(match[3])
+    if year == 0:
+        return None
+    days_in_month = 29 if month == 2 and _is_leap(year) else _DAYS_IN_MONTH[month]
+    if day > days_in_month:
+        return None
+    previous = year - 1
+    days = previous * 365 + previous // 4 - previous // 100 + previous // 400
+    days += _DAYS_BEFORE_MONTH[month] + (month > 2 and _is_leap(year))
+    return days + day - 1
+
+
+def _microsecond_of_day(time_str) -> Optional[int]:
+    match = _TIME_PATTERN.fullmatch(time_str) if isinstance(time_str, str) else None
+    if match is None:
+        return None
+    seconds = int(match[1]) * 3600 + int(match[2]) * 60 + int(match[3] or 0)
+    fraction = int(match[4].ljust(6, "0")) if match[4] else 0
+    return seconds * _MICROSECONDS_PER_SECOND + fraction
+
+
+def _offset_microseconds(offset, cache: Dict) -> Optional[int]:
+    try:
+        return cache[offset]
+    except KeyError:
+        pass
+    except TypeError:
+        # Unhashable offsets are never valid
+        return None
+    if isinstance(offset, bool) or not isinstance(offset, (int, float)):
+        return None
+    try:
+        # timedelta rounds exactly like the calculator's conversion does
+        microseconds = timedelta(hours=offset) // timedelta(microseconds=1)
+    except (OverflowError, ValueError):
+        microseconds = None
+    cache[offset] = microseconds
+    return microseconds
+
+
+def _zone_offset_microseconds(
+    zone_name, day: Optional[int], time: Optional[int]
+) -> Tuple[Optional[int], Optional[str]]:
+    """
+    UTC offset of a named zone at a local day and time, with the kind of failure
+    ('timezone', 'nonexistent' or 'ambiguous') when there is none.
+    """
+    if day is None or time is None:
+        # Nothing to resolve against; the date or time error is reported instead
+        return 0, None
+    local = datetime.fromordinal(day + 1) + timedelta(microseconds=time)
+    try:
+        offset = zone_offsets.to_utc(zone_name, local)[1]
+    except zone_offsets.NonexistentTimeError:
+        return None, "nonexistent"
+    except zone_offsets.AmbiguousTimeError:
+        return None, "ambiguous"
+    except ValueError:
+        return None, "timezone"
+    return timedelta(hours=offset) // timedelta(microseconds=1), None
+
+
+def validate_itinerary(
+    flights: Sequence[Flight],
+    itinerary_id: Hashable = 0,
+    _offset_cache: Optional[Dict] = None,
+) -> List[ValidationError]:
+    """
+    Check every leg of an itinerary without raising.
+
+    Reports the same conditions compute_travel_times raises for, but keeps going
+    after the first bad leg. A leg with an unusable arrival skips the layover
+    check of the following leg.
+
+    :param flights: Sequence of Flight objects.
+    :param itinerary_id: Identifier copied into each error row.
+    :return: Error rows in leg order; empty if the itinerary is valid.
+    """
+    offset_cache = {} if _offset_cache is None else _offset_cache
+    errors: List[ValidationError] = []
+    previous_arrival: Optional[int] = None
+
+    for leg_index, flight in enumerate(flights):
+        departure_day = _day_number(flight.departure_date)
+        departure_time = _microsecond_of_day(flight.departure_time)
+        arrival_day = _day_number(flight.arrival_date)
+        arrival_time = _microsecond_of_day(flight.arrival_time)
+        departure_zoned = (
+            flight.departure_timezone_utc_offset_in_hours is None
+            and flight.departure_timezone is not None
+        )
+        arrival_zoned = (
+            flight.arrival_timezone_utc_offset_in_hours is None
+            and flight.arrival_timezone is not None
+        )
+        departure_failure = arrival_failure = "offset"
+        if departure_zoned:
+            departure_offset, departure_failure = _zone_offset_microseconds(
+                flight.departure_timezone, departure_day, departure_time
+            )
+        else:
+            departure_offset = _offset_microseconds(
+                flight.departure_timezone_utc_offset_in_hours, offset_cache
+            )
+        if arrival_zoned:
+            arrival_offset, arrival_failure = _zone_offset_microseconds(
+                flight.arrival_timezone, arrival_day, arrival_time
+            )
+        else:
+            arrival_offset = _offset_microseconds(
+                flight.arrival_timezone_utc_offset_in_hours, offset_cache
+            )
+
+        departure = arrival = None
+        if departure_day is None:
+            errors.append(ValidationError(itinerary_id, leg_index, INVALID_DEPARTURE_DATE))
+        if departure_time is None:
+            errors.append(ValidationError(itinerary_id, leg_index, INVALID_DEPARTURE_TIME))
+        if departure_offset is None:
+            code = _DEPARTURE_OFFSET_CODES[departure_failure]
+            errors.append(ValidationError(itinerary_id, leg_index, code))
+        if arrival_day is None:
+            errors.append(ValidationError(itinerary_id, leg_index, INVALID_ARRIVAL_DATE))
+        if arrival_time is None:
+            errors.append(ValidationError(itinerary_id, leg_index, INVALID_ARRIVAL_TIME))
+        if arrival_offset is None:
+            code = _ARRIVAL_OFFSET_CODES[arrival_failure]
+            errors.append(ValidationError(itinerary_id, leg_index, code))
+
+        if None not in (departure_day, departure_time, departure_offset):
+            departure = (
+                departure_day * _MICROSECONDS_PER_DAY + departure_time - departure_offset
+            )
+        if None not in (arrival_day, arrival_time, arrival_offset):
+            arrival = arrival_day * _MICROSECONDS_PER_DAY + arrival_time - arrival_offset
+
+        if departure is not None and arrival is not None and arrival < departure:
+            errors.append(
+                ValidationError(itinerary_id, leg_index, ARRIVAL_BEFORE_DEPARTURE)
+            )
+        if (
+            departure is not None
+            and previous_arrival is not None
+            and departure < previous_arrival
+        ):
+            errors.append(
+                ValidationError(
+                    itinerary_id, leg_index, DEPARTURE_BEFORE_PREVIOUS_ARRIVAL
+                )
+            )
+        previous_arrival = arrival
+
+    return errors
+
+
+def validate_itineraries(
+    itineraries: Iterable[Tuple[Hashable, Sequence[Flight]]],
+) -> List[ValidationError]:
+    """
+    Validate many itineraries in one pass and collect every error.
+
+    :param itineraries: (itinerary id, flights) pairs, e.g. ``dict.items()``.
+    :return: Compact error table of (itinerary id, leg index, error code) rows.
+    """
+    offset_cache: Dict = {}
+    errors: List[ValidationError] = []
+    for itinerary_id, flights in itineraries:
+        errors.extend(validate_itinerary(flights, itinerary_id, offset_cache))
+    return errors
+
+
+def count_errors_by_code(errors: Iterable[ValidationError]) -> Dict[str, int]:
+    """
+    Summarize an error table.
+
+    :param errors: Error rows as returned by validate_itineraries.
+    :return: Number of rows per error code.
+    """
+    counts: Dict[str, int] = {}
+    for error in errors:
+        counts[error.code] = counts.get(error.code, 0) + 1
+    return counts
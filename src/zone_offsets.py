@@ -0,0 +1,279 @@
+"""UTC offsets of IANA timezones for local times, memoized per (zone, date)"""
+
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+# Policies for local times that fall into a gap (nonexistent) or a fold (ambiguous)
+RAISE = "raise"
+SHIFT_FORWARD = "shift_forward"
+EARLIER = "earlier"
+LATER = "later"
+NONEXISTENT_POLICIES = (RAISE, SHIFT_FORWARD)
+AMBIGUOUS_POLICIES = (RAISE, EARLIER, LATER)
+
+_ONE_HOUR = timedelta(hours=1)
+_ONE_DAY = timedelta(days=1)
+_LAST_MICROSECOND = timedelta(days=1, microseconds=-1)
+
+# (zone name, proleptic ordinal of the local date) -> offset in hours, or None
+# when the offset changes during that local day
+_day_offsets: Dict[Tuple[str, int], Optional[float]] = {}
+
+
+@lru_cache(maxsize=None)
+def get_zone(zone_name: str) -> ZoneInfo:
+    """
+    Look up an IANA timezone, constructing each ZoneInfo only once.
+
+    :param zone_name: IANA timezone name, e.g. 'Africa/Luanda'.
+    :return: ZoneInfo object.
+    :raises ValueError: If the zone is unknown.
+    """
+    try:
+        return ZoneInfo(zone_name)
+    except (ZoneInfoNotFoundError, ValueError, TypeError):
+        raise ValueError(f"Unknown timezone: {zone_name}")
+
+
+def _offset_hours(zone: ZoneInfo, local: datetime, fold: int = 0) -> float:
+    return local.replace(tzinfo=zone, fold=fold).utcoffset() / _ONE_HOUR
+
+
+def _constant_day_offset(zone: ZoneInfo, day_start: datetime) -> Optional[float]:
+    day_end = day_start + _LAST_MICROSECOND
+    offsets = {
+        _offset_hours(zone, day_start, 0),
+        _offset_hours(zone, day_start, 1),
+        _offset_hours(zone, day_end, 0),
+        _offset_hours(zone, day_end, 1),
+    }
+    return offsets.pop() if len(offsets) == 1 else None
+
+
+class NonexistentTimeError(ValueError):
+    """
+    Raised for a local time skipped by a forward transition, e.g. 02:30 on a
+    spring-forward date.
+    """
+
+
+class AmbiguousTimeError(ValueError):
+    """
+    Raised for a local time that occurs twice because of a backward transition.
+    """
+
+
+class Transition(NamedTuple):
+    """
+    One offset change of a zone.
+
+    Local times in [local_start, local_end) are nonexistent when the offset
+    increases and ambiguous when it decreases.
+    """
+
+    utc: datetime
+    local_start: datetime
+    local_end: datetime
+    offset_before: float
+    offset_after: float
+
+
+class _TransitionTable:
+    """
+    Sorted transitions of one zone, filled in one calendar year at a time.
+
+    ``entries`` holds the local start times and the transitions as one tuple,
+    replaced as a whole, so a reader that takes it once sees a consistent pair.
+    """
+
+    def __init__(self, zone: ZoneInfo):
+        self.zone = zone
+        self.years: Set[int] = set()
+        self.entries: Tuple[Tuple[datetime, ...], Tuple[Transition, ...]] = ((), ())
+        self.lock = threading.Lock()
+
+    @property
+    def starts(self) -> Tuple[datetime, ...]:
+        return self.entries[0]
+
+    @property
+    def transitions(self) -> Tuple[Transition, ...]:
+        return self.entries[1]
+
+    def ensure_years(self, first: int, last: int):
+        missing = [
+            year
+            for year in range(max(first, 1), min(last, 9998) + 1)
+            if year not in self.years
+        ]
+        if not missing:
+            return
+        with self.lock:
+            found = list(self.entries[1])
+            for year in missing:
+                if year not in self.years:
+                    found.extend(_scan_year(self.zone, year))
+            found = sorted(set(found))
+            # A single attribute store publishes both sequences at once
+            self.entries = (
+                tuple(transition.local_start for transition in found),
+                tuple(found),
+            )
+            self.years.update(missing)
+
+
+def _utc_offset_at(zone: ZoneInfo, utc: datetime) -> timedelta:
+    return zone.fromutc(utc.replace(tzinfo=zone)).utcoffset()
+
+
+def _scan_year(zone: ZoneInfo, year: int) -> List[Transition]:
+    """
+    Find the transitions in one UTC calendar year by stepping a day at a time
+    and bisecting each offset change down to the second.
+    """
+    transitions = []
+    day = datetime(year, 1, 1)
+    end = datetime(year + 1, 1, 1)
+    offset = _utc_offset_at(zone, day)
+    while day < end:
+        next_day = day + _ONE_DAY
+        next_offset = _utc_offset_at(zone, next_day)
+        if next_offset != offset:
+            low, high = 0, 86_400
+            while high - low > 1:
+                middle = (low + high) // 2
+                if _utc_offset_at(zone, day + timedelta(seconds=middle)) == offset:
+                    low = middle
+                else:
+                    high = middle
+            utc = day + timedelta(seconds=high)
+            after = _utc_offset_at(zone, utc)
+            transitions.append(
+                Transition(
+                    utc=utc,
+                    local_start=utc + min(offset, after),
+                    local_end=utc + max(offset, after),
+                    offset_before=offset / _ONE_HOUR,
+                    offset_after=after / _ONE_HOUR,
+                )
+            )
+        day, offset = next_day, next_offset
+    return transitions
+
+
+_tables: Dict[str, _TransitionTable] = {}
+_tables_lock = threading.Lock()
+
+
+def transition_table(zone_name: str, year: int) -> _TransitionTable:
+    """
+    Transition table of a zone covering at least the years around ``year``.
+
+    :param zone_name: IANA timezone name.
+    :param year: Local calendar year of interest.
+    :return: Table whose ``transitions`` are sorted by time.
+    :raises ValueError: If the zone is unknown.
+    """
+    table = _tables.get(zone_name)
+    if table is None:
+        zone = get_zone(zone_name)
+        with _tables_lock:
+            table = _tables.setdefault(zone_name, _TransitionTable(zone))
+    # Local and UTC years differ around New Year, so cover the neighbours too
+    table.ensure_years(year - 1, year + 1)
+    return table
+
+
+def check_policies(nonexistent: str, ambiguous: str):
+    """
+    Validate policy names up front so typos are not hidden until a transition day.
+
+    :raises ValueError: If either policy is unknown.
+    """
+    if nonexistent not in NONEXISTENT_POLICIES:
+        raise ValueError(
+            f"nonexistent must be one of {', '.join(NONEXISTENT_POLICIES)}, "
+            f"not {nonexistent!r}"
+        )
+    if ambiguous not in AMBIGUOUS_POLICIES:
+        raise ValueError(
+            f"ambiguous must be one of {', '.join(AMBIGUOUS_POLICIES)}, "
+            f"not {ambiguous!r}"
+        )
+
+
+def to_utc(
+    zone_name: str,
+    local: datetime,
+    nonexistent: str = RAISE,
+    ambiguous: str = RAISE,
+) -> Tuple[datetime, float]:
+    """
+    Convert a naive local datetime in a named zone to UTC.
+
+    Days without a transition are answered from the (zone, date) memo; on
+    transition days the local time is looked up in the zone's sorted
+    transition table with one bisect.
+
+    :param zone_name: IANA timezone name.
+    :param local: Naive local datetime.
+    :param nonexistent: 'raise', or 'shift_forward' to move a skipped local
+        time to the first instant after the gap.
+    :param ambiguous: 'raise', 'earlier' or 'later' occurrence of a repeated
+        local time.
+    :return: Naive UTC datetime and the UTC offset in hours that was applied.
+    :raises NonexistentTimeError: For a skipped local time under 'raise'.
+    :raises AmbiguousTimeError: For a repeated local time under 'raise'.
+    :raises ValueError: If the zone is unknown.
+    """
+    key = (zone_name, local.toordinal())
+    try:
+        offset = _day_offsets[key]
+    except KeyError:
+        zone = get_zone(zone_name)
+        day_start = local.replace(hour=0, minute=0, second=0, microsecond=0)
+        offset = _day_offsets[key] = _constant_day_offset(zone, day_start)
+    if offset is not None:
+        return local - timedelta(hours=offset), offset
+
+    table = transition_table(zone_name, local.year)
+    starts, transitions = table.entries
+    index = bisect_right(starts, local) - 1
+    if index < 0:
+        offset = _offset_hours(table.zone, local)
+        return local - timedelta(hours=offset), offset
+    transition = transitions[index]
+    if local >= transition.local_end:
+        offset = transition.offset_after
+    elif transition.offset_after > transition.offset_before:
+        if nonexistent == RAISE:
+            raise NonexistentTimeError(
+                f"{local} does not exist in {zone_name} "
+                f"(clocks move forward at {transition.local_start})"
+            )
+        return transition.utc, transition.offset_after
+    elif ambiguous == RAISE:
+        raise AmbiguousTimeError(
+            f"{local} is ambiguous in {zone_name} "
+            f"(clocks move back at {transition.local_end})"
+        )
+    elif ambiguous == EARLIER:
+        offset = transition.offset_before
+    else:
+        offset = transition.offset_after
+    return local - timedelta(hours=offset), offset
+
+
+def clear_memo():
+    """
+    Drop the memoized per-day offsets and transition tables, e.g. after a
+    tzdata update.
+    """
+    _day_offsets.clear()
+    with _tables_lock:
+        _tables.clear()
+    get_zone.cache_clear()
@@ -10,3 +10,6 @@ pytest tests/ -v
 
 # only one test:
 # pytest tests/ -v -rP -k test_fp
+
+# benchmarks (add BENCH_FULL=1 for the 10**6 itinerary corpora):
+# pytest benchmarks/ --benchmark-only
@@ -0,0 +1,35 @@
+# tests/helpers.py
+
+import sys
+import os
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.calculator import Flight
+
+
+def make_flight(
+    departure_city="Johannesburg",
+    departure_date="2024-01-01",
+    departure_time="16:40",
+    departure_offset=2,
+    arrival_city="Luanda",
+    arrival_date="2024-01-01",
+    arrival_time="19:10",
+    arrival_offset=1,
+):
+    """
+    Build a Flight with fixed UTC offsets, defaulting to the Johannesburg to
+    Luanda leg used throughout the tests; pass only the fields under test.
+    """
+    return Flight(
+        departure_city=departure_city,
+        departure_date=departure_date,
+        departure_time=departure_time,
+        departure_timezone_utc_offset_in_hours=departure_offset,
+        arrival_city=arrival_city,
+        arrival_date=arrival_date,
+        arrival_time=arrival_time,
+        arrival_timezone_utc_offset_in_hours=arrival_offset,
+    )
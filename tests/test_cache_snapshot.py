@@ -0,0 +1,157 @@
+# tests/test_cache_snapshot.py
+
+import sys
+import os
+import json
+from unittest.mock import MagicMock
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src import cache_snapshot
+from src.cache_snapshot import (
+    load_snapshot,
+    read_query_log,
+    save_snapshot,
+    tzdata_version,
+    warm_up,
+    zone_fingerprint,
+)
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.timezone_cache import TimezoneCache
+
+PLACES = {
+    "Tokyo": ResolvedPlace("Asia/Tokyo", 35.68, 139.69),
+    "Osaka": ResolvedPlace("Asia/Tokyo", 34.69, 135.50),
+    "Lima": ResolvedPlace("America/Lima", -12.05, -77.04),
+}
+
+
+def _resolver(place_name):
+    for name, place in PLACES.items():
+        if name.casefold() == place_name.casefold():
+            return place
+    raise ValueError(f"No matches found for '{place_name}'.")
+
+
+@pytest.fixture
+def snapshot_path(tmp_path):
+    cache = TimezoneCache(resolver=_resolver)
+    for name in PLACES:
+        cache.resolve_place(name)
+    path = str(tmp_path / "snapshot.json")
+    save_snapshot(cache, path)
+    return path
+
+
+class TestZoneFingerprint:
+    def test_fingerprint_is_stable_and_distinct(self):
+        """
+        Test that fingerprints repeat for a zone and differ between zones.
+        """
+        assert zone_fingerprint("Asia/Tokyo") == zone_fingerprint("Asia/Tokyo")
+        assert zone_fingerprint("Asia/Tokyo") != zone_fingerprint("America/Lima")
+
+    def test_unknown_zone_has_no_fingerprint(self):
+        """
+        Test that unknown zones and path-like names get no fingerprint.
+        """
+        assert zone_fingerprint("Mars/Olympus_Mons") is None
+        assert zone_fingerprint("../../etc/passwd") is None
+
+    def test_version_is_a_string(self):
+        """
+        Test that a tzdata version is reported.
+        """
+        assert isinstance(tzdata_version(), str) and tzdata_version()
+
+
+class TestSnapshot:
+    def test_round_trip(self, snapshot_path):
+        """
+        Test that a loaded snapshot answers every saved place without geocoding.
+        """
+        resolver = MagicMock()
+        cache = TimezoneCache(resolver=resolver)
+        report = load_snapshot(cache, snapshot_path)
+
+        assert report.loaded == 3 and report.invalidated == 0
+        assert cache.resolve_place("Osaka") == PLACES["Osaka"]
+        assert cache.resolve_place("lima") == PLACES["Lima"]
+        resolver.assert_not_called()
+
+    def test_same_version_skips_fingerprints(self, snapshot_path, monkeypatch):
+        """
+        Test that zones are not re-fingerprinted when the version is unchanged.
+        """
+        fingerprint = MagicMock()
+        monkeypatch.setattr(cache_snapshot, "zone_fingerprint", fingerprint)
+        load_snapshot(TimezoneCache(resolver=_resolver), snapshot_path)
+        fingerprint.assert_not_called()
+
+    def test_only_changed_zones_are_invalidated(self, snapshot_path):
+        """
+        Test that after a tzdata update only entries of changed zones are dropped.
+        """
+        with open(snapshot_path) as f:
+            snapshot = json.load(f)
+        snapshot["tzdata_version"] = "1999z"
+        snapshot["zones"]["Asia/Tokyo"] = "0" * 16
+        with open(snapshot_path, "w") as f:
+            json.dump(snapshot, f)
+
+        cache = TimezoneCache(resolver=_resolver)
+        report = load_snapshot(cache, snapshot_path)
+
+        assert report.snapshot_version == "1999z"
+        assert report.loaded == 1 and report.invalidated == 2
+        assert cache.get("Lima") == PLACES["Lima"]
+        assert cache.get("Tokyo") is None
+
+    def test_rejects_other_files(self, tmp_path):
+        """
+        Test that a JSON file that is not a snapshot raises ValueError.
+        """
+        path = tmp_path / "other.json"
+        path.write_text('{"places": {}}')
+        with pytest.raises(ValueError, match="not a timezone cache snapshot"):
+            load_snapshot(TimezoneCache(), str(path))
+
+
+class TestWarmUp:
+    def test_read_query_log(self, tmp_path):
+        """
+        Test that plain lines and endpoint request bodies yield place names.
+        """
+        path = tmp_path / "queries.log"
+        path.write_text(
+            "Tokyo\n"
+            '{"place": "Lima"}\n'
+            '{"places": ["Osaka", "Tokyo", 3]}\n'
+            "\n"
+            "{not json\n"
+        )
+        assert list(read_query_log(str(path))) == ["Tokyo", "Lima", "Osaka", "Tokyo"]
+
+    def test_most_frequent_places_first(self):
+        """
+        Test that warm-up resolves by canonical frequency and skips cached places.
+        """
+        resolver = MagicMock(side_effect=_resolver)
+        cache = TimezoneCache(resolver=resolver)
+        cache.put("Osaka", PLACES["Osaka"])
+
+        queries = ["Lima", "tokyo", "Tokyo", "TOKYO", "Osaka", "Atlantis", "Lima"]
+        report = warm_up(cache, queries, limit=3)
+
+        assert report == (2, 1, 0)
+        assert [call.args[0] for call in resolver.call_args_list] == ["tokyo", "Lima"]
+
+    def test_failures_are_counted(self):
+        """
+        Test that places that fail to resolve do not stop the warm-up.
+        """
+        cache = TimezoneCache(resolver=_resolver)
+        report = warm_up(cache, ["Atlantis", "Lima"])
+        assert report.resolved == 1 and report.failed == 1
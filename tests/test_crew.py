@@ -0,0 +1,172 @@
+# tests/test_crew.py
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.crew import duty_periods, evaluate_rosters, rolling_block_hours
+from src.itinerary_arrays import leg_arrays
+from src.itinerary_generator import generate_itinerary
+from tests.helpers import make_flight
+
+
+class TestLegArrays:
+    def test_flattening(self):
+        """
+        Test that legs are flattened in order with their owner and bounds.
+        """
+        legs = leg_arrays(
+            [
+                [make_flight(departure_time="08:00", arrival_time="09:00")],
+                [],
+                [
+                    make_flight(departure_time="08:00", arrival_time="09:00"),
+                    make_flight(departure_time="12:00", arrival_time="13:30"),
+                ],
+            ]
+        )
+        assert legs.itinerary_count == 3
+        assert legs.bounds.tolist() == [0, 1, 1, 3]
+        assert legs.owner.tolist() == [0, 2, 2]
+        assert legs.legs_per_itinerary().tolist() == [1, 0, 2]
+        # 08:00 at UTC+2 is 06:00 UTC
+        epoch_minutes = (datetime(2024, 1, 1, 6) - datetime(1970, 1, 1)) / timedelta(
+            minutes=1
+        )
+        assert legs.departure[0] == epoch_minutes
+        assert (legs.arrival - legs.departure).tolist() == [120, 120, 150]
+        assert legs.departure_offset.tolist() == [2, 2, 2]
+        assert legs.arrival_offset.tolist() == [1, 1, 1]
+
+    def test_invalid_itinerary_is_named(self):
+        """
+        Test that a bad leg reports which itinerary it belongs to.
+        """
+        with pytest.raises(ValueError, match="Itinerary 1: Error processing flight 1"):
+            leg_arrays(
+                [
+                    [make_flight(departure_time="08:00", arrival_time="09:00")],
+                    [
+                        make_flight(
+                            departure_time="08:00",
+                            arrival_date="invalid",
+                            arrival_time="09:00",
+                        )
+                    ],
+                ]
+            )
+
+
+class TestDutyPeriods:
+    def test_sectors_grouped_by_rest(self):
+        """
+        Test that a rest of at least the minimum starts a new duty.
+        """
+        rosters = {
+            "alice": [
+                make_flight(departure_time="08:00", arrival_time="09:00"),
+                make_flight(departure_time="11:00", arrival_time="12:00"),
+                # 20 hours after the previous arrival
+                make_flight(
+                    departure_date="2024-01-02",
+                    departure_time="09:00",
+                    arrival_date="2024-01-02",
+                    arrival_time="10:00",
+                ),
+            ],
+            "bob": [make_flight(departure_time="08:00", arrival_time="09:00")],
+        }
+        report = evaluate_rosters(rosters)
+        duties = report.duties
+
+        assert duties.crew.tolist() == [0, 0, 1]
+        assert duties.sectors.tolist() == [2, 1, 1]
+        assert duties.block_minutes.tolist() == [240, 120, 120]
+        # Report 60 minutes before 06:00 UTC, release 30 minutes after 11:00 UTC
+        assert duties.duty_minutes()[0] == 60 + 5 * 60 + 30
+        # 20 hours minus debrief and report
+        assert duties.rest_before[1] == 20 * 60 - 90
+        assert np.isnan(duties.rest_before[[0, 2]]).all()
+        assert report.shortest_rest_minutes()[0] == 20 * 60 - 90
+        assert np.isnan(report.shortest_rest_minutes()[1])
+
+    def test_short_rest_continues_duty(self):
+        """
+        Test that a raised minimum rest merges sectors into one duty.
+        """
+        legs = leg_arrays(
+            [
+                [
+                    make_flight(departure_time="08:00", arrival_time="09:00"),
+                    make_flight(
+                        departure_date="2024-01-02",
+                        departure_time="09:00",
+                        arrival_date="2024-01-02",
+                        arrival_time="10:00",
+                    ),
+                ]
+            ]
+        )
+        assert len(duty_periods(legs).start) == 2
+        assert len(duty_periods(legs, min_rest_minutes=24 * 60).start) == 1
+
+    def test_empty_roster(self):
+        """
+        Test that rosters without sectors produce empty arrays.
+        """
+        report = evaluate_rosters({"alice": []})
+        assert len(report.duties.start) == 0
+        assert report.block_hours[7].tolist() == []
+        assert report.peak_block_hours(7).tolist() == [0]
+
+
+class TestRollingBlockHours:
+    def test_matches_brute_force(self):
+        """
+        Test the prefix-sum windows against a direct sum over each crew's legs.
+        """
+        rng = random.Random(11)
+        rosters = [
+            generate_itinerary(
+                rng, rng.randint(1, 40), datetime(2024, 1, 1), max_layover_minutes=5 * 24 * 60
+            )
+            for _ in range(30)
+        ]
+        legs = leg_arrays(rosters)
+        hours = rolling_block_hours(legs, (1, 7, 28))
+
+        for days, values in hours.items():
+            for index in range(len(legs.arrival)):
+                same_crew = legs.owner == legs.owner[index]
+                in_window = (legs.arrival > legs.arrival[index] - days * 1440) & (
+                    legs.arrival <= legs.arrival[index]
+                )
+                block = legs.arrival - legs.departure
+                expected = block[same_crew & in_window].sum() / 60
+                assert values[index] == pytest.approx(expected)
+
+    def test_peak_per_crew_member(self):
+        """
+        Test the highest 7-day block hours per crew member.
+        """
+        rosters = {
+            "alice": [
+                make_flight(
+                    departure_date=f"2024-01-{day:02d}",
+                    departure_time="08:00",
+                    arrival_date=f"2024-01-{day:02d}",
+                    arrival_time="10:00",
+                )
+                for day in range(1, 11)
+            ],
+        }
+        report = evaluate_rosters(rosters)
+        assert report.block_hours[7].tolist()[:3] == [3, 6, 9]
+        assert report.peak_block_hours(7).tolist() == [21]
+        assert report.peak_block_hours(365).tolist() == [30]
@@ -0,0 +1,118 @@
+# tests/test_delay_simulation.py
+
+import sys
+import os
+import math
+from datetime import timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.calculator import compute_travel_times
+from src.delay_simulation import DelayModel, simulate_delays, simulate_itineraries
+from src.itinerary_arrays import leg_arrays
+from src.itinerary_generator import generate_itineraries
+from tests.helpers import make_flight
+
+
+def _flight(departure_time, arrival_time):
+    return make_flight(
+        departure_time=departure_time,
+        departure_offset=0,
+        arrival_time=arrival_time,
+        arrival_offset=0,
+    )
+
+
+# 08:00-10:00 then 11:30-13:00: a 90 minute layover
+CONNECTING = [_flight("08:00", "10:00"), _flight("11:30", "13:00")]
+
+
+class TestSimulateDelays:
+    def test_no_delays_reproduce_schedule(self):
+        """
+        Test that punctual legs give the scheduled travel time and no misconnects.
+        """
+        itineraries = generate_itineraries(50, seed=4)
+        result = simulate_itineraries(
+            itineraries, samples=20, model=DelayModel(on_time_probability=1.0), seed=1
+        )
+        expected = [
+            compute_travel_times(flights).total_travel_time / timedelta(minutes=1)
+            for flights in itineraries
+        ]
+        assert result.misconnect_probability.max() == 0
+        np.testing.assert_allclose(result.mean_travel_minutes, expected)
+        np.testing.assert_allclose(result.travel_minutes_percentiles[:, -1], expected)
+
+    def test_misconnect_probability_matches_closed_form(self):
+        """
+        Test the simulated miss rate against P(late) * exp(-slack / mean delay).
+        """
+        model = DelayModel(
+            on_time_probability=np.array([0.6, 1.0]),
+            mean_delay_minutes=40.0,
+        )
+        result = simulate_itineraries(
+            [CONNECTING], samples=200_000, model=model, min_connection_minutes=30, seed=2
+        )
+        expected = 0.4 * math.exp(-(90 - 30) / 40)
+        assert result.misconnect_probability[0] == pytest.approx(expected, abs=0.005)
+        assert math.isnan(result.connection_misconnect_probability[0])
+        assert result.connection_misconnect_probability[1] == pytest.approx(
+            expected, abs=0.005
+        )
+
+    def test_missed_connection_waits_for_replacement(self):
+        """
+        Test that a certain misconnect adds the rebooking delay to the trip.
+        """
+        model = DelayModel(
+            on_time_probability=np.array([1.0, 1.0]), mean_delay_minutes=0.0
+        )
+        result = simulate_itineraries(
+            [CONNECTING],
+            samples=10,
+            model=model,
+            min_connection_minutes=120,
+            rebooking_minutes=180,
+            seed=3,
+        )
+        assert result.misconnect_probability[0] == 1.0
+        # Scheduled 300 minutes, plus 180 minutes for the replacement flight
+        assert result.mean_travel_minutes[0] == 480
+
+    def test_percentiles_are_ordered(self):
+        """
+        Test that percentiles rise with their rank and bound the mean sensibly.
+        """
+        legs = leg_arrays(generate_itineraries(30, seed=5))
+        result = simulate_delays(
+            legs, samples=500, percentiles=(5, 50, 95), seed=4, chunk_elements=1000
+        )
+        assert (np.diff(result.travel_minutes_percentiles, axis=1) >= 0).all()
+        assert (result.travel_minutes_percentiles[:, 0] <= result.mean_travel_minutes).all()
+        assert result.travel_minutes_percentiles.shape == (30, 3)
+
+    def test_empty_itineraries(self):
+        """
+        Test that empty itineraries get NaN travel times and no misconnects.
+        """
+        result = simulate_itineraries([[], CONNECTING, []], samples=50, seed=5)
+        assert np.isnan(result.mean_travel_minutes[[0, 2]]).all()
+        assert result.misconnect_probability[[0, 2]].tolist() == [0, 0]
+        assert not math.isnan(result.mean_travel_minutes[1])
+
+    def test_parameter_validation(self):
+        """
+        Test that malformed parameters raise ValueError.
+        """
+        legs = leg_arrays([CONNECTING])
+        with pytest.raises(ValueError, match="one value per leg"):
+            simulate_delays(legs, model=DelayModel(mean_delay_minutes=np.ones(3)))
+        with pytest.raises(ValueError, match="on_time_probability"):
+            simulate_delays(legs, model=DelayModel(on_time_probability=1.5))
+        with pytest.raises(ValueError, match="samples"):
+            simulate_delays(legs, samples=0)
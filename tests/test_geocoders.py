@@ -0,0 +1,289 @@
+# tests/test_geocoders.py
+
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.geocoders import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    FailoverGeocoder,
+    FakeLocation,
+    FakeProvider,
+    GeocoderUnavailableError,
+)
+from src.get_utc_offset_in_hours import (
+    get_timezone_with_suggestions,
+    resolve_place_with_suggestions,
+)
+
+PARIS = FakeLocation("Paris, France", 48.8566, 2.3522)
+PLACES = {"Paris": [PARIS]}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        """
+        Test that the circuit opens after the failure threshold.
+        """
+        breaker = CircuitBreaker(failure_threshold=2, clock=FakeClock())
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+        assert not breaker.allow()
+
+    def test_half_open_probe(self):
+        """
+        Test that one probe is allowed after the reset time and decides the state.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+        assert not breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == OPEN
+
+        clock.now = 20
+        assert breaker.allow()
+        breaker.record_success(0.1)
+        assert breaker.state == CLOSED
+        assert breaker.allow()
+
+    def test_unresolved_probe_expires(self):
+        """
+        Test that a probe whose outcome is never recorded stops blocking requests.
+        """
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_after=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow()
+        clock.now = 19
+        assert not breaker.allow()
+        clock.now = 20
+        assert breaker.allow()
+        assert breaker.state == HALF_OPEN
+
+    def test_opens_on_slow_median(self):
+        """
+        Test latency-based opening once the window is full.
+        """
+        breaker = CircuitBreaker(latency_threshold=1.0, latency_window=3, clock=FakeClock())
+        breaker.record_success(2.0)
+        breaker.record_success(2.0)
+        assert breaker.state == CLOSED
+        breaker.record_success(0.1)
+        assert breaker.state == OPEN
+
+
+class TestFailoverGeocoder:
+    def test_first_provider_answers(self):
+        """
+        Test that a healthy primary provider is the only one asked.
+        """
+        primary = FakeProvider(PLACES, name="primary")
+        secondary = FakeProvider(PLACES, name="secondary")
+        with FailoverGeocoder([primary, secondary]) as geocoder:
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.geocode("Paris", exactly_one=False, limit=3) == [PARIS]
+            assert geocoder.geocode("Atlantis") is None
+        assert (primary.calls, secondary.calls) == (3, 0)
+
+    def test_failover_on_error(self):
+        """
+        Test that a failing provider is skipped in favour of the next.
+        """
+        broken = FakeProvider(PLACES, failure_rate=1.0, name="broken")
+        backup = FakeProvider(PLACES, name="backup")
+        with FailoverGeocoder([broken, backup]) as geocoder:
+            for _ in range(4):
+                assert geocoder.geocode("Paris") == PARIS
+            stats = geocoder.stats()
+        # The default breaker opens after three failures
+        assert broken.calls == 3
+        assert stats["broken"]["failures"] == 3
+        assert stats["broken"]["skipped"] == 1
+        assert stats["broken"]["circuit"] == OPEN
+        assert stats["backup"]["successes"] == 4
+
+    def test_failover_on_timeout(self):
+        """
+        Test that a provider slower than the timeout is abandoned.
+        """
+        slow = FakeProvider(PLACES, latency=0.5, name="slow")
+        fast = FakeProvider(PLACES, name="fast")
+        with FailoverGeocoder([slow, fast], timeout=0.05) as geocoder:
+            started = time.monotonic()
+            assert geocoder.geocode("Paris") == PARIS
+            assert time.monotonic() - started < 0.4
+            assert geocoder.stats()["slow"]["timeouts"] == 1
+
+    def test_hedged_request(self):
+        """
+        Test that a hedge to the next provider wins over a slow primary.
+        """
+        slow = FakeProvider(PLACES, latency=0.5, name="slow")
+        fast = FakeProvider(PLACES, name="fast")
+        with FailoverGeocoder([slow, fast], timeout=2.0, hedge_after=0.02) as geocoder:
+            started = time.monotonic()
+            assert geocoder.geocode("Paris") == PARIS
+            assert time.monotonic() - started < 0.4
+            stats = geocoder.stats()
+        assert stats["fast"]["hedges"] == 1
+        assert stats["slow"]["timeouts"] == 0
+
+    def test_probe_losing_a_hedge_is_recorded(self):
+        """
+        Test that a half-open probe beaten by a hedge still closes its circuit.
+        """
+
+        class FailsOnceThenSlow(FakeProvider):
+            def geocode(self, query, exactly_one=True, limit=None):
+                self.calls += 1
+                if self.calls == 1:
+                    raise ConnectionError("slow failed")
+                time.sleep(0.2)
+                return PARIS
+
+        clock = FakeClock()
+        slow = FailsOnceThenSlow(PLACES, name="slow")
+        fast = FakeProvider(PLACES, name="fast")
+        with FailoverGeocoder(
+            [slow, fast],
+            timeout=2.0,
+            hedge_after=0.02,
+            breaker_factory=lambda: CircuitBreaker(
+                failure_threshold=1, reset_after=30, clock=clock
+            ),
+        ) as geocoder:
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.stats()["slow"]["circuit"] == OPEN
+            clock.now = 30
+            # The probe goes to slow, and the hedge to fast wins
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.stats()["slow"]["circuit"] == HALF_OPEN
+            deadline = time.monotonic() + 2
+            while geocoder.stats()["slow"]["successes"] == 0:
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            stats = geocoder.stats()
+        assert stats["slow"]["circuit"] == CLOSED
+        assert stats["slow"]["skipped"] == 0
+
+    def test_hung_provider_under_concurrency(self):
+        """
+        Test that a hung provider cannot starve a healthy one of threads or
+        charge it with timeouts while many callers are waiting.
+        """
+        release = threading.Event()
+        hung = FakeProvider(PLACES, latency=lambda query: release.wait(20) and 0, name="hung")
+        fast = FakeProvider(PLACES, name="fast")
+        geocoder = FailoverGeocoder([hung, fast], timeout=0.5, max_in_flight=4)
+        try:
+            with ThreadPoolExecutor(max_workers=60) as callers:
+                results = list(callers.map(geocoder.geocode, ["Paris"] * 60))
+            assert results == [PARIS] * 60
+            assert geocoder.geocode("Paris") == PARIS
+            stats = geocoder.stats()
+        finally:
+            release.set()
+            geocoder.close()
+        assert hung.calls <= 4
+        assert stats["hung"]["circuit"] == OPEN
+        assert stats["fast"]["timeouts"] == stats["fast"]["failures"] == 0
+        assert stats["fast"]["circuit"] == CLOSED
+
+    def test_saturated_provider_is_skipped(self):
+        """
+        Test that a provider with no free slot is skipped without a timeout.
+        """
+        release = threading.Event()
+        hung = FakeProvider(PLACES, latency=lambda query: release.wait(20) and 0, name="hung")
+        fast = FakeProvider(PLACES, name="fast")
+        geocoder = FailoverGeocoder(
+            [hung, fast], timeout=[5.0, 0.5], hedge_after=0.01, max_in_flight=1
+        )
+        try:
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.geocode("Paris") == PARIS
+            stats = geocoder.stats()
+        finally:
+            release.set()
+            geocoder.close()
+        assert hung.calls == 1
+        assert stats["hung"]["skipped"] == 1
+        assert stats["hung"]["timeouts"] == 0
+        assert stats["hung"]["circuit"] == CLOSED
+
+    def test_per_provider_timeouts(self):
+        """
+        Test that each provider is given its own timeout.
+        """
+        slow = FakeProvider(PLACES, latency=0.2, name="slow")
+        fast = FakeProvider(PLACES, name="fast")
+        with FailoverGeocoder([slow, fast], timeout=[0.05, 1.0]) as geocoder:
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.stats()["slow"]["timeouts"] == 1
+        with FailoverGeocoder([slow, fast], timeout=[1.0, 0.05]) as geocoder:
+            assert geocoder.geocode("Paris") == PARIS
+            assert geocoder.stats()["slow"]["successes"] == 1
+        with pytest.raises(ValueError, match="Expected 2 timeouts"):
+            FailoverGeocoder([slow, fast], timeout=[1.0])
+
+    def test_all_providers_fail(self):
+        """
+        Test the error raised when nobody answers.
+        """
+        providers = [
+            FakeProvider(PLACES, failure_rate=1.0, name="a"),
+            FakeProvider(PLACES, failure_rate=1.0, name="b"),
+        ]
+        with FailoverGeocoder(providers) as geocoder:
+            with pytest.raises(GeocoderUnavailableError, match="a: .*; b: "):
+                geocoder.geocode("Paris")
+
+    def test_requires_a_provider(self):
+        """
+        Test that an empty provider list is rejected.
+        """
+        with pytest.raises(ValueError):
+            FailoverGeocoder([])
+
+
+class TestResolveWithGeolocator:
+    def test_resolve_place_offline(self):
+        """
+        Test that the place pipeline runs on an injected geolocator.
+        """
+        with FailoverGeocoder([FakeProvider(PLACES)]) as geocoder:
+            place = resolve_place_with_suggestions("Paris", geolocator=geocoder)
+            timezone_name, _ = get_timezone_with_suggestions("Paris", geolocator=geocoder)
+        assert place.timezone_name == timezone_name == "Europe/Paris"
+        assert (place.latitude, place.longitude) == (PARIS.latitude, PARIS.longitude)
+
+    def test_unknown_place_offline(self):
+        """
+        Test the not-found path with an injected geolocator.
+        """
+        with pytest.raises(ValueError, match="No matches found for 'Atlantis'"):
+            resolve_place_with_suggestions("Atlantis", geolocator=FakeProvider(PLACES))
@@ -0,0 +1,114 @@
+# tests/test_instrumentation.py
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src import instrumentation
+from src.calculator import TravelTimeCalculator
+from src.get_utc_offset_in_hours import ResolvedPlace, resolve_place_with_suggestions
+from src.instrumentation import Histogram, MetricsRegistry, metrics
+from src.timezone_cache import TimezoneCache
+from tests.helpers import make_flight
+
+
+@pytest.fixture
+def enabled_metrics():
+    metrics.reset()
+    instrumentation.enable()
+    yield metrics
+    instrumentation.disable()
+    metrics.reset()
+
+
+class TestInstrumentation:
+    def test_disabled_by_default_records_nothing(self):
+        """
+        Test that nothing is recorded unless instrumentation is enabled.
+        """
+        metrics.reset()
+        TravelTimeCalculator(flights=[make_flight()]).calculate_travel_times()
+
+        snapshot = metrics.snapshot()
+        assert snapshot["travel_time_calculate_seconds"]["count"] == 0
+        assert snapshot["travel_time_legs_total"] == 0
+
+    def test_calculator_metrics(self, enabled_metrics):
+        """
+        Test counters and histograms for calculations, datetime parsing and errors.
+        """
+        calculator = TravelTimeCalculator(flights=[make_flight()])
+        calculator.calculate_travel_times()
+        calculator.calculate_travel_times()
+        with pytest.raises(ValueError):
+            TravelTimeCalculator(
+                flights=[make_flight(arrival_time="7pm")]
+            ).calculate_travel_times()
+
+        snapshot = enabled_metrics.snapshot()
+        assert snapshot["travel_time_calculate_seconds"]["count"] == 3
+        assert snapshot["travel_time_calculate_errors_total"] == 1
+        assert snapshot["travel_time_legs_total"] == 3
+        # Successful legs parse two datetimes each, the bad leg fails on its second
+        assert snapshot["travel_time_create_datetime_seconds"]["count"] == 5
+        assert snapshot["travel_time_parse_errors_total"] == 1
+
+    def test_geocoder_and_cache_metrics(self, enabled_metrics):
+        """
+        Test geocoder call counts and cache hits and misses.
+        """
+        location = MagicMock(latitude=-8.83, longitude=13.23)
+        with patch("src.get_utc_offset_in_hours.Nominatim") as nominatim, patch(
+            "src.get_utc_offset_in_hours.TimezoneFinder"
+        ) as finder:
+            nominatim.return_value.geocode.return_value = [location]
+            finder.return_value.timezone_at.return_value = "Africa/Luanda"
+            cache = TimezoneCache(resolver=resolve_place_with_suggestions)
+            for _ in range(3):
+                assert cache.resolve_place("Luanda") == ResolvedPlace(
+                    "Africa/Luanda", -8.83, 13.23
+                )
+
+        snapshot = enabled_metrics.snapshot()
+        assert snapshot["timezone_geocoder_calls_total"] == 1
+        assert snapshot["timezone_geocoder_seconds"]["count"] == 1
+        assert snapshot["timezone_cache_misses_total"] == 1
+        assert snapshot["timezone_cache_hits_total"] == 2
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Test bucket assignment, including values above the largest bound.
+        """
+        histogram = Histogram("h", "help", buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value)
+
+        assert histogram.snapshot() == {
+            "count": 4,
+            "sum": 3.65,
+            "buckets": {0.1: 2, 1.0: 3, float("inf"): 4},
+        }
+
+    def test_prometheus_text_format(self):
+        """
+        Test the Prometheus exposition of counters and histograms.
+        """
+        registry = MetricsRegistry()
+        registry.counter("requests_total", "Requests.").inc(3)
+        registry.histogram("latency_seconds", "Latency.", buckets=(0.5,)).observe(0.25)
+
+        assert registry.to_prometheus().splitlines() == [
+            "# HELP requests_total Requests.",
+            "# TYPE requests_total counter",
+            "requests_total 3",
+            "# HELP latency_seconds Latency.",
+            "# TYPE latency_seconds histogram",
+            'latency_seconds_bucket{le="0.5"} 1',
+            'latency_seconds_bucket{le="+Inf"} 1',
+            "latency_seconds_sum 0.25",
+            "latency_seconds_count 1",
+        ]
@@ -0,0 +1,64 @@
+# tests/test_itinerary_generator.py
+
+import sys
+import os
+import random
+from datetime import datetime
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from src.calculator import TravelTimeCalculator
+from src.itinerary_generator import generate_itineraries, generate_itinerary
+from src.server import flight_to_dict
+
+
+class TestItineraryGenerator:
+    def test_same_seed_same_corpus(self):
+        """
+        Test that the generator is deterministic for a given seed.
+        """
+        first = generate_itineraries(50, seed=7)
+        second = generate_itineraries(50, seed=7)
+        other = generate_itineraries(50, seed=8)
+
+        as_dicts = lambda corpus: [[flight_to_dict(f) for f in it] for it in corpus]
+        assert as_dicts(first) == as_dicts(second)
+        assert as_dicts(first) != as_dicts(other)
+
+    def test_leg_counts_within_bounds(self):
+        """
+        Test that itineraries respect the requested number of legs.
+        """
+        corpus = generate_itineraries(200, seed=1, min_legs=2, max_legs=5)
+
+        assert {len(flights) for flights in corpus} == {2, 3, 4, 5}
+
+    def test_generated_itineraries_are_valid_and_connected(self):
+        """
+        Test that every generated itinerary calculates without errors and each leg
+        departs from the previous arrival city and timezone.
+        """
+        for flights in generate_itineraries(500, seed=3):
+            TravelTimeCalculator(flights=flights).calculate_travel_times()
+            for previous, flight in zip(flights, flights[1:]):
+                assert flight.departure_city == previous.arrival_city
+                assert (
+                    flight.departure_timezone_utc_offset_in_hours
+                    == previous.arrival_timezone_utc_offset_in_hours
+                )
+
+    def test_generate_itinerary_uses_given_offsets(self):
+        """
+        Test that only the supplied offsets are used.
+        """
+        flights = generate_itinerary(
+            random.Random(0), 6, datetime(2024, 1, 1), offsets=(5.75,)
+        )
+
+        assert len(flights) == 6
+        assert all(
+            f.departure_timezone_utc_offset_in_hours == 5.75
+            and f.arrival_timezone_utc_offset_in_hours == 5.75
+            for f in flights
+        )
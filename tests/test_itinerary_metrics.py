@@ -0,0 +1,105 @@
+# tests/test_itinerary_metrics.py
+
+import sys
+import os
+from datetime import timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.calculator import compute_travel_times
+from src.itinerary_generator import EDGE_UTC_OFFSETS, generate_itineraries
+from src.itinerary_metrics import EAST, NO_SHIFT, WEST, evaluate_itineraries
+from tests.helpers import make_flight
+
+
+class TestEvaluateItineraries:
+    def test_totals_match_compute_travel_times(self):
+        """
+        Test the vectorized totals against the calculator.
+        """
+        itineraries = generate_itineraries(200, seed=3, offsets=EDGE_UTC_OFFSETS)
+        metrics = evaluate_itineraries(itineraries)
+        for index, flights in enumerate(itineraries):
+            result = compute_travel_times(flights)
+            minute = timedelta(minutes=1)
+            assert metrics.air_minutes[index] == result.total_air_time / minute
+            assert metrics.travel_minutes[index] == result.total_travel_time / minute
+            assert metrics.layover_minutes[index] == pytest.approx(
+                result.total_layover_time / minute
+            )
+
+    def test_shift_metrics(self):
+        """
+        Test net and cumulative shift and direction of a there-and-back trip.
+        """
+        metrics = evaluate_itineraries(
+            [
+                # +2 -> -3, connection at -3 -> -2, then -2 -> +1
+                [
+                    make_flight(
+                        departure_time="08:00", arrival_time="09:00", arrival_offset=-3
+                    ),
+                    make_flight(
+                        departure_time="12:00", departure_offset=-2, arrival_time="23:00"
+                    ),
+                ],
+                [
+                    make_flight(
+                        departure_time="08:00", departure_offset=1, arrival_time="09:00"
+                    )
+                ],
+                [
+                    make_flight(
+                        departure_time="08:00", departure_offset=5.5, arrival_time="09:00"
+                    )
+                ],
+            ]
+        )
+        assert metrics.net_shift_hours.tolist() == [-1, 0, -4.5]
+        assert metrics.cumulative_shift_hours.tolist() == [5 + 1 + 3, 0, 4.5]
+        assert metrics.direction.tolist() == [WEST, NO_SHIFT, WEST]
+
+        east = evaluate_itineraries(
+            [
+                [
+                    make_flight(
+                        departure_time="08:00", departure_offset=-5, arrival_time="20:00"
+                    )
+                ]
+            ]
+        )
+        assert east.direction.tolist() == [EAST]
+
+    def test_local_arrival_hours(self):
+        """
+        Test the final local arrival hour and the per-itinerary histogram.
+        """
+        metrics = evaluate_itineraries(
+            [
+                [
+                    make_flight(departure_time="08:00", arrival_time="09:30"),
+                    make_flight(
+                        departure_time="12:00", departure_offset=1, arrival_time="23:45"
+                    ),
+                ],
+                [],
+            ]
+        )
+        assert metrics.final_arrival_local_hour[0] == 23.75
+        assert np.isnan(metrics.final_arrival_local_hour[1])
+        assert metrics.arrival_hour_counts.shape == (2, 24)
+        assert metrics.arrival_hour_counts[0, 9] == 1
+        assert metrics.arrival_hour_counts[0, 23] == 1
+        assert metrics.arrival_hour_counts.sum() == 2
+
+    def test_empty_itinerary(self):
+        """
+        Test that an empty itinerary gets zero totals.
+        """
+        metrics = evaluate_itineraries([[]])
+        assert metrics.air_minutes.tolist() == [0]
+        assert metrics.travel_minutes.tolist() == [0]
+        assert metrics.cumulative_shift_hours.tolist() == [0]
@@ -0,0 +1,38 @@
+# tests/test_js_conformance.py
+
+import sys
+import os
+import shutil
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from benchmarks.js_conformance import diff_results, run_conformance
+
+
+class TestJsConformance:
+    def test_diff_results(self):
+        """
+        Test that differing totals and one-sided errors are reported, while two
+        differently worded errors are not.
+        """
+        ok = {
+            "total_air_time": 3600.0,
+            "total_travel_time": 3600.0,
+            "total_layover_time": 0.0,
+            "layover_times": [],
+        }
+        python = [ok, ok, {"error": "a"}, {"error": "b"}]
+        javascript = [ok, dict(ok, total_air_time=0.0), {"error": "c"}, ok]
+
+        assert [m["index"] for m in diff_results(python, javascript)] == [1, 3]
+
+    @pytest.mark.skipif(shutil.which("node") is None, reason="Node is not installed")
+    def test_implementations_agree_in_utc(self):
+        """
+        Test that both implementations agree when the JS local zone is UTC.
+        """
+        report = run_conformance(500, seed=11, tz="UTC")
+
+        assert report["mismatches"] == 0, report["sample_mismatches"]
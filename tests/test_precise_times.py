@@ -0,0 +1,152 @@
+# tests/test_precise_times.py
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import Flight, compute_travel_times, create_utc_datetime
+from src.result_cache import itinerary_fingerprint
+from src.server import calculate_itinerary
+from src.validation import validate_itinerary
+from tests.helpers import make_flight
+
+
+class TestSecondsPrecision:
+    def test_seconds_are_kept(self):
+        """
+        Test that HH:MM:SS block times keep their seconds in the totals.
+        """
+        flights = [
+            make_flight(departure_time="16:40:15", arrival_time="19:10:45"),
+            make_flight(departure_time="21:00:05.5", arrival_time="22:00:00"),
+        ]
+
+        air, travel, layover, layovers = compute_travel_times(flights)
+
+        assert air == timedelta(hours=5, minutes=30, seconds=24.5)
+        assert layovers == (timedelta(minutes=49, seconds=20.5),)
+        assert air + layover == travel
+
+    def test_hh_mm_and_hh_mm_00_are_equal(self):
+        """
+        Test that seconds mode agrees with the HH:MM fast path.
+        """
+        assert create_utc_datetime("2024-01-01", "16:40", 2) == create_utc_datetime(
+            "2024-01-01", "16:40:00", 2
+        )
+
+    @pytest.mark.parametrize("time_str", ["16:40:60", "16:40:", "16:40:5.", "1:2:3:4"])
+    def test_invalid_seconds(self, time_str):
+        """
+        Test that malformed seconds raise the usual ValueError.
+        """
+        with pytest.raises(ValueError, match="Invalid date or time format"):
+            create_utc_datetime("2024-01-01", time_str, 0)
+
+    def test_fast_path_matches_strptime(self):
+        """
+        Test that the fixed-width fast path accepts and rejects exactly what
+        strptime does, with the same values.
+        """
+        rng = random.Random(0)
+        alphabet = "0123456789-: "
+        cases = [("2024-02-29", "23:59"), ("2023-02-29", "10:00"), ("0000-01-01", "00:00")]
+        for _ in range(20000):
+            date_str = f"{rng.randint(0, 2100):04d}-{rng.randint(0, 13):02d}-{rng.randint(0, 32):02d}"
+            time_str = f"{rng.randint(0, 25):02d}:{rng.randint(0, 61):02d}"
+            if rng.random() < 0.2:
+                position = rng.randrange(5)
+                time_str = time_str[:position] + rng.choice(alphabet) + time_str[position + 1 :]
+            cases.append((date_str, time_str))
+
+        for date_str, time_str in cases:
+            try:
+                expected = datetime.combine(
+                    datetime.strptime(date_str, "%Y-%m-%d").date(),
+                    datetime.strptime(time_str, "%H:%M").time(),
+                )
+            except ValueError:
+                expected = None
+            try:
+                actual = create_utc_datetime(date_str, time_str, 0)
+            except ValueError:
+                actual = None
+            assert actual == expected, (date_str, time_str)
+
+
+class TestIsoInput:
+    def test_from_iso_splits_offsets(self):
+        """
+        Test that ISO-8601 timestamps with embedded offsets build a Flight.
+        """
+        flight = Flight.from_iso(
+            "Kathmandu", "2024-01-01T16:40+05:45", "Santiago", "2024-01-02T03:30:15-03:00"
+        )
+
+        assert (flight.departure_date, flight.departure_time) == ("2024-01-01", "16:40")
+        assert flight.departure_timezone_utc_offset_in_hours == 5.75
+        assert (flight.arrival_date, flight.arrival_time) == ("2024-01-02", "03:30:15")
+        assert flight.arrival_timezone_utc_offset_in_hours == -3
+        assert compute_travel_times([flight]).total_air_time == timedelta(
+            hours=19, minutes=35, seconds=15
+        )
+
+    def test_from_iso_requires_offset(self):
+        """
+        Test that naive timestamps are rejected.
+        """
+        with pytest.raises(ValueError, match="UTC offset"):
+            Flight.from_iso("A", "2024-01-01T16:40", "B", "2024-01-01T18:40+00:00")
+
+    def test_iso_flights_over_json(self):
+        """
+        Test the ISO form of a flight in the HTTP service payloads.
+        """
+        result = calculate_itinerary(
+            [
+                {
+                    "departure_city": "Johannesburg",
+                    "departure": "2024-01-01T16:40:30+02:00",
+                    "arrival_city": "Luanda",
+                    "arrival": "2024-01-01T19:10+01:00",
+                }
+            ]
+        )
+
+        assert result["total_air_time"]["seconds"] == 3 * 3600 + 29 * 60 + 30
+
+
+class TestSecondsAcrossModules:
+    def test_fingerprint_distinguishes_seconds(self):
+        """
+        Test that the cache key keeps seconds apart and ignores ':00'.
+        """
+        base = itinerary_fingerprint([make_flight()])
+
+        assert itinerary_fingerprint([make_flight(departure_time="16:40:00")]) == base
+        assert itinerary_fingerprint([make_flight(departure_time="16:40:01")]) != base
+
+    def test_validation_accepts_seconds(self):
+        """
+        Test that bulk validation accepts the same seconds formats as the calculator.
+        """
+        assert (
+            validate_itinerary(
+                [make_flight(departure_time="16:40:15.25", arrival_time="19:10:45")]
+            )
+            == []
+        )
+        assert len(validate_itinerary([make_flight(departure_time="16:40:60")])) == 1
+        assert (
+            len(
+                validate_itinerary(
+                    [make_flight(departure_time="17:10:01", arrival_time="16:10:00")]
+                )
+            )
+            == 1
+        )
@@ -0,0 +1,99 @@
+# tests/test_properties.py
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from hypothesis import given, settings, strategies as st
+from src.calculator import TravelTimeCalculator
+from src.itinerary_generator import (
+    COMMON_UTC_OFFSETS,
+    EDGE_UTC_OFFSETS,
+    generate_itineraries,
+    generate_itinerary,
+)
+
+itineraries = st.builds(
+    lambda seed, legs, day, offsets: generate_itinerary(
+        random.Random(seed), legs, datetime(2020, 1, 1) + timedelta(days=day), offsets
+    ),
+    seed=st.integers(min_value=0, max_value=2**32),
+    legs=st.integers(min_value=1, max_value=12),
+    # Covers leap days and the ends of several years
+    day=st.integers(min_value=0, max_value=6 * 365),
+    offsets=st.sampled_from([COMMON_UTC_OFFSETS, EDGE_UTC_OFFSETS]),
+)
+
+
+class TestTravelTimeProperties:
+    @settings(max_examples=300)
+    @given(itineraries)
+    def test_air_plus_layover_equals_travel(self, flights):
+        """
+        Test that total air time plus total layover time equals total travel time.
+        """
+        air, travel, layover, layovers = TravelTimeCalculator(
+            flights=flights
+        ).calculate_travel_times()
+
+        assert air + layover == travel
+        assert sum(layovers, timedelta()) == layover
+
+    @settings(max_examples=300)
+    @given(itineraries)
+    def test_one_non_negative_layover_between_consecutive_flights(self, flights):
+        """
+        Test that there is exactly one layover per connection and none is negative.
+        """
+        air, travel, _, layovers = TravelTimeCalculator(
+            flights=flights
+        ).calculate_travel_times()
+
+        assert len(layovers) == len(flights) - 1
+        assert all(layover >= timedelta() for layover in layovers)
+        assert timedelta() <= air <= travel
+
+    @settings(max_examples=100)
+    @given(itineraries, st.sampled_from([-1, 1]))
+    def test_totals_invariant_under_uniform_offset_shift(self, flights, shift):
+        """
+        Test that moving every local time and its offset by the same amount leaves
+        the totals unchanged.
+        """
+        expected = TravelTimeCalculator(flights=flights).calculate_travel_times()
+
+        for flight in flights:
+            for side in ("departure", "arrival"):
+                local = datetime.strptime(
+                    f"{getattr(flight, side + '_date')} {getattr(flight, side + '_time')}",
+                    "%Y-%m-%d %H:%M",
+                ) + timedelta(hours=shift)
+                setattr(flight, side + "_date", local.strftime("%Y-%m-%d"))
+                setattr(flight, side + "_time", local.strftime("%H:%M"))
+                offset_field = side + "_timezone_utc_offset_in_hours"
+                setattr(flight, offset_field, getattr(flight, offset_field) + shift)
+
+        assert TravelTimeCalculator(flights=flights).calculate_travel_times() == expected
+
+    def test_year_end_corpus_rolls_over_the_year(self):
+        """
+        Test that year-end itineraries cross into the next year and stay consistent.
+        """
+        corpus = generate_itineraries(
+            300, seed=5, offsets=EDGE_UTC_OFFSETS, year_end_fraction=1.0, max_legs=6
+        )
+
+        rollovers = 0
+        for flights in corpus:
+            air, travel, layover, _ = TravelTimeCalculator(
+                flights=flights
+            ).calculate_travel_times()
+            assert air + layover == travel
+            if flights[0].departure_date[:4] != flights[-1].arrival_date[:4]:
+                rollovers += 1
+
+        assert rollovers > 0
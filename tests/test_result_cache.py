@@ -0,0 +1,157 @@
+# tests/test_result_cache.py
+
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import compute_travel_times
+from src.itinerary_generator import generate_itineraries
+from src.result_cache import ItineraryResultCache, itinerary_fingerprint
+from tests.helpers import make_flight
+
+
+class TestItineraryFingerprint:
+    def test_equivalent_spellings_share_a_fingerprint(self):
+        """
+        Test that the fingerprint is built from UTC instants, not raw strings.
+        """
+        short_date = make_flight()
+        short_date.departure_date = "2024-1-1"
+
+        assert itinerary_fingerprint([short_date]) == itinerary_fingerprint(
+            [make_flight()]
+        )
+        assert itinerary_fingerprint(
+            [make_flight(departure_time="8:05")]
+        ) == itinerary_fingerprint([make_flight(departure_time="08:05")])
+
+    def test_different_schedules_differ(self):
+        """
+        Test that a different time or offset changes the fingerprint.
+        """
+        base = itinerary_fingerprint([make_flight()])
+
+        assert itinerary_fingerprint([make_flight(departure_time="16:41")]) != base
+        assert itinerary_fingerprint([make_flight(departure_offset=3)]) != base
+        assert len(base) == 4
+
+
+class TestItineraryResultCache:
+    def test_hits_return_same_results_as_calculator(self):
+        """
+        Test that cached results match fresh calculations and repeats are hits.
+        """
+        cache = ItineraryResultCache()
+        corpus = generate_itineraries(100, seed=2)
+
+        for _ in range(3):
+            for flights in corpus:
+                assert cache.calculate(flights) == compute_travel_times(flights)
+
+        stats = cache.stats()
+        assert stats["misses"] == 100
+        assert stats["hits"] == 200
+        assert stats["hit_rate"] == pytest.approx(2 / 3)
+
+    def test_rebuilt_flights_hit_the_cache(self):
+        """
+        Test that new Flight objects for the same itinerary do not recalculate.
+        """
+        cache = ItineraryResultCache()
+        cache.calculate([make_flight()])
+
+        with patch("src.result_cache.compute_travel_times") as calc:
+            cache.calculate([make_flight()])
+
+        calc.assert_not_called()
+
+    def test_seen_spelling_skips_parsing(self):
+        """
+        Test that a repeated spelling is answered without parsing, and that a new
+        spelling of the same schedule still shares the cached result.
+        """
+        cache = ItineraryResultCache()
+        first = cache.calculate([make_flight()])
+
+        with patch(
+            "src.result_cache.itinerary_fingerprint", wraps=itinerary_fingerprint
+        ) as fingerprint:
+            assert cache.calculate([make_flight()]) is first
+            fingerprint.assert_not_called()
+            assert cache.calculate([make_flight(departure_time="16:40:00")]) is first
+            assert cache.calculate([make_flight(departure_time="16:40:00")]) is first
+            assert fingerprint.call_count == 1
+
+        assert cache.stats()["hits"] == 3
+        assert len(cache) == 1
+
+    def test_lru_eviction(self):
+        """
+        Test that the least recently used itinerary is evicted first.
+        """
+        cache = ItineraryResultCache(maxsize=2)
+        first, second, third = (
+            [make_flight(departure_time=t)] for t in ("10:00", "11:00", "12:00")
+        )
+
+        cache.calculate(first)
+        cache.calculate(second)
+        cache.calculate(first)
+        cache.calculate(third)
+
+        assert cache.stats()["evictions"] == 1
+        cache.calculate(first)
+        assert cache.stats()["hits"] == 2
+        cache.calculate(second)
+        assert cache.stats()["misses"] == 4
+
+    def test_results_are_shared_and_immutable(self):
+        """
+        Test that hits hand out the cached result itself, which cannot be mutated.
+        """
+        cache = ItineraryResultCache()
+        flights = generate_itineraries(1, seed=4, min_legs=3, max_legs=3)[0]
+
+        first = cache.calculate(flights)
+
+        assert cache.calculate(flights) is first
+        assert isinstance(first.layover_times, tuple)
+        assert len(first.layover_times) == 2
+
+    def test_errors_are_raised_and_not_cached(self):
+        """
+        Test that invalid itineraries raise the calculator's error every time.
+        """
+        cache = ItineraryResultCache()
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Invalid date or time format"):
+                cache.calculate([make_flight(departure_time="7pm")])
+
+        assert len(cache) == 0
+
+    def test_thread_safe_under_contention(self):
+        """
+        Test that concurrent lookups from a thread pool return correct results and
+        keep consistent statistics.
+        """
+        cache = ItineraryResultCache(maxsize=50)
+        corpus = generate_itineraries(80, seed=9)
+        expected = [compute_travel_times(flights) for flights in corpus]
+
+        def work(index):
+            return cache.calculate(corpus[index % len(corpus)]) == expected[
+                index % len(corpus)
+            ]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            assert all(pool.map(work, range(4000)))
+
+        stats = cache.stats()
+        assert stats["hits"] + stats["misses"] == 4000
+        assert stats["size"] <= 50
@@ -0,0 +1,142 @@
+# tests/test_reverse_geocoder.py
+
+import sys
+import os
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.calculator import compute_travel_times
+from src.reverse_geocoder import (
+    PositionalLeg,
+    ReverseGeocoder,
+    default_reverse_geocoder,
+    flights_from_positions,
+)
+from src.speed_checks import haversine_km
+
+
+def _random_geocoder(rng, count, leaf_size):
+    latitudes = rng.uniform(-90, 90, count)
+    longitudes = rng.uniform(-180, 180, count)
+    geocoder = ReverseGeocoder(
+        [f"City {i}" for i in range(count)],
+        ["Nowhere"] * count,
+        latitudes,
+        longitudes,
+        ["Etc/UTC"] * count,
+        leaf_size=leaf_size,
+    )
+    return geocoder, latitudes, longitudes
+
+
+class TestReverseGeocoder:
+    @pytest.mark.parametrize("count,leaf_size", [(1, 16), (7, 2), (500, 16), (3000, 4)])
+    def test_matches_brute_force(self, count, leaf_size):
+        """
+        Test that the KD-tree finds the same nearest distance as a full scan.
+        """
+        rng = np.random.default_rng(count)
+        geocoder, latitudes, longitudes = _random_geocoder(rng, count, leaf_size)
+        query_latitudes = rng.uniform(-90, 90, 2000)
+        query_longitudes = rng.uniform(-180, 180, 2000)
+
+        result = geocoder.nearest(query_latitudes, query_longitudes)
+        expected = haversine_km(
+            query_latitudes[:, None],
+            query_longitudes[:, None],
+            latitudes[None, :],
+            longitudes[None, :],
+        ).min(axis=1)
+        np.testing.assert_allclose(result.distance_km, expected, atol=1e-6)
+
+    def test_antimeridian(self):
+        """
+        Test that neighbours across the 180th meridian are found.
+        """
+        geocoder = ReverseGeocoder(
+            ["West", "East", "Far"],
+            ["A", "B", "C"],
+            [0.0, 0.0, 0.0],
+            [179.9, -179.9, 90.0],
+            ["Etc/UTC", "Etc/UTC", "Etc/UTC"],
+        )
+        result = geocoder.nearest([0.0, 0.0], [-179.95, 540.0 - 0.05])
+        assert result.name.tolist() == ["East", "West"]
+
+    def test_bundled_cities(self):
+        """
+        Test that airport coordinates resolve to their city, country and zone.
+        """
+        geocoder = default_reverse_geocoder()
+        result = geocoder.nearest(
+            [-8.858, 40.641, 51.470, -26.139],
+            [13.231, -73.778, -0.454, 28.246],
+        )
+        assert result.name.tolist() == [
+            "Luanda",
+            "New York",
+            "London",
+            "Johannesburg",
+        ]
+        assert result.country.tolist()[0] == "Angola"
+        assert result.timezone.tolist()[1] == "America/New_York"
+        assert (result.distance_km < 40).all()
+
+    def test_shape_and_max_distance(self):
+        """
+        Test that results follow the input shape and far points stay unmatched.
+        """
+        geocoder = default_reverse_geocoder()
+        result = geocoder.nearest(
+            np.array([[-8.8, -45.0]]), np.array([[13.2, -140.0]]), max_distance_km=100
+        )
+        assert result.index.shape == (1, 2)
+        assert result.name[0, 0] == "Luanda"
+        assert result.index[0, 1] == -1 and result.timezone[0, 1] is None
+
+    def test_mismatched_columns(self):
+        """
+        Test that columns of different lengths are rejected.
+        """
+        with pytest.raises(ValueError, match="same length"):
+            ReverseGeocoder(["A"], [], [0.0], [0.0], ["Etc/UTC"])
+
+
+class TestFlightsFromPositions:
+    def test_builds_zoned_flights(self):
+        """
+        Test that positional legs become flights with city labels and zones.
+        """
+        legs = [
+            PositionalLeg(
+                -26.139, 28.246, "2024-01-01", "16:40",
+                -8.858, 13.231, "2024-01-01", "19:10",
+            ),
+            PositionalLeg(
+                -8.858, 13.231, "2024-01-01", "23:00",
+                -23.435, -46.473, "2024-01-02", "03:30",
+            ),
+        ]
+        flights = flights_from_positions(legs)
+
+        assert [flight.departure_city for flight in flights] == ["Johannesburg", "Luanda"]
+        assert flights[1].arrival_city == "Sao Paulo"
+        assert flights[1].arrival_timezone == "America/Sao_Paulo"
+        times = compute_travel_times(flights)
+        assert times.total_air_time.total_seconds() == (3.5 + 8.5) * 3600
+
+    def test_rejects_endpoint_far_from_cities(self):
+        """
+        Test that an endpoint beyond max_distance_km raises ValueError.
+        """
+        legs = [
+            PositionalLeg(
+                -8.858, 13.231, "2024-01-01", "10:00",
+                -45.0, -140.0, "2024-01-01", "20:00",
+            )
+        ]
+        with pytest.raises(ValueError, match="Leg 0: no known city within 100 km"):
+            flights_from_positions(legs, max_distance_km=100)
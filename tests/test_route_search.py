@@ -0,0 +1,231 @@
+# tests/test_route_search.py
+
+import sys
+import os
+import random
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import Flight, compute_travel_times, iter_travel_events
+from src.itinerary_generator import generate_schedule
+from src.route_search import FlightSchedule, k_shortest_itineraries
+
+
+def _brute_force(flights, origin, destination, min_connection, max_legs):
+    """
+    Every simple itinerary from origin to destination, by depth-first search.
+    """
+    times = {}
+    for flight in flights:
+        (event,) = iter_travel_events([flight])
+        times[id(flight)] = (event.departure_utc, event.arrival_utc)
+
+    found = []
+
+    def extend(path, visited):
+        last = path[-1]
+        if last.arrival_city == destination:
+            first_departure = times[id(path[0])][0]
+            found.append((times[id(last)][1] - first_departure, path))
+            return
+        if len(path) == max_legs:
+            return
+        ready = times[id(last)][1] + min_connection
+        for flight in flights:
+            if (
+                flight.departure_city == last.arrival_city
+                and flight.arrival_city not in visited
+                and times[id(flight)][0] >= ready
+            ):
+                extend(path + [flight], visited | {flight.arrival_city})
+
+    for flight in flights:
+        if flight.departure_city == origin and flight.arrival_city != origin:
+            extend([flight], {origin, flight.arrival_city})
+    return found
+
+
+class TestFlightSchedule:
+    def test_k_shortest_on_small_network(self):
+        """
+        Test the ranking of direct and connecting itineraries by travel time.
+        """
+        direct = Flight.from_iso(
+            "Johannesburg", "2024-01-01T08:00+02:00", "Lisbon", "2024-01-01T18:00+00:00"
+        )
+        to_luanda = Flight.from_iso(
+            "Johannesburg", "2024-01-01T06:00+02:00", "Luanda", "2024-01-01T07:30+01:00"
+        )
+        to_lisbon = Flight.from_iso(
+            "Luanda", "2024-01-01T09:00+01:00", "Lisbon", "2024-01-01T15:00+00:00"
+        )
+        too_tight = Flight.from_iso(
+            "Luanda", "2024-01-01T08:00+01:00", "Lisbon", "2024-01-01T13:00+00:00"
+        )
+        schedule = FlightSchedule([direct, to_lisbon, too_tight, to_luanda])
+
+        found = k_shortest_itineraries(schedule, "Johannesburg", "Lisbon", 5)
+
+        assert [itinerary.flights for itinerary in found] == [
+            (to_luanda, to_lisbon),
+            (direct,),
+        ]
+        assert found[0].travel_times == compute_travel_times([to_luanda, to_lisbon])
+        assert found[0].travel_times.total_travel_time == timedelta(hours=11)
+
+    def test_departure_window_and_max_legs(self):
+        """
+        Test that the first departure window and leg limit restrict the results.
+        """
+        flights = generate_schedule(300, seed=2, city_count=10, hub_count=2)
+        schedule = FlightSchedule(flights)
+        earliest = datetime(2024, 1, 3)
+        latest = datetime(2024, 1, 4)
+
+        found = list(
+            schedule.itineraries("City 4", "City 7", earliest, latest, max_legs=2)
+        )
+
+        assert found
+        for itinerary in found:
+            (event, *_) = iter_travel_events(itinerary.flights[:1])
+            assert earliest <= event.departure_utc <= latest
+            assert len(itinerary.flights) <= 2
+
+    @pytest.mark.parametrize("seed", range(120))
+    def test_matches_brute_force(self, seed):
+        """
+        Test that the lazy enumeration yields every itinerary in order of travel time.
+        """
+        rng = random.Random(seed)
+        flights = generate_schedule(
+            rng.randint(20, 80),
+            seed=seed,
+            city_count=rng.randint(3, 8),
+            hub_count=rng.randint(1, 2),
+            span_days=2,
+        )
+        cities = sorted({flight.departure_city for flight in flights})
+        origin, destination = rng.sample(cities, 2)
+        min_connection = timedelta(minutes=rng.choice([30, 45, 120]))
+        max_legs = rng.randint(1, 4)
+
+        expected = _brute_force(flights, origin, destination, min_connection, max_legs)
+        found = list(
+            FlightSchedule(flights).itineraries(
+                origin, destination, min_connection=min_connection, max_legs=max_legs
+            )
+        )
+
+        costs = [itinerary.travel_times.total_travel_time for itinerary in found]
+        assert costs == sorted(cost for cost, _ in expected)
+        assert {tuple(map(id, itinerary.flights)) for itinerary in found} == {
+            tuple(map(id, path)) for _, path in expected
+        }
+
+    def test_unknown_city_and_bad_arguments(self):
+        """
+        Test that unknown cities yield nothing and invalid limits raise ValueError.
+        """
+        schedule = FlightSchedule(generate_schedule(20, seed=3, city_count=4))
+        assert list(schedule.itineraries("City 0", "Atlantis")) == []
+        with pytest.raises(ValueError, match="differ"):
+            schedule.itineraries("City 0", "City 0")
+        with pytest.raises(ValueError, match="min_connection"):
+            schedule.itineraries("City 0", "City 1", min_connection=timedelta(0))
+
+    def test_invalid_flight_is_named(self):
+        """
+        Test that a flight arriving before it departs is rejected with its index.
+        """
+        backwards = Flight.from_iso(
+            "A", "2024-01-01T10:00+00:00", "B", "2024-01-01T09:00+00:00"
+        )
+        with pytest.raises(ValueError, match="Flight 1:"):
+            FlightSchedule(generate_schedule(1, seed=0) + [backwards])
+
+
+class TestLatestDeparture:
+    def test_latest_departure_on_small_network(self):
+        """
+        Test that the latest feasible connection is chosen over earlier ones.
+        """
+        early = Flight.from_iso(
+            "Johannesburg", "2024-01-01T06:00+02:00", "Luanda", "2024-01-01T07:30+01:00"
+        )
+        late = Flight.from_iso(
+            "Johannesburg", "2024-01-01T09:00+02:00", "Luanda", "2024-01-01T10:30+01:00"
+        )
+        onward = Flight.from_iso(
+            "Luanda", "2024-01-01T11:30+01:00", "Lisbon", "2024-01-01T17:30+00:00"
+        )
+        too_late = Flight.from_iso(
+            "Luanda", "2024-01-01T14:00+01:00", "Lisbon", "2024-01-01T20:00+00:00"
+        )
+        schedule = FlightSchedule([early, late, onward, too_late])
+        lisbon = ZoneInfo("Europe/Lisbon")
+
+        found = schedule.latest_departure(
+            "Johannesburg", "Lisbon", datetime(2024, 1, 1, 18, tzinfo=lisbon)
+        )
+
+        assert found.flights == (late, onward)
+        assert found.travel_times == compute_travel_times([late, onward])
+        # Departing after the only connection that arrives in time
+        assert (
+            schedule.latest_departure(
+                "Johannesburg",
+                "Lisbon",
+                datetime(2024, 1, 1, 18),
+                earliest_departure=datetime(2024, 1, 1, 8),
+            )
+            is None
+        )
+        assert schedule.latest_departure("Lisbon", "Luanda", datetime(2024, 2, 1)) is None
+        assert schedule.latest_departure("Atlantis", "Lisbon", datetime(2024, 2, 1)) is None
+
+    @pytest.mark.parametrize("seed", range(120))
+    def test_matches_brute_force(self, seed):
+        """
+        Test that the backward scan finds the latest first departure of any
+        itinerary arriving by the deadline.
+        """
+        rng = random.Random(seed)
+        flights = generate_schedule(
+            rng.randint(20, 80),
+            seed=seed,
+            city_count=rng.randint(3, 8),
+            hub_count=rng.randint(1, 2),
+            span_days=2,
+        )
+        cities = sorted({flight.departure_city for flight in flights})
+        origin, destination = rng.sample(cities, 2)
+        min_connection = timedelta(minutes=rng.choice([30, 45, 120]))
+        arrive_by = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(3 * 24 * 60))
+        earliest = datetime(2024, 1, 1) + timedelta(minutes=rng.randrange(24 * 60))
+
+        departures = []
+        for _, path in _brute_force(flights, origin, destination, min_connection, 8):
+            first = next(iter_travel_events(path[:1]))
+            last = next(iter_travel_events(path[-1:]))
+            if first.departure_utc >= earliest and last.arrival_utc <= arrive_by:
+                departures.append(first.departure_utc)
+
+        found = FlightSchedule(flights).latest_departure(
+            origin, destination, arrive_by, earliest, min_connection
+        )
+
+        if not departures:
+            assert found is None
+            return
+        first = next(iter_travel_events(found.flights[:1]))
+        last = next(iter_travel_events(found.flights[-1:]))
+        assert first.departure_utc == max(departures)
+        assert last.arrival_utc <= arrive_by
+        assert found.travel_times == compute_travel_times(found.flights)
+        assert found.flights[0].departure_city == origin
+        assert found.flights[-1].arrival_city == destination
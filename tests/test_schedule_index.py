@@ -0,0 +1,154 @@
+# tests/test_schedule_index.py
+
+import sys
+import os
+from datetime import timedelta
+from unittest.mock import patch
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src import schedule_index
+from src.calculator import compute_travel_times
+from src.schedule_index import BROKEN, TIGHT, ItineraryIndex, leg_key
+from tests.helpers import make_flight
+
+
+def _flight(departure_city, departure_time, arrival_city, arrival_time):
+    return make_flight(
+        departure_city=departure_city,
+        departure_time=departure_time,
+        departure_offset=0,
+        arrival_city=arrival_city,
+        arrival_time=arrival_time,
+        arrival_offset=0,
+    )
+
+
+JNB_LAD = _flight("Johannesburg", "08:00", "Luanda", "10:00")
+LAD_GRU = _flight("Luanda", "12:00", "Sao Paulo", "20:00")
+LAD_LIS = _flight("Luanda", "11:00", "Lisbon", "18:00")
+CPT_JNB = _flight("Cape Town", "05:00", "Johannesburg", "07:00")
+
+
+@pytest.fixture
+def index():
+    return ItineraryIndex(
+        {
+            "to-brazil": [JNB_LAD, LAD_GRU],
+            "to-portugal": [JNB_LAD, LAD_LIS],
+            "domestic": [CPT_JNB],
+        }
+    )
+
+
+class TestItineraryIndex:
+    def test_leg_key_normalizes_time_spelling(self):
+        """
+        Test that equivalent time spellings identify the same leg.
+        """
+        early = _flight("A", "08:05", "B", "09:00")
+        spelled = _flight("A", "8:05:00", "B", "09:30")
+        assert leg_key(early) == leg_key(spelled)
+
+    def test_itineraries_with(self, index):
+        """
+        Test lookups by Flight and by leg key.
+        """
+        assert index.itineraries_with(JNB_LAD) == {"to-brazil", "to-portugal"}
+        assert index.itineraries_with(leg_key(CPT_JNB)) == {"domestic"}
+        assert index.itineraries_with(_flight("X", "01:00", "Y", "02:00")) == set()
+
+    def test_add_replaces_and_remove_forgets(self, index):
+        """
+        Test that re-adding an id reindexes it and removal drops it.
+        """
+        index.add("domestic", [JNB_LAD])
+        assert index.itineraries_with(CPT_JNB) == set()
+        assert "domestic" in index.itineraries_with(JNB_LAD)
+        index.remove("domestic")
+        assert "domestic" not in index
+        assert len(index) == 2
+
+    def test_invalid_itinerary_is_not_stored(self, index):
+        """
+        Test that adding an invalid itinerary raises and changes nothing.
+        """
+        with pytest.raises(ValueError):
+            index.add("bad", [LAD_GRU, JNB_LAD])
+        assert "bad" not in index
+
+    def test_retiming_recomputes_only_affected(self, index):
+        """
+        Test that only itineraries containing the changed leg are recomputed.
+        """
+        later = _flight("Johannesburg", "08:30", "Luanda", "10:30")
+        with patch.object(
+            schedule_index, "compute_travel_times", wraps=compute_travel_times
+        ) as compute:
+            impact = index.apply_change({JNB_LAD: later})
+
+        assert set(impact.affected) == {"to-brazil", "to-portugal"}
+        assert compute.call_count == 2
+        assert impact.broken == [] and impact.invalid == {}
+        # 30 minutes left before the Lisbon flight
+        assert impact.tight == [("to-portugal", 1, timedelta(minutes=30), TIGHT)]
+        assert impact.results["to-brazil"].layover_times == (timedelta(minutes=90),)
+        assert index.result("to-brazil") == impact.results["to-brazil"]
+        assert index.itineraries_with(later) == {"to-brazil", "to-portugal"}
+        assert index.itineraries_with(JNB_LAD) == set()
+
+    def test_batch_retiming_applies_changes_at_once(self):
+        """
+        Test that a change whose new leg is another change's old leg is not chained.
+        """
+        at_eight = _flight("A", "08:00", "B", "09:00")
+        at_nine = _flight("A", "09:00", "B", "10:00")
+        at_ten = _flight("A", "10:00", "B", "11:00")
+        index = ItineraryIndex({1: [at_eight], 2: [at_nine]})
+
+        impact = index.apply_change({at_eight: at_nine, at_nine: at_ten})
+
+        assert set(impact.affected) == {1, 2}
+        assert index.itinerary(1) == [at_nine]
+        assert index.itinerary(2) == [at_ten]
+        assert index.itineraries_with(at_eight) == set()
+        assert index.itineraries_with(at_nine) == {1}
+        assert index.itineraries_with(at_ten) == {2}
+
+    def test_broken_connection(self, index):
+        """
+        Test that a negative layover is reported and clears the stored result.
+        """
+        delayed = _flight("Johannesburg", "10:00", "Luanda", "12:30")
+        impact = index.apply_change({leg_key(JNB_LAD): delayed})
+
+        assert sorted(impact.broken) == [
+            ("to-brazil", 1, timedelta(minutes=-30), BROKEN),
+            ("to-portugal", 1, timedelta(minutes=-90), BROKEN),
+        ]
+        assert impact.results == {}
+        assert index.result("to-brazil") is None
+        assert index.itinerary("to-brazil")[0] is delayed
+        assert index.result("domestic") is not None
+
+    def test_invalid_replacement_leg(self, index):
+        """
+        Test that a replacement arriving before it departs is reported as invalid.
+        """
+        backwards = _flight("Cape Town", "05:00", "Johannesburg", "04:00")
+        impact = index.apply_change({CPT_JNB: backwards}, min_connection=timedelta(0))
+        assert impact.invalid == {
+            "domestic": "Flight 1: Arrival time cannot be before departure time"
+        }
+        assert index.result("domestic") is None
+
+    def test_unparseable_replacement_changes_nothing(self, index):
+        """
+        Test that a replacement with a bad departure time is rejected up front.
+        """
+        bad = _flight("Johannesburg", "25:99", "Luanda", "10:30")
+        with pytest.raises(ValueError):
+            index.apply_change({JNB_LAD: bad})
+        assert index.itineraries_with(JNB_LAD) == {"to-brazil", "to-portugal"}
@@ -0,0 +1,256 @@
+# tests/test_server.py
+
+import sys
+import os
+import asyncio
+import json
+from unittest.mock import MagicMock
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.server import TravelTimeService, calculate_batch, calculate_itinerary
+from src.timezone_cache import TimezoneCache
+
+FLIGHTS = [
+    {
+        "departure_city": "Johannesburg",
+        "departure_date": "2024-01-01",
+        "departure_time": "16:40",
+        "departure_timezone_utc_offset_in_hours": 2,
+        "arrival_city": "Luanda",
+        "arrival_date": "2024-01-01",
+        "arrival_time": "19:10",
+        "arrival_timezone_utc_offset_in_hours": 1,
+    },
+    {
+        "departure_city": "Luanda",
+        "departure_date": "2024-01-01",
+        "departure_time": "23:00",
+        "departure_timezone_utc_offset_in_hours": 1,
+        "arrival_city": "Sao Paulo",
+        "arrival_date": "2024-01-02",
+        "arrival_time": "03:30",
+        "arrival_timezone_utc_offset_in_hours": -3,
+    },
+]
+
+
+async def _request(port, method, path, payload=None, raw_body=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    if raw_body is None:
+        raw_body = json.dumps(payload).encode() if payload is not None else b""
+    writer.write(
+        (
+            f"{method} {path} HTTP/1.1\r\nHost: localhost\r\n"
+            f"Content-Length: {len(raw_body)}\r\nConnection: close\r\n\r\n"
+        ).encode()
+        + raw_body
+    )
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    status = int(head.split()[1])
+    return status, json.loads(body)
+
+
+def _fake_resolver(place_name):
+    if place_name == "Luanda":
+        return ResolvedPlace("Africa/Luanda", -8.83, 13.23)
+    raise ValueError(f"No matches found for '{place_name}'.")
+
+
+def _with_service(scenario, **service_kwargs):
+    async def run():
+        service = TravelTimeService(
+            port=0, workers=1, batch_chunk_size=2, **service_kwargs
+        )
+        await service.start()
+        try:
+            return await scenario(service.port)
+        finally:
+            await service.close()
+
+    return asyncio.run(run())
+
+
+class TestCalculatorFunctions:
+    def test_calculate_itinerary(self):
+        """
+        Test that a JSON itinerary produces totals in seconds and formatted strings.
+        """
+        result = calculate_itinerary(FLIGHTS)
+
+        assert result["total_air_time"]["seconds"] == (3 * 60 + 30 + 8 * 60 + 30) * 60
+        assert result["total_travel_time"]["formatted"] == "15 hours 50 minutes"
+        assert result["total_layover_time"]["formatted"] == "3 hours 50 minutes"
+        assert [layover["seconds"] for layover in result["layover_times"]] == [
+            (3 * 60 + 50) * 60
+        ]
+
+    def test_calculate_itinerary_missing_field(self):
+        """
+        Test that a flight missing a field raises a ValueError naming the field.
+        """
+        flight = dict(FLIGHTS[0])
+        del flight["arrival_time"]
+
+        with pytest.raises(ValueError, match="arrival_time"):
+            calculate_itinerary([flight])
+
+    def test_calculate_batch_reports_errors_per_itinerary(self):
+        """
+        Test that one bad itinerary does not fail the rest of the batch.
+        """
+        bad = [dict(FLIGHTS[0], arrival_time="25:99")]
+
+        results = calculate_batch([FLIGHTS, bad, FLIGHTS])
+
+        assert "error" not in results[0]
+        assert "error" in results[1]
+        assert results[2] == results[0]
+
+
+class TestTravelTimeService:
+    def test_calculate_endpoint(self):
+        """
+        Test the single itinerary endpoint.
+        """
+
+        async def scenario(port):
+            return await _request(port, "POST", "/calculate", {"flights": FLIGHTS})
+
+        status, body = _with_service(scenario)
+
+        assert status == 200
+        assert body == calculate_itinerary(FLIGHTS)
+
+    def test_batch_endpoint_preserves_order_across_chunks(self):
+        """
+        Test that batches split into process pool chunks come back in request order.
+        """
+        bad = [dict(FLIGHTS[0], departure_date="not-a-date")]
+        itineraries = [FLIGHTS, bad, FLIGHTS[:1], FLIGHTS, bad]
+
+        async def scenario(port):
+            return await _request(
+                port, "POST", "/calculate/batch", {"itineraries": itineraries}
+            )
+
+        status, body = _with_service(scenario)
+
+        assert status == 200
+        assert body["results"] == calculate_batch(itineraries)
+
+    def test_invalid_requests(self):
+        """
+        Test error statuses for bad JSON, bad itineraries, unknown paths and methods.
+        """
+
+        async def scenario(port):
+            return [
+                await _request(port, "POST", "/calculate", raw_body=b"{not json"),
+                await _request(port, "POST", "/calculate", {"flights": [{}]}),
+                await _request(port, "POST", "/calculate", {"itinerary": []}),
+                await _request(port, "GET", "/nowhere"),
+                await _request(port, "GET", "/calculate"),
+            ]
+
+        statuses = [status for status, _ in _with_service(scenario)]
+
+        assert statuses == [400, 400, 400, 404, 405]
+
+    def test_timezone_endpoint(self):
+        """
+        Test that the timezone endpoint resolves through the service's cache.
+        """
+
+        async def scenario(port):
+            return [
+                await _request(port, "POST", "/timezone", {"place": "Luanda"}),
+                await _request(port, "POST", "/timezone", {"place": "Nowhereville"}),
+            ]
+
+        (ok_status, ok_body), (bad_status, bad_body) = _with_service(
+            scenario, timezone_cache=TimezoneCache(resolver=_fake_resolver)
+        )
+
+        assert ok_status == 200
+        assert ok_body == {
+            "place": "Luanda",
+            "timezone": "Africa/Luanda",
+            "utc_offset_hours": 1.0,
+        }
+        assert bad_status == 400
+        assert "Nowhereville" in bad_body["error"]
+
+    def test_timezones_batch_endpoint(self):
+        """
+        Test that one request resolves every city of a form, geocoding each once.
+        """
+        resolver = MagicMock(side_effect=_fake_resolver)
+        cache = TimezoneCache(resolver=resolver)
+
+        async def scenario(port):
+            places = ["Luanda", "Nowhereville", "Luanda"]
+            first = await _request(port, "POST", "/timezones", {"places": places})
+            second = await _request(port, "POST", "/timezones", {"places": places})
+            bad = await _request(port, "POST", "/timezones", {"places": "Luanda"})
+            return first, second, bad
+
+        (status, body), (_, second_body), (bad_status, _) = _with_service(
+            scenario, timezone_cache=cache
+        )
+
+        assert status == 200
+        assert body["results"]["Luanda"]["timezone"] == "Africa/Luanda"
+        assert "error" in body["results"]["Nowhereville"]
+        assert second_body == body
+        assert bad_status == 400
+        # Luanda is cached after the first request, the unknown place is
+        # remembered by the negative cache
+        assert resolver.call_count == 2
+
+    def test_cors_preflight(self):
+        """
+        Test that browsers may call the service from the static web UI origin.
+        """
+
+        async def scenario(port):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                b"OPTIONS /timezones HTTP/1.1\r\nHost: localhost\r\n"
+                b"Connection: close\r\n\r\n"
+            )
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            return response
+
+        response = _with_service(scenario)
+
+        assert response.startswith(b"HTTP/1.1 200")
+        assert b"Access-Control-Allow-Origin: *" in response
+
+    def test_metrics_endpoint(self):
+        """
+        Test that request counts, errors and queue depth are reported.
+        """
+
+        async def scenario(port):
+            await _request(port, "POST", "/calculate", {"flights": FLIGHTS})
+            await _request(port, "POST", "/calculate", {"flights": [{}]})
+            await _request(port, "POST", "/calculate/batch", {"itineraries": [FLIGHTS]})
+            return await _request(port, "GET", "/metrics")
+
+        status, metrics = _with_service(scenario)
+
+        assert status == 200
+        assert metrics["endpoints"]["POST /calculate"]["count"] == 2
+        assert metrics["endpoints"]["POST /calculate"]["errors"] == 1
+        assert metrics["endpoints"]["POST /calculate/batch"]["count"] == 1
+        assert metrics["pool_queue_depth"] == 0
+        assert metrics["max_pool_queue_depth"] == 1
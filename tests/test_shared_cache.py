@@ -0,0 +1,143 @@
+# tests/test_shared_cache.py
+
+import sys
+import os
+import multiprocessing
+import pickle
+from unittest.mock import MagicMock
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.shared_cache import MAX_KEY_BYTES, SharedPlaceTable
+from src.timezone_cache import TimezoneCache
+
+TOKYO = ResolvedPlace("Asia/Tokyo", 35.68, 139.69)
+LIMA = ResolvedPlace("America/Lima", -12.05, -77.04)
+
+
+@pytest.fixture
+def table():
+    table = SharedPlaceTable.create(capacity=8)
+    yield table
+    table.close()
+    table.unlink()
+
+
+def _resolve_in_child(table, place_name, queue):
+    cache = TimezoneCache(resolver=lambda name: LIMA, shared=table)
+    queue.put(tuple(cache.resolve_place(place_name)))
+
+
+class TestSharedPlaceTable:
+    def test_put_and_get(self, table):
+        """
+        Test that stored entries are returned and unknown keys miss.
+        """
+        assert table.put("tokyo", TOKYO)
+        assert table.get("tokyo") == TOKYO
+        assert table.get("osaka") is None
+        assert len(table) == 1
+
+    def test_overwrite_keeps_one_entry(self, table):
+        """
+        Test that storing a key again replaces its entry.
+        """
+        table.put("tokyo", TOKYO)
+        table.put("tokyo", LIMA)
+        assert table.get("tokyo") == LIMA
+        assert len(table) == 1
+
+    def test_capacity_is_a_power_of_two(self):
+        """
+        Test that the requested capacity is rounded up.
+        """
+        table = SharedPlaceTable.create(capacity=5)
+        try:
+            assert table.capacity == 8
+        finally:
+            table.close()
+            table.unlink()
+
+    def test_full_table_rejects_new_keys(self, table):
+        """
+        Test that a full table refuses new keys but still updates existing ones.
+        """
+        for i in range(table.capacity):
+            assert table.put(f"city {i}", TOKYO)
+        assert not table.put("one too many", TOKYO)
+        assert table.put("city 3", LIMA)
+        assert table.get("city 3") == LIMA
+        assert table.stats()["load_factor"] == 1.0
+
+    def test_oversized_key_is_not_shared(self, table):
+        """
+        Test that keys longer than a slot allows are skipped.
+        """
+        key = "x" * (MAX_KEY_BYTES + 1)
+        assert not table.put(key, TOKYO)
+        assert table.get(key) is None
+
+    def test_attach_sees_same_entries(self, table):
+        """
+        Test that a table attached by name or unpickled shares the memory.
+        """
+        attached = SharedPlaceTable.attach(table.name)
+        unpickled = pickle.loads(pickle.dumps(table))
+        try:
+            attached.put("tokyo", TOKYO)
+            assert table.get("tokyo") == TOKYO
+            assert unpickled.get("tokyo") == TOKYO
+        finally:
+            attached.close()
+            unpickled.close()
+
+    def test_other_process_entries_are_visible(self, table):
+        """
+        Test that a place resolved in a child process is a hit in the parent.
+        """
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        child = context.Process(
+            target=_resolve_in_child, args=(table, "Lima", queue)
+        )
+        child.start()
+        assert queue.get(timeout=30) == tuple(LIMA)
+        child.join(timeout=30)
+        assert child.exitcode == 0
+
+        resolver = MagicMock()
+        cache = TimezoneCache(resolver=resolver, shared=table)
+        assert cache.resolve_place("LIMA") == LIMA
+        resolver.assert_not_called()
+
+
+class TestTimezoneCacheSharedBackend:
+    def test_one_resolution_serves_every_cache(self, table):
+        """
+        Test that caches sharing a table geocode each place once between them.
+        """
+        resolver = MagicMock(side_effect=lambda name: TOKYO)
+        first = TimezoneCache(resolver=resolver, shared=table)
+        second = TimezoneCache(resolver=resolver, shared=table)
+
+        first.resolve_place("Tokyo")
+        assert second.resolve_place("tokyo") == TOKYO
+        assert second.resolve_place("Tokyo") == TOKYO
+        assert resolver.call_count == 1
+        assert second.stage_stats()["shared"]["hits"] == 1
+        assert second.stats()["misses"] == 0
+
+    def test_failures_are_not_shared(self, table):
+        """
+        Test that a failed lookup leaves the shared table untouched.
+        """
+        cache = TimezoneCache(
+            resolver=MagicMock(side_effect=ValueError("No matches found")),
+            shared=table,
+        )
+        with pytest.raises(ValueError):
+            cache.resolve_place("Atlantis")
+        assert len(table) == 0
@@ -0,0 +1,171 @@
+# tests/test_speed_checks.py
+
+import sys
+import os
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.speed_checks import (
+    CityDistanceMatrix,
+    check_speeds,
+    check_speeds_cached,
+    city_coordinates,
+    haversine_km,
+)
+from src.timezone_cache import TimezoneCache
+from tests.helpers import make_flight
+
+PLACES = {
+    "Johannesburg": ResolvedPlace("Africa/Johannesburg", -26.2041, 28.0473),
+    "Luanda": ResolvedPlace("Africa/Luanda", -8.8390, 13.2894),
+    "London": ResolvedPlace("Europe/London", 51.5074, -0.1278),
+}
+
+
+def _resolver(place_name):
+    try:
+        return PLACES[place_name]
+    except KeyError:
+        raise ValueError(f"No matches found for '{place_name}'.")
+
+
+def _flight(departure_city, departure_time, arrival_city, arrival_time):
+    return make_flight(
+        departure_city=departure_city,
+        departure_time=departure_time,
+        departure_offset=0,
+        arrival_city=arrival_city,
+        arrival_time=arrival_time,
+        arrival_offset=0,
+    )
+
+
+class TestHaversine:
+    def test_known_distance(self):
+        """
+        Test the distance between Johannesburg and Luanda.
+        """
+        johannesburg, luanda = PLACES["Johannesburg"], PLACES["Luanda"]
+        distance = haversine_km(
+            johannesburg.latitude, johannesburg.longitude, luanda.latitude, luanda.longitude
+        )
+        assert distance == pytest.approx(2480, rel=0.01)
+
+    def test_antipodes_and_same_point(self):
+        """
+        Test the extremes of the formula.
+        """
+        distances = haversine_km(
+            np.array([0.0, 10.0]),
+            np.array([0.0, 20.0]),
+            np.array([0.0, -10.0]),
+            np.array([180.0, -160.0]),
+        )
+        assert distances[0] == pytest.approx(np.pi * 6371.0088)
+        assert distances[1] == pytest.approx(np.pi * 6371.0088)
+        assert haversine_km(1.0, 2.0, 1.0, 2.0) == 0
+
+
+class TestCityDistanceMatrix:
+    def test_matrix_matches_haversine(self):
+        """
+        Test that matrix lookups equal the direct formula.
+        """
+        coordinates = {name: (p.latitude, p.longitude) for name, p in PLACES.items()}
+        matrix = CityDistanceMatrix(coordinates)
+        origins = matrix.indices(["Johannesburg", "London", "Nowhere"])
+        destinations = matrix.indices(["London", "Luanda", "London"])
+        distances = matrix.distances(origins, destinations)
+        expected = haversine_km(
+            PLACES["Johannesburg"].latitude,
+            PLACES["Johannesburg"].longitude,
+            PLACES["London"].latitude,
+            PLACES["London"].longitude,
+        )
+        assert distances[0] == pytest.approx(expected, rel=1e-6)
+        assert np.isnan(distances[2])
+        assert len(matrix) == 3
+
+
+class TestCheckSpeeds:
+    def test_flags_impossible_leg(self):
+        """
+        Test that a leg shortened by a data error is flagged.
+        """
+        itineraries = [
+            [_flight("Johannesburg", "08:00", "Luanda", "11:00")],
+            [
+                _flight("Johannesburg", "08:00", "Luanda", "11:00"),
+                # Roughly 6,800 km in one hour
+                _flight("Luanda", "12:00", "London", "13:00"),
+            ],
+        ]
+        coordinates = {name: (p.latitude, p.longitude) for name, p in PLACES.items()}
+        result = check_speeds(itineraries, CityDistanceMatrix(coordinates))
+        assert result.flagged_legs() == [(1, 1)]
+        assert result.speed_kmh[0] == pytest.approx(2480 / 3, rel=0.01)
+
+    def test_zero_duration_and_unknown_cities(self):
+        """
+        Test zero-duration legs between cities and legs with unknown cities.
+        """
+        itineraries = [
+            [
+                _flight("Luanda", "08:00", "London", "08:00"),
+                _flight("London", "09:00", "London", "09:00"),
+                _flight("London", "10:00", "Atlantis", "10:00"),
+            ]
+        ]
+        cache = TimezoneCache(resolver=_resolver)
+        result = check_speeds_cached(itineraries, cache, resolve=True)
+        assert np.isinf(result.speed_kmh[0])
+        assert result.speed_kmh[1] == 0
+        assert np.isnan(result.speed_kmh[2])
+        assert result.flagged_legs() == [(0, 0)]
+
+    def test_cached_coordinates_only(self):
+        """
+        Test that resolve=False never geocodes.
+        """
+        cache = TimezoneCache(resolver=_resolver)
+        cache.resolve_place("Luanda")
+        assert city_coordinates(["Luanda", "London"], cache, resolve=False) == {
+            "Luanda": (PLACES["Luanda"].latitude, PLACES["Luanda"].longitude)
+        }
+        assert cache.misses == 1
+
+    def test_batch_check_does_not_geocode_by_default(self):
+        """
+        Test that cities missing from the cache are skipped, not geocoded.
+        """
+        cache = TimezoneCache(resolver=_resolver)
+        cache.resolve_place("Luanda")
+        itineraries = [[_flight("Luanda", "08:00", "Nowhere, Really", "11:00")]]
+        result = check_speeds_cached(itineraries, cache)
+        assert np.isnan(result.speed_kmh[0])
+        assert cache.misses == 1
+
+    def test_matrix_is_reused_until_a_city_is_new(self):
+        """
+        Test that the previous result's matrix is reused while it covers the
+        batch and extended when a new city appears.
+        """
+        cache = TimezoneCache(resolver=_resolver)
+        for name in PLACES:
+            cache.resolve_place(name)
+        leg = _flight("Johannesburg", "08:00", "Luanda", "11:00")
+        first = check_speeds_cached([[leg]], cache)
+        assert len(first.matrix) == 2
+
+        again = check_speeds_cached([[leg]], cache, distances=first.matrix)
+        assert again.matrix is first.matrix
+
+        onward = _flight("Luanda", "12:00", "London", "20:00")
+        extended = check_speeds_cached([[onward]], cache, distances=first.matrix)
+        assert extended.matrix is not first.matrix
+        assert len(extended.matrix) == 3
+        assert extended.distance_km[0] > 0
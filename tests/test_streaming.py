@@ -0,0 +1,101 @@
+# tests/test_streaming.py
+
+import sys
+import os
+import itertools
+from datetime import timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import compute_travel_times, iter_travel_events
+from src.itinerary_generator import generate_itineraries
+from tests.helpers import make_flight
+
+
+class TestIterTravelEvents:
+    def test_per_leg_events(self):
+        """
+        Test the leg duration, layover and running totals of each event.
+        """
+        flights = [
+            make_flight(),
+            make_flight(departure_time="21:00", arrival_time="23:00"),
+        ]
+        first, second = iter_travel_events(flights)
+
+        assert first.leg_index == 0
+        assert first.flight is flights[0]
+        assert first.flight_duration == timedelta(hours=3, minutes=30)
+        assert first.layover is None
+        assert first.total_travel_time == timedelta(hours=3, minutes=30)
+
+        assert second.leg_index == 1
+        assert second.layover == timedelta(minutes=50)
+        assert second.total_air_time == timedelta(hours=6, minutes=30)
+        assert second.total_layover_time == timedelta(minutes=50)
+        assert second.total_travel_time == timedelta(hours=7, minutes=20)
+
+    def test_final_event_matches_compute_travel_times(self):
+        """
+        Test that the last event carries the same totals as the batch API.
+        """
+        for flights in generate_itineraries(50, seed=7):
+            result = compute_travel_times(flights)
+            events = list(iter_travel_events(iter(flights)))
+            assert events[-1].total_air_time == result.total_air_time
+            assert events[-1].total_travel_time == result.total_travel_time
+            assert events[-1].total_layover_time == result.total_layover_time
+            assert tuple(e.layover for e in events[1:]) == result.layover_times
+
+    def test_empty_itinerary(self):
+        """
+        Test that an empty itinerary yields no events.
+        """
+        assert list(iter_travel_events([])) == []
+
+    def test_stops_at_first_bad_leg(self):
+        """
+        Test that earlier legs are yielded before the bad leg raises.
+        """
+        flights = [
+            make_flight(),
+            make_flight(departure_time="18:00", arrival_time="20:00"),
+            make_flight(
+                departure_date="invalid",
+                departure_time="21:00",
+                arrival_time="22:00",
+            ),
+        ]
+        events = iter_travel_events(flights)
+        assert next(events).leg_index == 0
+        with pytest.raises(ValueError, match="Error processing flight 2: Flight 2: Departure"):
+            next(events)
+
+    def test_unbounded_feed(self):
+        """
+        Test that an endless feed of legs can be consumed lazily.
+        """
+
+        def feed():
+            for day in itertools.count(1):
+                date = f"2024-01-{day:02d}"
+                yield make_flight(
+                    departure_date=date,
+                    departure_time="08:00",
+                    arrival_date=date,
+                    arrival_time="09:00",
+                )
+
+        events = iter_travel_events(feed())
+        tenth = next(itertools.islice(events, 9, None))
+        assert tenth.total_air_time == timedelta(hours=20)
+        assert tenth.total_layover_time == timedelta(hours=9 * 22)
+
+    def test_policies_checked_eagerly(self):
+        """
+        Test that an unknown policy raises before any leg is consumed.
+        """
+        with pytest.raises(ValueError, match="ambiguous must be one of"):
+            iter_travel_events(iter(()), ambiguous="first")
@@ -0,0 +1,90 @@
+# tests/test_thread_safety.py
+
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import (
+    SharedTravelTimeCalculator,
+    TravelTimeCalculator,
+    compute_travel_times,
+)
+from src.itinerary_generator import EDGE_UTC_OFFSETS, generate_itineraries
+
+
+@pytest.fixture
+def frequent_thread_switches():
+    """
+    Switch threads as often as possible so interleavings actually happen.
+    """
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+class TestThreadSafety:
+    def test_compute_matches_legacy_calculator(self):
+        """
+        Test that the pure core returns the same values as TravelTimeCalculator.
+        """
+        for flights in generate_itineraries(300, seed=21, offsets=EDGE_UTC_OFFSETS):
+            air, travel, layover, layovers = TravelTimeCalculator(
+                flights=flights
+            ).calculate_travel_times()
+            result = compute_travel_times(flights)
+
+            assert result == (air, travel, layover, tuple(layovers))
+
+    def test_shared_calculator_is_immutable(self):
+        """
+        Test that the shared calculator has no state that could be mutated.
+        """
+        calculator = SharedTravelTimeCalculator()
+
+        with pytest.raises(AttributeError):
+            calculator.layover_times = []
+        assert not hasattr(calculator, "__dict__")
+
+    def test_shared_instance_under_thread_pool_stress(self, frequent_thread_switches):
+        """
+        Test that one calculator instance serving 16 threads returns the same results
+        as sequential calculations, including for itineraries that raise.
+        """
+        corpus = generate_itineraries(400, seed=17, max_legs=8)
+        # Every fifth itinerary is reversed, so multi-leg ones fail validation
+        corpus = [
+            list(reversed(flights)) if index % 5 == 0 else flights
+            for index, flights in enumerate(corpus)
+        ]
+
+        def outcome(flights):
+            try:
+                return calculator.calculate(flights)
+            except ValueError as e:
+                return str(e)
+
+        calculator = SharedTravelTimeCalculator()
+        expected = [outcome(flights) for flights in corpus]
+
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            for _ in range(5):
+                assert list(pool.map(outcome, corpus)) == expected
+
+    def test_calculate_formatted(self):
+        """
+        Test the formatted view of the shared calculator.
+        """
+        flights = generate_itineraries(1, seed=3, min_legs=2, max_legs=2)[0]
+        calculator = TravelTimeCalculator(flights=flights)
+
+        assert SharedTravelTimeCalculator().calculate_formatted(flights) == {
+            "total_air_time": calculator.get_total_air_time(),
+            "total_travel_time": calculator.get_total_travel_time(),
+            "total_layover_time": calculator.get_total_layover_time(),
+            "layover_times": calculator.get_individual_layover_times(),
+        }
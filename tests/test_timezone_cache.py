@@ -0,0 +1,203 @@
+# tests/test_timezone_cache.py
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.get_utc_offset_in_hours import ResolvedPlace
+from src.timezone_cache import TimezoneCache
+
+TOKYO = ResolvedPlace("Asia/Tokyo", 35.68, 139.69)
+
+
+def _resolver(place_name):
+    if place_name == "Tokyo":
+        return TOKYO
+    raise ValueError(f"No matches found for '{place_name}'.")
+
+
+class TestTimezoneCache:
+    def test_resolve_geocodes_once(self):
+        """
+        Test that repeated lookups of a place hit the cache.
+        """
+        resolver = MagicMock(side_effect=_resolver)
+        cache = TimezoneCache(resolver=resolver)
+
+        results = [cache.resolve("Tokyo") for _ in range(3)]
+
+        assert results == [("Asia/Tokyo", 9.0)] * 3
+        assert resolver.call_count == 1
+        assert cache.stats() == {
+            "entries": 1,
+            "hits": 2,
+            "misses": 1,
+            "hit_rate": 2 / 3,
+        }
+
+    def test_failures_are_raised_and_not_cached(self):
+        """
+        Test that unknown places raise the resolver's ValueError every time
+        when the negative cache is disabled.
+        """
+        resolver = MagicMock(side_effect=_resolver)
+        cache = TimezoneCache(resolver=resolver, negative_ttl=0)
+
+        for _ in range(2):
+            with pytest.raises(ValueError, match="Atlantis"):
+                cache.resolve("Atlantis")
+
+        assert resolver.call_count == 2
+        assert len(cache) == 0
+
+    def test_resolve_many_deduplicates_and_collects_errors(self):
+        """
+        Test that a batch resolves each distinct name once and keeps going past errors.
+        """
+        resolver = MagicMock(side_effect=_resolver)
+        cache = TimezoneCache(resolver=resolver)
+
+        results = cache.resolve_many(["Tokyo", "Atlantis", "Tokyo"])
+
+        assert results["Tokyo"] == ("Asia/Tokyo", 9.0)
+        assert isinstance(results["Atlantis"], ValueError)
+        assert resolver.call_count == 2
+
+    def test_default_resolver_is_the_geocoding_pipeline(self):
+        """
+        Test that without a resolver the cache calls resolve_place_with_suggestions.
+        """
+        with patch(
+            "src.get_utc_offset_in_hours.resolve_place_with_suggestions",
+            return_value=TOKYO,
+        ) as pipeline:
+            cache = TimezoneCache()
+            assert cache.resolve_place("Tokyo") == TOKYO
+            assert cache.get("Tokyo") == TOKYO
+
+        pipeline.assert_called_once_with("Tokyo")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestCanonicalization:
+    def test_spelling_variants_share_an_entry(self):
+        """
+        Test that accents, case, punctuation and spacing do not cause misses.
+        """
+        resolver = MagicMock(
+            return_value=ResolvedPlace("America/Sao_Paulo", -23.55, -46.63)
+        )
+        cache = TimezoneCache(resolver=resolver)
+
+        names = [
+            "São Paulo",
+            "Sao Paulo ",
+            "sao-paulo",
+            "sao paulo, brazil",
+            "SAO  PAULO",
+            "São Paulo",
+        ]
+        for name in names:
+            assert cache.resolve_place(name).timezone_name == "America/Sao_Paulo"
+
+        resolver.assert_called_once_with("São Paulo")
+        assert len(cache) == 1
+        stages = cache.stage_stats()
+        assert stages["exact"]["lookups"] == 6 and stages["exact"]["hits"] == 1
+        assert stages["canonical"]["hits"] == 4
+        assert cache.get("sao paulo") is not None
+
+    def test_aliases(self):
+        """
+        Test that default and custom aliases map to the same entry.
+        """
+        resolver = MagicMock(side_effect=lambda name: TOKYO)
+        cache = TimezoneCache(
+            resolver=resolver, aliases={"Edo": "Tokyo", "NYC": "New York"}
+        )
+        cache.resolve_place("Tokyo")
+        cache.resolve_place("edo")
+        assert resolver.call_count == 1
+        assert cache.canonical_name("N.Y.C.") == "n y c"
+        assert cache.canonical_name("nyc") == "new york"
+        assert TimezoneCache().canonical_name("Bombay") == "mumbai"
+
+    def test_country_qualifiers_are_kept(self):
+        """
+        Test that same-named cities in different countries get separate entries
+        unless an alias joins a qualified spelling to the bare name.
+        """
+        places = {
+            "Cordoba, Spain": ResolvedPlace("Europe/Madrid", 37.88, -4.78),
+            "Cordoba, Argentina": ResolvedPlace(
+                "America/Argentina/Cordoba", -31.42, -64.18
+            ),
+            "Luanda": ResolvedPlace("Africa/Luanda", -8.84, 13.23),
+        }
+        resolver = MagicMock(side_effect=places.__getitem__)
+        cache = TimezoneCache(resolver=resolver, aliases={"Luanda, Angola": "Luanda"})
+
+        assert cache.resolve_place("Cordoba, Spain").timezone_name == "Europe/Madrid"
+        assert (
+            cache.resolve_place("Cordoba, Argentina").timezone_name
+            == "America/Argentina/Cordoba"
+        )
+        cache.resolve_place("Luanda")
+        assert cache.resolve_place("luanda, angola").timezone_name == "Africa/Luanda"
+        assert resolver.call_count == 3
+        assert cache.canonical_name("Paris, Texas") == "paris texas"
+
+
+class TestNegativeCache:
+    def test_failures_are_remembered_until_expiry(self):
+        """
+        Test that an unknown place is not re-geocoded within the TTL.
+        """
+        clock = FakeClock()
+        resolver = MagicMock(side_effect=_resolver)
+        cache = TimezoneCache(resolver=resolver, negative_ttl=60, clock=clock)
+
+        for name in ["Atlantis", "atlantis", "ATLANTIS!"]:
+            with pytest.raises(ValueError, match="No matches found for 'Atlantis'"):
+                cache.resolve_place(name)
+        assert resolver.call_count == 1
+        assert cache.stage_stats()["negative"]["hits"] == 2
+
+        clock.now = 61
+        with pytest.raises(ValueError):
+            cache.resolve_place("Atlantis")
+        assert resolver.call_count == 2
+
+    def test_negative_entries_are_bounded(self):
+        """
+        Test that the oldest remembered failure is dropped when full.
+        """
+        cache = TimezoneCache(
+            resolver=_resolver, max_negative_entries=2, clock=FakeClock()
+        )
+        for name in ["Atlantis", "Lemuria", "Mu"]:
+            with pytest.raises(ValueError):
+                cache.resolve_place(name)
+        assert cache.stage_stats()["negative"]["entries"] == 2
+        assert "atlantis" not in cache._negative
+
+    def test_success_clears_failure(self):
+        """
+        Test that storing a place removes a remembered failure for it.
+        """
+        cache = TimezoneCache(resolver=_resolver, clock=FakeClock())
+        with pytest.raises(ValueError):
+            cache.resolve_place("Atlantis")
+        cache.put("Atlantis", TOKYO)
+        assert cache.resolve_place("atlantis") == TOKYO
@@ -0,0 +1,120 @@
+# tests/test_timezone_grid.py
+
+import sys
+import os
+from unittest.mock import MagicMock, patch
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import numpy as np
+import pytest
+from src.get_utc_offset_in_hours import resolve_place_with_suggestions
+from src.timezone_grid import BORDER_CELL, TimezoneGrid, build_grid
+
+
+class BandFinder:
+    """
+    Stand-in for TimezoneFinder with 15-degree longitude bands as zones.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def timezone_at(self, lng, lat):
+        self.calls += 1
+        return f"Band/{int((lng + 180) // 15)}"
+
+
+class TestTimezoneGrid:
+    def test_build_and_memory_map(self, tmp_path):
+        """
+        Test that a saved grid is memory-mapped and marks band edges as borders.
+        """
+        grid = build_grid(str(tmp_path), resolution=10, finder=BandFinder())
+        assert isinstance(grid.grid, np.memmap)
+        assert grid.grid.shape == (18, 36)
+        # Each band edge but the antimeridian falls inside or on the right edge
+        # of one column
+        assert (np.asarray(grid.grid) == BORDER_CELL).all(axis=0).sum() == 23
+        assert grid.border_fraction() == pytest.approx(23 / 36)
+        reloaded = TimezoneGrid.load(str(tmp_path), finder=BandFinder())
+        assert reloaded.zone_names == grid.zone_names
+        assert reloaded.resolution == 10
+
+    def test_vectorized_lookup_matches_finder(self, tmp_path):
+        """
+        Test that grid lookups, with the border fallback, agree with the finder.
+        """
+        finder = BandFinder()
+        grid = build_grid(str(tmp_path), resolution=10, finder=finder)
+        rng = np.random.default_rng(5)
+        latitudes = rng.uniform(-90, 90, 5000)
+        longitudes = rng.uniform(-180, 180, 5000)
+
+        finder.calls = 0
+        names = grid.timezone_names(latitudes, longitudes)
+        expected = [
+            finder.timezone_at(lng=lng, lat=lat)
+            for lat, lng in zip(latitudes.tolist(), longitudes.tolist())
+        ]
+        lookups = finder.calls - len(expected)
+        assert names.tolist() == expected
+        # Only points in border cells went through the polygon fallback
+        in_border_cells = (grid.grid[
+            ((latitudes + 90) // 10).astype(int), ((longitudes + 180) // 10).astype(int)
+        ] == BORDER_CELL).sum()
+        assert lookups == in_border_cells < len(expected)
+
+    def test_scalar_and_wrapped_longitudes(self, tmp_path):
+        """
+        Test single points, the antimeridian and longitudes outside [-180, 180).
+        """
+        grid = build_grid(str(tmp_path), resolution=10, finder=BandFinder())
+        assert grid.timezone_at(lng=2.0, lat=48.0) == "Band/12"
+        assert grid.timezone_at(lng=182.0, lat=48.0) == "Band/0"
+        assert grid.timezone_at(lng=180.0, lat=90.0) == "Band/0"
+
+    def test_zone_found_only_in_border_cell(self):
+        """
+        Test that a zone first seen by the border fallback is named in the result.
+        """
+        finder = MagicMock()
+        finder.timezone_at.return_value = "Zone/Border"
+        grid = TimezoneGrid(
+            np.array([[1, BORDER_CELL], [1, 1]], dtype=np.int32),
+            [None, "Zone/Grid"],
+            resolution=90,
+            finder=finder,
+        )
+        names = grid.timezone_names([-45.0, -45.0, 45.0], [-135.0, -45.0, -45.0])
+        assert names.tolist() == ["Zone/Grid", "Zone/Border", "Zone/Grid"]
+        assert grid.zone_names == [None, "Zone/Grid", "Zone/Border"]
+
+    def test_rejects_uneven_resolution(self, tmp_path):
+        """
+        Test that the resolution must tile the globe.
+        """
+        with pytest.raises(ValueError, match="must divide 180"):
+            build_grid(str(tmp_path), resolution=7, finder=BandFinder())
+
+    def test_real_polygons(self, tmp_path):
+        """
+        Test a coarse grid built from TimezoneFinder's polygons.
+        """
+        grid = build_grid(str(tmp_path), resolution=10)
+        names = grid.timezone_names([35.68, 48.86, -8.84], [139.69, 2.35, 13.29])
+        assert names.tolist() == ["Asia/Tokyo", "Europe/Paris", "Africa/Luanda"]
+
+
+class TestResolvePlaceWithGrid:
+    def test_grid_replaces_timezone_finder(self, tmp_path):
+        """
+        Test that a grid can stand in for TimezoneFinder when resolving places.
+        """
+        grid = build_grid(str(tmp_path), resolution=10, finder=BandFinder())
+        location = MagicMock(latitude=48.86, longitude=2.35)
+        with patch("src.get_utc_offset_in_hours.Nominatim") as nominatim:
+            nominatim.return_value.geocode.return_value = [location]
+            place = resolve_place_with_suggestions("Paris", timezone_finder=grid)
+        assert place.timezone_name == "Band/12"
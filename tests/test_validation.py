@@ -0,0 +1,116 @@
+# tests/test_validation.py
+
+import sys
+import os
+import random
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src.calculator import compute_travel_times
+from src.itinerary_generator import EDGE_UTC_OFFSETS, generate_itineraries
+from src.validation import (
+    ARRIVAL_BEFORE_DEPARTURE,
+    DEPARTURE_BEFORE_PREVIOUS_ARRIVAL,
+    INVALID_ARRIVAL_OFFSET,
+    INVALID_DEPARTURE_DATE,
+    INVALID_DEPARTURE_TIME,
+    ValidationError,
+    count_errors_by_code,
+    validate_itineraries,
+    validate_itinerary,
+)
+from tests.helpers import make_flight
+
+CORRUPTIONS = [
+    ("departure_date", ["2024-02-30", "2023-02-29", "24-01-01", "2024/01/01", ""]),
+    ("departure_time", ["24:00", "12:60", "7pm", "12:5:0", " 12:00"]),
+    ("arrival_date", ["2024-13-01", "0000-01-01", "2024-1-32", None]),
+    ("arrival_time", ["9", "09:00:00", "-1:00", 900]),
+    ("departure_timezone_utc_offset_in_hours", ["2", None, [1]]),
+    ("arrival_date", ["2024-1-1", "2024-02-29", "2024-01- 5"]),
+    ("departure_time", ["7:5", "07:05"]),
+]
+
+
+def _calculator_failing_leg(flights):
+    try:
+        compute_travel_times(flights)
+    except ValueError as e:
+        # "Error processing flight N: ..."
+        return int(str(e).split(":")[0].rsplit(" ", 1)[1]) - 1
+    return None
+
+
+class TestValidation:
+    def test_valid_itinerary_has_no_errors(self):
+        """
+        Test that valid itineraries produce an empty error table.
+        """
+        corpus = generate_itineraries(300, seed=6, offsets=EDGE_UTC_OFFSETS)
+
+        assert validate_itineraries(enumerate(corpus)) == []
+
+    def test_collects_every_error_in_one_pass(self):
+        """
+        Test that all bad legs of all itineraries are reported without raising.
+        """
+        itineraries = {
+            "ok": [make_flight()],
+            "bad-format": [
+                make_flight(
+                    departure_date="2024-02-30",
+                    departure_time="7pm",
+                )
+            ],
+            "bad-order": [
+                make_flight(arrival_time="15:00"),
+                make_flight(departure_time="15:30"),
+                make_flight(departure_date="2024-01-02"),
+            ],
+        }
+        itineraries["bad-format"][0].arrival_timezone_utc_offset_in_hours = "1"
+
+        errors = validate_itineraries(itineraries.items())
+
+        assert errors == [
+            ValidationError("bad-format", 0, INVALID_DEPARTURE_DATE),
+            ValidationError("bad-format", 0, INVALID_DEPARTURE_TIME),
+            ValidationError("bad-format", 0, INVALID_ARRIVAL_OFFSET),
+            ValidationError("bad-order", 0, ARRIVAL_BEFORE_DEPARTURE),
+            ValidationError("bad-order", 1, DEPARTURE_BEFORE_PREVIOUS_ARRIVAL),
+            ValidationError("bad-order", 2, ARRIVAL_BEFORE_DEPARTURE),
+        ]
+        assert count_errors_by_code(errors)[INVALID_DEPARTURE_DATE] == 1
+
+    def test_zero_duration_and_zero_layover_are_valid(self):
+        """
+        Test that equal times are accepted, as in the calculator.
+        """
+        flights = [make_flight(arrival_time="15:40"), make_flight()]
+
+        assert validate_itinerary(flights) == []
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_agrees_with_calculator_on_corrupted_corpora(self, seed):
+        """
+        Test that validation finds an error exactly when the calculator raises, and
+        that its first error is on the leg the calculator fails on.
+        """
+        rng = random.Random(seed)
+        corpus = generate_itineraries(400, seed=seed, max_legs=5)
+        for flights in corpus:
+            if rng.random() < 0.5:
+                field, values = rng.choice(CORRUPTIONS)
+                setattr(rng.choice(flights), field, rng.choice(values))
+            if rng.random() < 0.2 and len(flights) > 1:
+                flights.reverse()
+
+            errors = validate_itinerary(flights)
+            failing_leg = _calculator_failing_leg(flights)
+
+            if failing_leg is None:
+                assert errors == []
+            else:
+                assert errors and errors[0].leg_index == failing_leg
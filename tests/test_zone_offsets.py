@@ -0,0 +1,264 @@
+# tests/test_zone_offsets.py
+
+import sys
+import os
+from datetime import datetime, timedelta
+
+# Adjust the path to import from src/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+import pytest
+from src import zone_offsets
+from src.calculator import Flight, compute_travel_times, create_zoned_utc_datetime
+from src.result_cache import itinerary_fingerprint
+from src.server import flight_from_dict, flight_to_dict
+from src.validation import (
+    AMBIGUOUS_ARRIVAL_TIME,
+    INVALID_ARRIVAL_TIMEZONE,
+    NONEXISTENT_DEPARTURE_TIME,
+    validate_itinerary,
+)
+
+
+class TestDayOffsets:
+    def setup_method(self):
+        zone_offsets.clear_memo()
+
+    def test_standard_and_summer_time(self):
+        """
+        Test that the offset follows the zone's DST rules.
+        """
+        assert zone_offsets.to_utc("Europe/Paris", datetime(2024, 1, 15, 12))[1] == 1
+        assert zone_offsets.to_utc("Europe/Paris", datetime(2024, 7, 15, 12))[1] == 2
+
+    def test_fractional_offset(self):
+        """
+        Test zones whose offset is not a whole number of hours.
+        """
+        assert zone_offsets.to_utc("Asia/Kathmandu", datetime(2024, 3, 1))[1] == 5.75
+
+    def test_transition_day_uses_exact_time(self):
+        """
+        Test that a transition day is not memoized as a single offset.
+        """
+        # Europe/Paris switches from +1 to +2 at 02:00 on 2024-03-31
+        _, before = zone_offsets.to_utc("Europe/Paris", datetime(2024, 3, 31, 1, 30))
+        _, after = zone_offsets.to_utc("Europe/Paris", datetime(2024, 3, 31, 12))
+        assert (before, after) == (1, 2)
+
+    def test_memo_is_per_zone_and_date(self):
+        """
+        Test that repeated lookups on the same day reuse the memo.
+        """
+        zone_offsets.to_utc("Africa/Lagos", datetime(2024, 1, 1, 8))
+        zone_offsets.to_utc("Africa/Lagos", datetime(2024, 1, 1, 20))
+        zone_offsets.to_utc("Africa/Lagos", datetime(2024, 1, 2, 8))
+        assert len(zone_offsets._day_offsets) == 2
+
+    def test_unknown_zone(self):
+        """
+        Test that an unknown zone raises ValueError.
+        """
+        with pytest.raises(ValueError, match="Unknown timezone"):
+            zone_offsets.to_utc("Mars/Olympus_Mons", datetime(2024, 1, 1))
+
+
+class TestZonedFlights:
+    def test_from_zones_matches_offsets(self):
+        """
+        Test that zone names give the same result as the equivalent offsets.
+        """
+        zoned = [
+            Flight.from_zones(
+                "New York", "2024-07-01", "18:00", "America/New_York",
+                "London", "2024-07-02", "06:00", "Europe/London",
+            ),
+        ]
+        fixed = [
+            Flight(
+                "New York", "2024-07-01", "18:00", -4,
+                "London", "2024-07-02", "06:00", 1,
+            ),
+        ]
+        assert compute_travel_times(zoned) == compute_travel_times(fixed)
+        assert itinerary_fingerprint(zoned) == itinerary_fingerprint(fixed)
+
+    def test_explicit_offset_wins(self):
+        """
+        Test that the zone name is only used when the offset is None.
+        """
+        flight = Flight(
+            "A", "2024-07-01", "10:00", 0, "B", "2024-07-01", "12:00", 0,
+            departure_timezone="Asia/Tokyo",
+            arrival_timezone="Asia/Tokyo",
+        )
+        assert compute_travel_times([flight]).total_air_time == timedelta(hours=2)
+
+    def test_create_zoned_utc_datetime(self):
+        """
+        Test the UTC datetime and offset returned for a zoned local time.
+        """
+        utc, offset = create_zoned_utc_datetime("2024-01-01", "09:00", "Asia/Tokyo")
+        assert utc == datetime(2024, 1, 1, 0, 0)
+        assert offset == 9
+
+    def test_unknown_zone_in_itinerary(self):
+        """
+        Test that an unknown zone is reported like other flight errors.
+        """
+        flight = Flight.from_zones(
+            "A", "2024-01-01", "10:00", "Nowhere/Town", "B", "2024-01-01", "12:00", "UTC"
+        )
+        with pytest.raises(ValueError, match="Error processing flight 1: Unknown timezone"):
+            compute_travel_times([flight])
+
+    def test_validation_reports_unknown_zone(self):
+        """
+        Test that bulk validation reports unknown zones with their own code.
+        """
+        flight = Flight.from_zones(
+            "A", "2024-01-01", "10:00", "UTC", "B", "2024-01-01", "12:00", "Nowhere/Town"
+        )
+        assert [error.code for error in validate_itinerary([flight])] == [
+            INVALID_ARRIVAL_TIMEZONE
+        ]
+
+    def test_json_round_trip(self):
+        """
+        Test that zone names survive the service's JSON representation.
+        """
+        data = {
+            "departure_city": "Paris",
+            "departure_date": "2024-07-01",
+            "departure_time": "10:00",
+            "departure_timezone": "Europe/Paris",
+            "arrival_city": "Lagos",
+            "arrival_date": "2024-07-01",
+            "arrival_time": "12:00",
+            "arrival_timezone_utc_offset_in_hours": 1,
+        }
+        flight = flight_from_dict(data)
+        assert flight.departure_timezone_utc_offset_in_hours is None
+        assert flight_to_dict(flight) == {
+            **data,
+            "departure_timezone_utc_offset_in_hours": None,
+        }
+
+
+def _new_york_leg(departure_date, departure_time, arrival_date, arrival_time):
+    return Flight.from_zones(
+        "New York", departure_date, departure_time, "America/New_York",
+        "Boston", arrival_date, arrival_time, "America/New_York",
+    )
+
+
+class TestTransitionPolicies:
+    def setup_method(self):
+        zone_offsets.clear_memo()
+
+    def test_transition_table_is_sorted(self):
+        """
+        Test the transitions found for a zone with yearly DST changes.
+        """
+        table = zone_offsets.transition_table("America/New_York", 2024)
+        spring = [t for t in table.transitions if t.utc.year == 2024][0]
+        assert spring.utc == datetime(2024, 3, 10, 7, 0)
+        assert (spring.local_start, spring.local_end) == (
+            datetime(2024, 3, 10, 2, 0),
+            datetime(2024, 3, 10, 3, 0),
+        )
+        assert (spring.offset_before, spring.offset_after) == (-5, -4)
+        assert list(table.starts) == sorted(table.starts)
+
+    def test_nonexistent_time_raises_by_default(self):
+        """
+        Test that a local time inside a spring-forward gap is rejected.
+        """
+        with pytest.raises(zone_offsets.NonexistentTimeError):
+            zone_offsets.to_utc("America/New_York", datetime(2024, 3, 10, 2, 30))
+
+    def test_nonexistent_time_shift_forward(self):
+        """
+        Test that shift_forward moves a skipped time to the end of the gap.
+        """
+        utc, offset = zone_offsets.to_utc(
+            "America/New_York", datetime(2024, 3, 10, 2, 30), nonexistent="shift_forward"
+        )
+        assert (utc, offset) == (datetime(2024, 3, 10, 7, 0), -4)
+
+    def test_ambiguous_time_policies(self):
+        """
+        Test that earlier and later pick the two occurrences of a repeated time.
+        """
+        local = datetime(2024, 11, 3, 1, 30)
+        with pytest.raises(zone_offsets.AmbiguousTimeError):
+            zone_offsets.to_utc("America/New_York", local)
+        assert zone_offsets.to_utc("America/New_York", local, ambiguous="earlier") == (
+            datetime(2024, 11, 3, 5, 30),
+            -4,
+        )
+        assert zone_offsets.to_utc("America/New_York", local, ambiguous="later") == (
+            datetime(2024, 11, 3, 6, 30),
+            -5,
+        )
+
+    def test_half_hour_transition(self):
+        """
+        Test a zone whose DST change is only 30 minutes.
+        """
+        utc, offset = zone_offsets.to_utc(
+            "Australia/Lord_Howe", datetime(2024, 4, 7, 1, 45), ambiguous="later"
+        )
+        assert (utc, offset) == (datetime(2024, 4, 6, 15, 15), 10.5)
+
+    def test_unaffected_time_on_transition_day(self):
+        """
+        Test that other times on a transition day resolve normally.
+        """
+        assert zone_offsets.to_utc("America/New_York", datetime(2024, 3, 10, 1, 59)) == (
+            datetime(2024, 3, 10, 6, 59),
+            -5,
+        )
+        assert zone_offsets.to_utc("America/New_York", datetime(2024, 3, 10, 3, 0)) == (
+            datetime(2024, 3, 10, 7, 0),
+            -4,
+        )
+
+    def test_calculator_policies(self):
+        """
+        Test that compute_travel_times applies the policies to zoned legs.
+        """
+        flights = [_new_york_leg("2024-03-10", "01:30", "2024-03-10", "02:30")]
+        with pytest.raises(ValueError, match="Error processing flight 1: .* does not exist"):
+            compute_travel_times(flights)
+        result = compute_travel_times(flights, nonexistent="shift_forward")
+        assert result.total_air_time == timedelta(minutes=30)
+
+        flights = [_new_york_leg("2024-11-03", "00:30", "2024-11-03", "01:30")]
+        assert compute_travel_times(flights, ambiguous="earlier").total_air_time == (
+            timedelta(hours=1)
+        )
+        assert compute_travel_times(flights, ambiguous="later").total_air_time == (
+            timedelta(hours=2)
+        )
+
+    def test_unknown_policy(self):
+        """
+        Test that a misspelt policy is rejected even without a transition.
+        """
+        flights = [_new_york_leg("2024-01-10", "08:00", "2024-01-10", "09:00")]
+        with pytest.raises(ValueError, match="nonexistent must be one of"):
+            compute_travel_times(flights, nonexistent="shift")
+        with pytest.raises(ValueError, match="ambiguous must be one of"):
+            compute_travel_times(flights, ambiguous="first")
+
+    def test_validation_codes(self):
+        """
+        Test that bulk validation reports gap and fold times with their own codes.
+        """
+        flights = [
+            _new_york_leg("2024-03-10", "02:30", "2024-03-10", "04:00"),
+            _new_york_leg("2024-11-02", "23:00", "2024-11-03", "01:30"),
+        ]
+        codes = [error.code for error in validate_itinerary(flights)]
+        assert codes == [NONEXISTENT_DEPARTURE_TIME, AMBIGUOUS_ARRIVAL_TIME]